@@ -0,0 +1,97 @@
+"""
+Size and throughput benchmark for compressed roster archives.
+
+Writes a synthetic roster, exports it into archives with each available
+codec and compression level, and reports the archive size against the
+subject text files, the export throughput, the time to read the whole
+archive back, one subject, and one narrow ID range. Throughput is
+measured in megabytes of subject text per second. Reading the subject
+files with read_student_data is timed as the baseline.
+
+Usage:
+    python benchmarks/bench_archive.py [--students 300000] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+from synthetic import FIRST_IDS, school_in, write_synthetic_roster
+
+from school_management_system import zstandard
+
+
+# Function to time one call of a callable
+def timed(function):
+    """
+    Runs a callable once and returns its wall-clock time.
+
+    Parameters:
+        function (callable): The callable to time.
+
+    Returns:
+        float: The run time in seconds.
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the size and speed of roster archives.")
+    parser.add_argument("--students", type=int, default=300000, help="roster size (default: 300000)")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    settings = [("zlib", 1), ("zlib", 6), ("zlib", 9)]
+    if zstandard is not None:
+        settings += [("zstd", 3), ("zstd", 19)]
+
+    report = {"python": platform.python_version(), "platform": platform.platform(), "students": args.students, "results": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        write_synthetic_roster(directory, args.students)
+        school = school_in(directory)
+        text_size = sum(os.path.getsize(path) for path in school.FILE_PATHS.values())
+        megabytes = text_size / 1e6
+        report["text_bytes"] = text_size
+
+        def read_files():
+            for subject in school.FILE_PATHS:
+                school.read_student_data(subject)
+
+        baseline = timed(read_files)
+        report["read_student_data_seconds"] = baseline
+        print(f"subject text files: {megabytes:.1f} MB, read_student_data {baseline:.2f} s ({megabytes / baseline:.1f} MB/s)")
+        print(f"{'codec':<8} {'ratio':>6} {'export MB/s':>12} {'read all MB/s':>14} {'one subject s':>14} {'ID range ms':>12}")
+
+        archive = os.path.join(directory, "roster.archive")
+        first_id = FIRST_IDS["History"]
+        for codec, level in settings:
+            export = timed(lambda: school.export_archive(archive, codec=codec, level=level))
+            size = os.path.getsize(archive)
+            read_all = timed(lambda: list(school.iter_archive_students(archive)))
+            one_subject = timed(lambda: list(school.iter_archive_students(archive, ["History"])))
+            id_range = timed(lambda: list(school.iter_archive_students(archive, ["History"], first_id + 100, first_id + 199)))
+
+            name = f"{codec}-{level}"
+            report["results"][name] = {
+                "bytes": size,
+                "ratio": text_size / size,
+                "export_mb_per_second": megabytes / export,
+                "read_all_mb_per_second": megabytes / read_all,
+                "one_subject_seconds": one_subject,
+                "id_range_seconds": id_range,
+            }
+            print(f"{name:<8} {text_size / size:>6.2f} {megabytes / export:>12.1f} {megabytes / read_all:>14.1f} {one_subject:>14.2f} {id_range * 1000:>12.1f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+# Driver Code
+if __name__ == "__main__":
+    main()
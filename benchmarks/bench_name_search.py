@@ -0,0 +1,142 @@
+"""
+Latency benchmark for searching students by name.
+
+Enrolls a roster of generated names, far more varied than the ten first
+names and ten surnames of the synthetic subject files, then times the
+first search (which indexes every name added so far) and the latency of
+prefix, whole-name and misspelt queries. Each query kind reports its
+median and 95th percentile in milliseconds.
+
+Usage:
+    python benchmarks/bench_name_search.py [--students 1000000] [--queries 200] [--output results.json]
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import string
+import tempfile
+import time
+
+from synthetic import school_in
+
+from school_management_system import MathStudent
+
+
+# Function to make up a pronounceable word
+def made_up_word(rng):
+    """
+    Builds a random capitalised word of alternating consonants and vowels.
+
+    Parameters:
+        rng (random.Random): The random number generator to use.
+
+    Returns:
+        str: The word.
+    """
+    consonants = "bcdfghjklmnprstvwz"
+    vowels = "aeiou"
+    letters = [rng.choice(consonants if position % 2 == 0 else vowels) for position in range(rng.randint(3, 9))]
+    return "".join(letters).capitalize()
+
+
+# Function to misspell a name with one random edit
+def misspell(name, rng):
+    """
+    Applies one random insertion, deletion, substitution or swap of neighbours to a name.
+
+    Parameters:
+        name (str): The name to misspell.
+        rng (random.Random): The random number generator to use.
+
+    Returns:
+        str: The misspelt name.
+    """
+    position = rng.randrange(1, len(name) - 1)
+    edit = rng.choice(("insert", "delete", "substitute", "swap"))
+    if edit == "insert":
+        return name[:position] + rng.choice(string.ascii_lowercase) + name[position:]
+    if edit == "delete":
+        return name[:position] + name[position + 1:]
+    if edit == "substitute":
+        return name[:position] + rng.choice(string.ascii_lowercase) + name[position + 1:]
+    return name[:position - 1] + name[position] + name[position - 1] + name[position + 1:]
+
+
+# Function to time a list of queries
+def query_latencies(school, queries):
+    """
+    Times each query against the school's name search.
+
+    Parameters:
+        school (School): The school to search.
+        queries (list): The query strings.
+
+    Returns:
+        dict: The median and 95th percentile latency in milliseconds and the share of queries with results.
+    """
+    latencies = []
+    answered = 0
+    for query in queries:
+        start = time.perf_counter()
+        results = school.search_students_by_name(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        answered += bool(results)
+    latencies.sort()
+    return {
+        "median_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "answered": answered / len(queries),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prefix and typo-tolerant name search.")
+    parser.add_argument("--students", type=int, default=1000000, help="roster size (default: 1000000)")
+    parser.add_argument("--queries", type=int, default=200, help="queries per kind (default: 200)")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    first_names = [made_up_word(rng) for _ in range(5000)]
+    last_names = [made_up_word(rng) for _ in range(50000)]
+    names = [f"{rng.choice(first_names)} {rng.choice(last_names)}" for _ in range(args.students)]
+
+    report = {"python": platform.python_version(), "platform": platform.platform(), "students": args.students, "results": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        school = school_in(directory)
+        start = time.perf_counter()
+        for student_id, name in enumerate(names, 1):
+            school.add_student(MathStudent(name, student_id))
+        report["results"]["enroll_seconds"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        school.search_students_by_name(names[0])
+        report["results"]["first_search_seconds"] = time.perf_counter() - start
+
+        samples = rng.sample(names, args.queries)
+        kinds = {
+            "prefix": [name.split()[rng.randrange(2)][:3] for name in samples],
+            "whole_name": samples,
+            "misspelt": [misspell(name, rng) for name in samples],
+        }
+        for kind, queries in kinds.items():
+            report["results"][kind] = query_latencies(school, queries)
+
+    results = report["results"]
+    print(f"enroll {args.students} students: {results['enroll_seconds']:.2f} s")
+    print(f"first search (builds the index): {results['first_search_seconds']:.2f} s")
+    print(f"{'query':<12} {'median ms':>10} {'p95 ms':>8} {'answered':>9}")
+    for kind in kinds:
+        print(f"{kind:<12} {results[kind]['median_ms']:>10.2f} {results[kind]['p95_ms']:>8.2f} {results[kind]['answered']:>8.0%}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+# Driver Code
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Benchmark suite for the School Management System.
+
+Generates synthetic rosters in the existing subject file format and times
+the core School operations: reading and writing subject files, adding,
+finding and removing students, the first ranking and statistics query
+after a bulk load, computing final grades and generating reports. Results are written as JSON so runs can be compared.
+
+Usage:
+    python benchmarks/bench_school.py [--sizes 1000 10000 100000] [--output results.json]
+                                      [--compare previous.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+
+from synthetic import school_in, write_synthetic_roster
+
+
+# Function to time a callable, keeping the best of several repeats
+def best_time(function, repeat):
+    """
+    Runs a callable several times and returns the fastest wall-clock time.
+
+    Parameters:
+        function (callable): The callable to time.
+        repeat (int): The number of runs.
+
+    Returns:
+        float: The fastest run time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Function to run every benchmark for one roster size
+def run_benchmarks(size, repeat):
+    """
+    Runs every benchmark against a synthetic roster of a given size.
+
+    Parameters:
+        size (int): The total number of students in the roster.
+        repeat (int): The number of runs per benchmark.
+
+    Returns:
+        dict: The benchmark name mapped to its time in seconds and rate per second.
+    """
+    results = {}
+
+    def record(name, seconds, operations):
+        results[name] = {"seconds": seconds, "per_second": operations / seconds if seconds else None}
+
+    with tempfile.TemporaryDirectory() as directory:
+        counts = write_synthetic_roster(directory, size)
+        school = school_in(directory)
+
+        # Parsing: read every subject file
+        loaded = {}
+
+        def read_all():
+            for subject in school.FILE_PATHS:
+                loaded[subject] = school.read_student_data(subject)
+
+        record("read_student_data", best_time(read_all, repeat), size)
+        students = [student for subject in school.FILE_PATHS for student in loaded[subject]]
+
+        # CRUD: bulk enrollment into an empty school
+        def add_all():
+            fresh = school_in(directory)
+            for student in students:
+                fresh.add_student(student)
+
+        record("add_student", best_time(add_all, repeat), size)
+
+        # Rankings and statistics: the first query after a bulk load grades every student
+        def first_query():
+            fresh = school_in(directory)
+            fresh.add_students(students)
+            start = time.perf_counter()
+            fresh.top_students("Math")
+            fresh.subject_statistics()
+            return time.perf_counter() - start
+
+        record("first_ranking_query", min(first_query() for _ in range(repeat)), size)
+        school.add_students(students)
+
+        # Persistence: write every subject file
+        def write_all():
+            for subject in school.FILE_PATHS:
+                school.write_student_data(subject)
+
+        record("write_student_data", best_time(write_all, repeat), size)
+
+        # Startup: open a lazy school and look up one student through the index files
+        last_id = students[-1].student_id
+
+        def lazy_lookup():
+            school_in(directory, lazy=True).find_student_by_id(last_id)
+
+        record("lazy_startup_lookup", best_time(lazy_lookup, repeat), 1)
+
+        # Lookups by ID, including misses
+        ids = [student.student_id for student in students]
+
+        def find_all():
+            for student_id in ids:
+                school.find_student_by_id(student_id)
+                school.find_student_by_id(-student_id)
+
+        record("find_student_by_id", best_time(find_all, repeat), 2 * size)
+
+        # Grading: recompute every final grade from scratch
+        def grade_all():
+            for student in students:
+                student._invalidate_grade_cache()
+                student.compute_final_grade()
+
+        record("compute_final_grade", best_time(grade_all, repeat), size)
+
+        # Reporting: render the full report into a throwaway buffer
+        def report_all():
+            with contextlib.redirect_stdout(io.StringIO()):
+                school.generate_student_reports()
+
+        record("generate_student_reports", best_time(report_all, repeat), size)
+
+        # Deletion: remove a tenth of the roster and put it back
+        victims = students[::10]
+
+        def remove_some():
+            for student in victims:
+                school.remove_student(student.student_id)
+            for student in victims:
+                school.add_student(student)
+
+        record("remove_student", best_time(remove_some, repeat), len(victims))
+
+    results["_roster"] = counts
+    return results
+
+
+# Function to print how a run compares with a previous one
+def print_comparison(current, previous):
+    """
+    Prints the ratio between the times of two benchmark runs.
+
+    Parameters:
+        current (dict): The results of this run.
+        previous (dict): The results of an earlier run.
+
+    Returns:
+        None
+    """
+    print(f"{'size':>9}  {'benchmark':<26} {'before (s)':>11} {'after (s)':>11} {'change':>8}")
+    for size, benchmarks in current["results"].items():
+        for name, result in benchmarks.items():
+            before = previous.get("results", {}).get(size, {}).get(name)
+            if name.startswith("_") or before is None:
+                continue
+            change = result["seconds"] / before["seconds"] if before["seconds"] else float("nan")
+            print(f"{size:>9}  {name:<26} {before['seconds']:>11.4f} {result['seconds']:>11.4f} {change:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark School CRUD, parsing, grading and reporting.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="total roster sizes to benchmark (default: 1000 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the fastest is kept")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": {},
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} students...", file=sys.stderr)
+        report["results"][str(size)] = run_benchmarks(size, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as file:
+            print_comparison(report, json.load(file))
+
+
+# Driver Code
+if __name__ == "__main__":
+    main()
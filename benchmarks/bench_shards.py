@@ -0,0 +1,116 @@
+"""
+Scaling benchmark for the sharded School.
+
+Writes a synthetic roster, distributes it across 1, 2, 4, ... shard
+processes and times bulk grading (every final grade recomputed from
+scratch), merged statistics and reopening the shards from their files.
+A single in-process School is timed as the baseline. The speedup column
+compares each shard count with one shard; near-linear scaling needs at
+least as many free cores as shards.
+
+Usage:
+    python benchmarks/bench_shards.py [--students 200000] [--shards 1 2 4] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from synthetic import school_in, write_synthetic_roster
+
+from school_shards import ShardedSchool
+
+
+# Function to time one call of a callable
+def timed(function):
+    """
+    Runs a callable once and returns its wall-clock time.
+
+    Parameters:
+        function (callable): The callable to time.
+
+    Returns:
+        float: The run time in seconds.
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+# Function to time the operations of one shard count
+def run_shards(directory, students, shard_count):
+    """
+    Distributes a roster over a number of shards and times the sharded operations.
+
+    Parameters:
+        directory (str): The scratch directory for the shard files.
+        students (list): The student objects to distribute.
+        shard_count (int): The number of shard processes.
+
+    Returns:
+        dict: The operation name mapped to its time in seconds.
+    """
+    data_dir = os.path.join(directory, f"shards{shard_count}")
+    results = {}
+    school = ShardedSchool(shard_count, data_dir=data_dir)
+    results["distribute"] = timed(lambda: school.add_students(students, save=True))
+    results["bulk_grading"] = timed(lambda: school.compute_final_grades(recompute=True))
+    results["statistics"] = timed(school.subject_statistics)
+    school.close()
+
+    # Reopening loads every shard's files in parallel
+    def reopen():
+        ShardedSchool(shard_count, data_dir=data_dir).close()
+
+    results["reopen"] = timed(reopen)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk grading across shard processes.")
+    parser.add_argument("--students", type=int, default=200000, help="total roster size (default: 200000)")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4], help="shard counts to benchmark (default: 1 2 4)")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "students": args.students,
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        write_synthetic_roster(directory, args.students)
+        school = school_in(directory)
+        school.add_students(school.read_all_student_data())
+
+        def grade_all():
+            for student in school.students:
+                student._invalidate_grade_cache()
+                student.compute_final_grade()
+
+        report["results"]["single_school"] = {"bulk_grading": timed(grade_all)}
+        for shard_count in args.shards:
+            print(f"Benchmarking {shard_count} shard(s)...", file=sys.stderr)
+            report["results"][str(shard_count)] = run_shards(directory, school.students, shard_count)
+
+    base = report["results"].get(str(args.shards[0]), {})
+    print(f"{'shards':>8} {'operation':<14} {'seconds':>9} {'speedup':>8}")
+    print(f"{'single':>8} {'bulk_grading':<14} {report['results']['single_school']['bulk_grading']:>9.3f}")
+    for shard_count in args.shards:
+        for name, seconds in report["results"][str(shard_count)].items():
+            print(f"{shard_count:>8} {name:<14} {seconds:>9.3f} {base[name] / seconds:>7.2f}x")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+# Driver Code
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark of saving console-style edits immediately versus write-behind.
+
+Simulates an administrator keying in a class: each new student is added
+and saved on its own, as menu option 2 does. The edits are saved with
+journaling and with whole-file rewrites, each either immediately or in
+write-behind mode, under every fsync policy. For each combination the
+script reports the time per edit and the number of file writes (journal
+appends and subject file rewrites) the edits caused, including the final
+flush.
+
+Usage:
+    python benchmarks/bench_write_behind.py [--students 20000] [--edits 500] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+
+from synthetic import school_in, write_synthetic_roster
+
+from school_management_system import School
+
+
+# Function to wrap a school method so its calls are counted
+def count_calls(school, method_name, counter):
+    """
+    Replaces a method of a school object with a wrapper counting its calls.
+
+    Parameters:
+        school (School): The school whose method is wrapped.
+        method_name (str): The name of the method.
+        counter (dict): Incremented under the method name on every call.
+
+    Returns:
+        None
+    """
+    method = getattr(school, method_name)
+
+    def counted(*args, **kwargs):
+        counter[method_name] = counter.get(method_name, 0) + 1
+        return method(*args, **kwargs)
+
+    setattr(school, method_name, counted)
+
+
+# Function to time a run of single edits
+def run_edits(directory, edits, journaling, write_behind, fsync):
+    """
+    Adds and saves students one at a time, then flushes and closes the school.
+
+    Parameters:
+        directory (str): The directory holding a copy of the roster.
+        edits (int): The number of students to add.
+        journaling (bool): Append journal records instead of rewriting subject files.
+        write_behind (bool): Buffer the saves and write them in batches.
+        fsync (str): The fsync policy of the school.
+
+    Returns:
+        dict: The seconds per edit and the number of file writes.
+    """
+    school = school_in(directory, lazy=True, journaling=journaling, write_behind=write_behind, flush_interval=None, fsync=fsync)
+    school.ensure_loaded()
+    writes = {}
+    count_calls(school, "append_journal_records", writes)
+    count_calls(school, "write_student_data", writes)
+    subjects = list(School.STUDENT_CLASSES)
+
+    start = time.perf_counter()
+    for position in range(edits):
+        subject = subjects[position % len(subjects)]
+        student = School.STUDENT_CLASSES[subject](f"Keyed Student {position}", 9000000 + position)
+        school.add_student(student)
+        school.save_student(student)
+    school.close()
+    seconds = time.perf_counter() - start
+    return {"ms_per_edit": seconds * 1000 / edits, "file_writes": sum(writes.values())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark immediate saves against write-behind.")
+    parser.add_argument("--students", type=int, default=20000, help="roster size already on disk (default: 20000)")
+    parser.add_argument("--edits", type=int, default=500, help="students keyed in per run (default: 500)")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    report = {"python": platform.python_version(), "platform": platform.platform(), "students": args.students, "edits": args.edits, "results": {}}
+    print(f"{'mode':<10} {'saves':<13} {'fsync':<10} {'ms/edit':>9} {'writes':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        roster = os.path.join(directory, "roster")
+        os.mkdir(roster)
+        write_synthetic_roster(roster, args.students)
+        for journaling in (True, False):
+            for write_behind in (False, True):
+                for fsync in School.FSYNC_POLICIES:
+                    # Rewriting the whole roster on every edit is slow, so fewer edits are timed
+                    edits = args.edits if journaling or write_behind else max(args.edits // 10, 1)
+                    scratch = os.path.join(directory, "run")
+                    shutil.copytree(roster, scratch)
+                    result = run_edits(scratch, edits, journaling, write_behind, fsync)
+                    shutil.rmtree(scratch)
+
+                    mode = "journal" if journaling else "rewrite"
+                    saves = "write-behind" if write_behind else "immediate"
+                    report["results"][f"{mode}/{saves}/{fsync}"] = dict(result, edits=edits)
+                    print(f"{mode:<10} {saves:<13} {fsync:<10} {result['ms_per_edit']:>9.3f} {result['file_writes']:>7}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+# Driver Code
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Load generator for the School Management System network service.
+
+Starts school_service.py on localhost against a synthetic roster in a
+temporary directory (or targets an already running service with --port),
+then drives it from many concurrent keep-alive connections with a mix of
+lookups, score updates and statistics queries. It reports requests per
+second and latency percentiles.
+
+Usage:
+    python benchmarks/load_test.py [--students 30000] [--connections 50] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import FIRST_IDS, write_synthetic_roster
+
+SERVICE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "school_service.py")
+AUTHORIZATION = "Basic " + base64.b64encode(b"admin:password").decode("ascii")
+
+
+# Function to send one request on an open connection and read the response
+async def request(reader, writer, method, path, payload=None):
+    """
+    Sends one HTTP/1.1 request on a keep-alive connection and reads the response.
+
+    Parameters:
+        reader (asyncio.StreamReader): The connection's reader.
+        writer (asyncio.StreamWriter): The connection's writer.
+        method (str): The HTTP method.
+        path (str): The request path.
+        payload (dict): Optional JSON body.
+
+    Returns:
+        int: The response status code.
+    """
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    head = (
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nAuthorization: {AUTHORIZATION}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+# Function to run one client until the deadline
+async def client(port, ids, deadline, latencies, failures, seed):
+    """
+    Sends a mix of requests over one connection until the deadline passes.
+
+    Parameters:
+        port (int): The service port.
+        ids (list): The student IDs to query and update.
+        deadline (float): The perf_counter time at which to stop.
+        latencies (list): Receives the latency of every request in seconds.
+        failures (list): Receives the status of every failed request.
+        seed (int): The seed for this client's random choices.
+
+    Returns:
+        None
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            student_id = rng.choice(ids)
+            roll = rng.random()
+            start = time.perf_counter()
+            if roll < 0.80:
+                status = await request(reader, writer, "GET", f"/students/{student_id}")
+            elif roll < 0.95:
+                field = "test1_score" if student_id < FIRST_IDS["History"] else "attendance_score"
+                status = await request(reader, writer, "PATCH", f"/students/{student_id}", {field: round(rng.uniform(0, 100), 1)})
+            else:
+                status = await request(reader, writer, "GET", "/statistics")
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+# Function to wait until the service accepts connections
+async def wait_for_service(port, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+# Function to run the whole load test
+async def run_load_test(port, ids, connections, duration):
+    """
+    Runs concurrent clients against the service and summarises the results.
+
+    Parameters:
+        port (int): The service port.
+        ids (list): The student IDs to query and update.
+        connections (int): The number of concurrent connections.
+        duration (float): The length of the test in seconds.
+
+    Returns:
+        dict: The number of requests and failures, requests per second and latency percentiles.
+    """
+    await wait_for_service(port)
+    latencies = []
+    failures = []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(port, ids, deadline, latencies, failures, seed) for seed in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(share):
+        return latencies[min(int(len(latencies) * share), len(latencies) - 1)] * 1000 if latencies else None
+
+    return {
+        "requests": len(latencies),
+        "failures": len(failures),
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] * 1000 if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the School Management System service on localhost.")
+    parser.add_argument("--students", type=int, default=30000, help="synthetic roster size (default: 30000)")
+    parser.add_argument("--connections", type=int, default=50, help="concurrent connections (default: 50)")
+    parser.add_argument("--duration", type=float, default=10, help="test length in seconds (default: 10)")
+    parser.add_argument("--port", type=int, help="test a service already running on this port instead; "
+                        "it must serve a roster generated with the same --students")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        counts = write_synthetic_roster(directory, args.students)
+        ids = [FIRST_IDS[subject] + offset for subject, count in counts.items() for offset in range(count)]
+
+        service = None
+        port = args.port
+        if port is None:
+            port = 18080 + os.getpid() % 1000
+            service = subprocess.Popen([sys.executable, SERVICE_PATH, "--port", str(port), "--data-dir", directory],
+                                       stdout=subprocess.DEVNULL)
+        try:
+            results = asyncio.run(run_load_test(port, ids, args.connections, args.duration))
+        finally:
+            if service is not None:
+                # Interrupt rather than kill, so the service compacts its journals
+                service.send_signal(signal.SIGINT)
+                service.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+# Driver Code
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Memory benchmark for the student classes.
+
+Measures how many bytes each student object occupies with the compact,
+slotted representation used by school_management_system.py and compares it
+with the previous layout, where every student carried a __dict__ and Math
+quiz scores were kept in a Python list of floats.
+
+Usage:
+    python benchmarks/memory_benchmark.py [number_of_students]
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from school_management_system import EnglishStudent, HistoryStudent, MathStudent
+
+
+# Previous (dictionary based) layout of the student classes, kept for comparison
+class LegacyStudent:
+    def __init__(self, name, student_id, subject):
+        self._name = name
+        self._student_id = student_id
+        self._subject = subject
+
+
+class LegacyMathStudent(LegacyStudent):
+    def __init__(self, name, student_id):
+        super().__init__(name, student_id, "Math")
+        self._quizzes = []
+        self._test1_score = 0
+        self._test2_score = 0
+        self._final_exam_score = 0
+
+
+class LegacyHistoryStudent(LegacyStudent):
+    def __init__(self, name, student_id):
+        super().__init__(name, student_id, "History")
+        self._attendance_score = 0
+        self._project_score = 0
+        self._exam1_score = 0
+        self._exam2_score = 0
+
+
+class LegacyEnglishStudent(LegacyStudent):
+    def __init__(self, name, student_id):
+        super().__init__(name, student_id, "English")
+        self._attendance_score = 0
+        self._final_exam_score = 0
+        self._quiz1_score = 0
+        self._quiz2_score = 0
+
+
+# Function to build a roster of students with random scores
+def build_roster(math_class, history_class, english_class, count, seed=0):
+    """
+    Builds a roster of students spread evenly across the three subjects.
+
+    Parameters:
+        math_class (type): The class used for Math students.
+        history_class (type): The class used for History students.
+        english_class (type): The class used for English students.
+        count (int): The number of students to build.
+        seed (int): The seed for the random scores.
+
+    Returns:
+        list: The student objects.
+    """
+    rng = random.Random(seed)
+    roster = []
+    for index in range(count):
+        student_id = 100000 + index
+        kind = index % 3
+        if kind == 0:
+            student = math_class(f"Student {index}", student_id)
+            for _ in range(5):
+                student._quizzes.append(rng.uniform(0, 100))
+            student._test1_score = rng.uniform(0, 100)
+            student._test2_score = rng.uniform(0, 100)
+            student._final_exam_score = rng.uniform(0, 100)
+        elif kind == 1:
+            student = history_class(f"Student {index}", student_id)
+            student._attendance_score = rng.uniform(0, 100)
+            student._project_score = rng.uniform(0, 100)
+            student._exam1_score = rng.uniform(0, 100)
+            student._exam2_score = rng.uniform(0, 100)
+        else:
+            student = english_class(f"Student {index}", student_id)
+            student._attendance_score = rng.uniform(0, 100)
+            student._final_exam_score = rng.uniform(0, 100)
+            student._quiz1_score = rng.uniform(0, 100)
+            student._quiz2_score = rng.uniform(0, 100)
+        roster.append(student)
+    return roster
+
+
+# Function to measure the bytes allocated per student for a set of classes
+def measure_bytes_per_student(math_class, history_class, english_class, count):
+    """
+    Measures the memory allocated per student while building a roster.
+
+    Parameters:
+        math_class (type): The class used for Math students.
+        history_class (type): The class used for History students.
+        english_class (type): The class used for English students.
+        count (int): The number of students to build.
+
+    Returns:
+        float: The average number of bytes allocated per student.
+    """
+    tracemalloc.start()
+    roster = build_roster(math_class, history_class, english_class, count)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del roster
+    return allocated / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    before = measure_bytes_per_student(LegacyMathStudent, LegacyHistoryStudent, LegacyEnglishStudent, count)
+    after = measure_bytes_per_student(MathStudent, HistoryStudent, EnglishStudent, count)
+
+    print(f"Students measured:       {count}")
+    print(f"Before (dict + list):    {before:.1f} bytes per student")
+    print(f"After (slots + array):   {after:.1f} bytes per student")
+    print(f"Saving:                  {(1 - after / before) * 100:.1f}%")
+
+
+# Driver Code
+if __name__ == "__main__":
+    main()
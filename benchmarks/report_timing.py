@@ -0,0 +1,44 @@
+"""
+Timing script for student report rendering.
+
+Builds a large synthetic roster and measures how many report rows per
+second School.write_student_reports renders in each output format, written
+to a file in a temporary directory.
+
+Usage:
+    python benchmarks/report_timing.py [number_of_students]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import school_in, write_synthetic_roster
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_synthetic_roster(directory, count)
+        school = school_in(directory)
+        school.add_students(school.read_all_student_data())
+
+        # Warm the grade caches so every format is measured on the same footing
+        for student in school.students:
+            student.compute_final_grade()
+
+        print(f"Students: {count}")
+        for report_format in ("text", "csv", "json"):
+            path = os.path.join(directory, f"report.{report_format}")
+            start = time.perf_counter()
+            rows = school.write_student_reports(path, report_format)
+            seconds = time.perf_counter() - start
+            size = os.path.getsize(path) / (1024 * 1024)
+            print(f"{report_format:>5}: {rows} rows in {seconds:.3f}s ({rows / seconds:,.0f} rows/sec, {size:.1f} MiB)")
+
+
+# Driver Code
+if __name__ == "__main__":
+    main()
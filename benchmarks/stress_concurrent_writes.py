@@ -0,0 +1,196 @@
+"""
+Stress test for concurrent writers sharing the same subject files.
+
+Starts several processes, each running several writer threads with its own
+journaling School over one shared data directory. Every writer owns a
+disjoint range of student IDs and randomly enrolls, updates and removes
+students in it. A low compaction threshold makes journal compactions race
+with appends from the other writers, and reader threads keep reloading the
+subjects at the same time.
+
+When every writer has finished, the files on disk are compared with the
+final state each writer expects. The script reports lost, stale or
+unexpected records, torn lines and read errors, plus the overall write
+throughput.
+
+Usage:
+    python benchmarks/stress_concurrent_writes.py [--processes 4] [--threads 4] [--operations 500]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from school_management_system import School
+
+# Number of fields in a complete record of each subject
+RECORD_LENGTHS = {"Math": (7, 11), "History": (7,), "English": (7,)}
+
+
+# Function run by each writer thread
+def write_randomly(data_dir, writer_number, operations, compaction_threshold):
+    """
+    Enrolls, updates and removes students in the writer's own ID range.
+
+    Parameters:
+        data_dir (str): The shared data directory.
+        writer_number (int): The writer's number, used to pick its ID range.
+        operations (int): The number of changes to make.
+        compaction_threshold (int): The journal size that triggers a compaction.
+
+    Returns:
+        dict: Student ID mapped to the expected record, or None for removed students.
+    """
+    rng = random.Random(writer_number)
+    school = School(journaling=True, compaction_threshold=compaction_threshold, data_dir=data_dir)
+    expected = {}
+    subjects = list(School.STUDENT_CLASSES)
+    first_id = 10000000 + writer_number * 100000
+
+    for _ in range(operations):
+        student_id = first_id + rng.randrange(200)
+        subject = subjects[student_id % len(subjects)]
+        if expected.get(student_id) is not None and rng.random() < 0.2:
+            school.save_removal(School.STUDENT_CLASSES[subject](f"Writer {writer_number}", student_id))
+            expected[student_id] = None
+            continue
+
+        student = School.STUDENT_CLASSES[subject](f"Writer {writer_number}", student_id)
+        values = {field: round(rng.uniform(0, 100), 1) for field in School.IMPORT_SCORE_FIELDS[subject]}
+        school.apply_scores(student, values)
+        school.save_student(student)
+        expected[student_id] = school.format_student_record(student)
+    return expected
+
+
+# Function run by each reader thread
+def read_repeatedly(data_dir, stop, results):
+    """
+    Keeps reloading every subject until told to stop, counting read errors.
+
+    Parameters:
+        data_dir (str): The shared data directory.
+        stop (threading.Event): Set when the writers have finished.
+        results (dict): Receives the number of reads and errors.
+
+    Returns:
+        None
+    """
+    school = School(data_dir=data_dir)
+    while not stop.is_set():
+        for subject in School.FILE_PATHS:
+            try:
+                school.read_student_data(subject)
+                results["reads"] += 1
+            except Exception:
+                results["errors"] += 1
+
+
+# Function run by each worker process
+def run_process(data_dir, process_number, threads, operations, compaction_threshold):
+    """
+    Runs a group of writer threads plus one reader thread in this process.
+
+    Parameters:
+        data_dir (str): The shared data directory.
+        process_number (int): The process's number.
+        threads (int): The number of writer threads.
+        operations (int): The number of changes per writer.
+        compaction_threshold (int): The journal size that triggers a compaction.
+
+    Returns:
+        tuple: The merged expectations of the writers and the reader's results.
+    """
+    expected = {}
+    lock = threading.Lock()
+    reader_results = {"reads": 0, "errors": 0}
+    stop = threading.Event()
+    reader = threading.Thread(target=read_repeatedly, args=(data_dir, stop, reader_results))
+    reader.start()
+
+    def writer(writer_number):
+        result = write_randomly(data_dir, writer_number, operations, compaction_threshold)
+        with lock:
+            expected.update(result)
+
+    writers = [threading.Thread(target=writer, args=(process_number * threads + number,)) for number in range(threads)]
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    reader.join()
+    return expected, reader_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test concurrent writers on the same subject files.")
+    parser.add_argument("--processes", type=int, default=4, help="writer processes (default: 4)")
+    parser.add_argument("--threads", type=int, default=4, help="writer threads per process (default: 4)")
+    parser.add_argument("--operations", type=int, default=500, help="changes per writer (default: 500)")
+    parser.add_argument("--compaction-threshold", type=int, default=25,
+                        help="journal records per writer before compacting (default: 25)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for path in School.FILE_PATHS.values():
+            open(os.path.join(data_dir, path), "w").close()
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.processes) as pool:
+            results = pool.starmap(run_process, [
+                (data_dir, number, args.threads, args.operations, args.compaction_threshold)
+                for number in range(args.processes)
+            ])
+        seconds = time.perf_counter() - start
+
+        expected = {}
+        reads = read_errors = 0
+        for writer_expectations, reader_results in results:
+            expected.update(writer_expectations)
+            reads += reader_results["reads"]
+            read_errors += reader_results["errors"]
+
+        # Fold any journal left behind into the snapshots, then check every line
+        school = School(data_dir=data_dir)
+        school.compact_all_student_data()
+        torn = 0
+        actual = {}
+        for subject, path in school.FILE_PATHS.items():
+            with open(path) as file:
+                for line in file:
+                    fields = line.rstrip("\n").split(",")
+                    if len(fields) not in RECORD_LENGTHS[subject]:
+                        torn += 1
+                        continue
+                    actual[int(fields[2])] = line.rstrip("\n")
+
+    lost = sum(1 for student_id, record in expected.items() if record is not None and student_id not in actual)
+    stale = sum(1 for student_id, record in expected.items() if record is not None and student_id in actual and actual[student_id] != record)
+    resurrected = sum(1 for student_id, record in expected.items() if record is None and student_id in actual)
+    total_operations = args.processes * args.threads * args.operations
+
+    print(f"Writers:          {args.processes} processes x {args.threads} threads")
+    print(f"Operations:       {total_operations} in {seconds:.2f}s ({total_operations / seconds:,.0f} writes/sec)")
+    print(f"Concurrent reads: {reads} ({read_errors} errors)")
+    print(f"Students checked: {len(expected)}")
+    print(f"Lost records:     {lost}")
+    print(f"Stale records:    {stale}")
+    print(f"Resurrected:      {resurrected}")
+    print(f"Torn lines:       {torn}")
+
+    ok = not (lost or stale or resurrected or torn or read_errors)
+    print("PASS" if ok else "FAIL")
+    raise SystemExit(0 if ok else 1)
+
+
+# Driver Code
+if __name__ == "__main__":
+    main()
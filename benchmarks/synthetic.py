@@ -0,0 +1,89 @@
+"""
+Synthetic roster helpers shared by the benchmark scripts.
+
+Generates subject files in the same comma-separated format as
+mathstudent.txt, historystudent.txt and englishstudent.txt, and creates
+School objects whose files live in a scratch directory instead of the
+project folder.
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from school_management_system import School
+
+
+FIRST_NAMES = ("Daniel", "Emma", "Sean", "Sam", "Aoife", "Liam", "Niamh", "Conor", "Sarah", "Jack")
+LAST_NAMES = ("Diaz", "Smith", "Winchester", "Murphy", "Kelly", "Byrne", "Ryan", "Walsh", "Doyle", "Brennan")
+
+# First student ID used for each subject, following the 1001/2001/3001 pattern of the sample files
+FIRST_IDS = {"Math": 1000001, "History": 2000001, "English": 3000001}
+
+
+# Function to create a school that stores its files in a given directory
+def school_in(directory, **options):
+    """
+    Creates a school whose subject files, journals and binary files live in a directory.
+
+    Parameters:
+        directory (str): The directory holding the files.
+        **options: Keyword arguments passed on to School.
+
+    Returns:
+        School: The new school object.
+    """
+    return School(data_dir=directory, **options)
+
+
+# Function to format one synthetic record for a subject
+def synthetic_record(subject, student_id, rng):
+    """
+    Builds one random record in the text format of a subject file.
+
+    Parameters:
+        subject (str): The subject of the record.
+        student_id (int): The ID of the student.
+        rng (random.Random): The random number generator to use.
+
+    Returns:
+        str: The record without a trailing newline.
+    """
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    def score():
+        return str(round(rng.uniform(0, 100), 1))
+
+    if subject == "Math":
+        scores = [score() for _ in range(8)]
+    else:
+        scores = [score() for _ in range(4)]
+    return f"{subject},{name},{student_id}," + ",".join(scores)
+
+
+# Function to write a synthetic roster to a directory
+def write_synthetic_roster(directory, total_students, seed=0):
+    """
+    Writes a roster spread evenly across the three subjects to a directory.
+
+    Parameters:
+        directory (str): The directory to write the subject files to.
+        total_students (int): The total number of students across all subjects.
+        seed (int): The seed for the random names and scores.
+
+    Returns:
+        dict: The number of students written per subject.
+    """
+    rng = random.Random(seed)
+    subjects = list(School.FILE_PATHS)
+    counts = {}
+    for position, subject in enumerate(subjects):
+        count = total_students // len(subjects) + (1 if position < total_students % len(subjects) else 0)
+        counts[subject] = count
+        with open(os.path.join(directory, School.FILE_PATHS[subject]), "w") as file:
+            first_id = FIRST_IDS[subject]
+            for offset in range(count):
+                file.write(synthetic_record(subject, first_id + offset, rng) + "\n")
+    return counts
@@ -25,16 +25,85 @@ The main function handles user authentication to ensure secure access to the sys
 
 """
 
+import argparse
+import atexit
+import csv
+import datetime
+import functools
+import io
+import json
+import keyword
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+import weakref
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 
+try:
+    import fcntl
+except ImportError:
+    # Advisory file locks are only available on POSIX; elsewhere only threads are synchronised
+    fcntl = None
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional; without it the grade engine falls back to the scalar methods
+    np = None
+
+try:
+    import zstandard
+except ImportError:
+    # zstandard is optional; without it archives can only use zlib
+    zstandard = None
+
+
+# Sentinel stored in the compact quiz array for a missing quiz score
+MISSING_SCORE = float("nan")
+
+# In-process locks shared by every School in this process, keyed by lock file path
+_subject_locks = {}
+_subject_locks_guard = threading.Lock()
+
+# Schools in write-behind mode, flushed when the interpreter exits so that
+# changes still waiting for the flush timer are not lost
+_write_behind_schools = weakref.WeakSet()
+
+
+# Function to write the pending changes of every write-behind school at exit
+@atexit.register
+def _flush_write_behind_schools():
+    for school in list(_write_behind_schools):
+        try:
+            school.flush()
+        except Exception as error:
+            print(f"Error: Could not write the saved changes: {error}")
 
 
 # Define a base class for students
 class Student:
+    # Slots keep student objects compact by leaving out the per-instance __dict__
+    __slots__ = ("_name", "_student_id", "_subject", "_cached_final_grade", "_school")
+
     def __init__(self, name, student_id, subject):
         # Initialize student attributes
         self._name = name
         self._student_id = student_id
         self._subject = subject
+        self._cached_final_grade = None  # Final grade, None until computed
+        self._school = None  # School notified when the grade changes and counting cache hits, set by School.add_student
 
     def __str__(self):
         # Return a string representation of the student
@@ -48,6 +117,26 @@ class Student:
     def print_info(self):
         raise NotImplementedError("Subclasses should implement print_info method.")
 
+    # Method to discard cached grades after an assessment score changes
+    def _invalidate_grade_cache(self):
+        self._cached_final_grade = None
+        if self._school is not None:
+            self._school._student_grade_changed(self)
+
+    # Methods to pickle students (e.g. for worker processes) without their school
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if hasattr(self, slot):
+                    state[slot] = getattr(self, slot)
+        state["_school"] = None
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
     # Getters for student attributes
     @property
     def name(self):
@@ -67,13 +156,26 @@ class Student:
 
 # Subclass for Math students
 class MathStudent(Student):
+    __slots__ = ("_quizzes", "_test1_score", "_test2_score", "_final_exam_score", "_cached_quiz_average")
+
+    # Maximum number of quizzes, set from the "repeat" of the quizzes field
+    max_quizzes = 5
+
+    # Weights of the assessment components in the final grade; a subjects.json
+    # entry for Math may override them
+    quizzes_weight = 0.15
+    test1_score_weight = 0.15
+    test2_score_weight = 0.15
+    final_exam_score_weight = 0.55
+
     def __init__(self, name, student_id):
         # Call the superclass constructor and set additional attributes for Math students
         super().__init__(name, student_id, "Math")
-        self._quizzes = []  # List to store quiz scores
+        self._quizzes = array("d")  # Compact array of quiz scores, NaN marks a missing quiz
         self._test1_score = 0   # Score for Test 1
         self._test2_score = 0   # Score for Test 2
         self._final_exam_score = 0  # Score for the final exam
+        self._cached_quiz_average = None    # Quiz average, None until computed
 
     # Method to add quiz score to the list of quizzes
     def add_quiz_score(self, score):
@@ -81,39 +183,77 @@ class MathStudent(Student):
         Adds a quiz score to the list of quizzes for the Math student.
 
         Parameters:
-            score (float): The score of the quiz to be added.
+            score (float): The score of the quiz to be added, or None for a missing quiz.
 
         Returns:
             None
         """
-        if len(self._quizzes) < 5:
-            self._quizzes.append(score)
+        if len(self._quizzes) < self.max_quizzes:
+            self._quizzes.append(MISSING_SCORE if score is None else score)
+            self._invalidate_grade_cache()
         else:
             print("Maximum number of quizzes reached.")
 
+    # Method to replace all quiz scores at once
+    def set_quiz_scores(self, scores):
+        """
+        Replaces the quiz scores of the Math student, keeping at most max_quizzes quizzes.
+
+        Parameters:
+            scores (list): The quiz scores, with None for a missing quiz.
+
+        Returns:
+            None
+        """
+        self._quizzes = array("d", [MISSING_SCORE if score is None else score for score in scores[:self.max_quizzes]])
+        self._invalidate_grade_cache()
+
     # Method to compute quiz average
     def compute_quiz_average(self):
         """
-        Computes the quiz average for the Math student.
+        Computes the quiz average for the Math student. The result is cached
+        until a quiz score is added.
 
         Returns:
             float: The quiz average.
         """
-        valid_quizzes = [quiz for quiz in self._quizzes if quiz is not None]
+        school = self._school
+        if self._cached_quiz_average is not None:
+            if school is not None:
+                school.grade_cache_hits += 1
+            return self._cached_quiz_average
+        if school is not None:
+            school.grade_cache_misses += 1
+
+        valid_quizzes = [quiz for quiz in self._quizzes if not math.isnan(quiz)]
         if not valid_quizzes:
-            return 0
-        return sum(valid_quizzes) / len(valid_quizzes)
+            quiz_average = 0
+        else:
+            quiz_average = sum(valid_quizzes) / len(valid_quizzes)
+        self._cached_quiz_average = quiz_average
+        return quiz_average
 
-    # Method to compute the final grade for Math students
+    # Method to compute final grade for Math student
     def compute_final_grade(self):
         """
         Computes the final grade for the Math student based on assessment components.
+        The result is cached until an assessment score changes.
 
         Returns:
             float: The final grade.
         """
+        school = self._school
+        if self._cached_final_grade is not None:
+            if school is not None:
+                school.grade_cache_hits += 1
+            return self._cached_final_grade
+        if school is not None:
+            school.grade_cache_misses += 1
+
         quiz_average = self.compute_quiz_average()
-        final_grade = quiz_average * 0.15 + self._test1_score * 0.15 + self._test2_score * 0.15 + self._final_exam_score * 0.55
+        final_grade = (quiz_average * self.quizzes_weight + self._test1_score * self.test1_score_weight
+                       + self._test2_score * self.test2_score_weight + self._final_exam_score * self.final_exam_score_weight)
+        self._cached_final_grade = final_grade
         return final_grade
 
     # Method to print Math student information
@@ -126,15 +266,62 @@ class MathStudent(Student):
         """
         quiz_average = self.compute_quiz_average()
         final_grade = self.compute_final_grade()
+        return f"{self}\nQuiz Average: {quiz_average}\nFinal Grade: {final_grade}\n"
 
-        report = f"{self}\n"
-        report += f"Quiz Average: {quiz_average}\n"
-        report += f"Final Grade: {final_grade}\n"
-        return report
+    # Method to discard cached grades after an assessment score changes
+    def _invalidate_grade_cache(self):
+        self._cached_quiz_average = None
+        super()._invalidate_grade_cache()
+
+    # Getter returning the quiz scores as a list, with None for missing quizzes
+    @property
+    def quizzes(self):
+        # Return the quiz scores of the student
+        return [None if math.isnan(quiz) else quiz for quiz in self._quizzes]
+
+    # Getters and setters for assessment scores; setting a score invalidates the cached grades
+    @property
+    def test1_score(self):
+        # Return the score for Test 1
+        return self._test1_score
+
+    @test1_score.setter
+    def test1_score(self, score):
+        self._test1_score = score
+        self._invalidate_grade_cache()
+
+    @property
+    def test2_score(self):
+        # Return the score for Test 2
+        return self._test2_score
+
+    @test2_score.setter
+    def test2_score(self, score):
+        self._test2_score = score
+        self._invalidate_grade_cache()
+
+    @property
+    def final_exam_score(self):
+        # Return the score for the final exam
+        return self._final_exam_score
+
+    @final_exam_score.setter
+    def final_exam_score(self, score):
+        self._final_exam_score = score
+        self._invalidate_grade_cache()
 
 
 # Subclass for History students
 class HistoryStudent(Student):
+    __slots__ = ("_attendance_score", "_project_score", "_exam1_score", "_exam2_score")
+
+    # Weights of the assessment components in the final grade; a subjects.json
+    # entry for History may override them
+    attendance_score_weight = 0.1
+    project_score_weight = 0.3
+    exam1_score_weight = 0.3
+    exam2_score_weight = 0.3
+
     def __init__(self, name, student_id):
         # Call the superclass constructor and set additional attributes for History students
         super().__init__(name, student_id, "History")
@@ -143,15 +330,26 @@ class HistoryStudent(Student):
         self._exam1_score = 0   # Score for Exam 1
         self._exam2_score = 0   # Score for Exam 2
 
-    # Method to compute the final grade for History students
+    # Method to compute final grade for History student
     def compute_final_grade(self):
         """
         Computes the final grade for the History student based on assessment components.
+        The result is cached until an assessment score changes.
 
         Returns:
             float: The final grade.
         """
-        final_grade = self._attendance_score * 0.1 + self._project_score * 0.3 + self._exam1_score * 0.3 + self._exam2_score * 0.3
+        school = self._school
+        if self._cached_final_grade is not None:
+            if school is not None:
+                school.grade_cache_hits += 1
+            return self._cached_final_grade
+        if school is not None:
+            school.grade_cache_misses += 1
+
+        final_grade = (self._attendance_score * self.attendance_score_weight + self._project_score * self.project_score_weight
+                       + self._exam1_score * self.exam1_score_weight + self._exam2_score * self.exam2_score_weight)
+        self._cached_final_grade = final_grade
         return final_grade
 
     # Method to print History student information
@@ -163,14 +361,61 @@ class HistoryStudent(Student):
             str: The formatted report with student information.
         """
         final_grade = self.compute_final_grade()
+        return f"{self}\nFinal Grade: {final_grade}\n"
 
-        report = f"{self}\n"
-        report += f"Final Grade: {final_grade}\n"
-        return report
+    # Getters and setters for assessment scores; setting a score invalidates the cached grade
+    @property
+    def attendance_score(self):
+        # Return the score for attendance
+        return self._attendance_score
+
+    @attendance_score.setter
+    def attendance_score(self, score):
+        self._attendance_score = score
+        self._invalidate_grade_cache()
+
+    @property
+    def project_score(self):
+        # Return the score for the project
+        return self._project_score
+
+    @project_score.setter
+    def project_score(self, score):
+        self._project_score = score
+        self._invalidate_grade_cache()
+
+    @property
+    def exam1_score(self):
+        # Return the score for Exam 1
+        return self._exam1_score
+
+    @exam1_score.setter
+    def exam1_score(self, score):
+        self._exam1_score = score
+        self._invalidate_grade_cache()
+
+    @property
+    def exam2_score(self):
+        # Return the score for Exam 2
+        return self._exam2_score
+
+    @exam2_score.setter
+    def exam2_score(self, score):
+        self._exam2_score = score
+        self._invalidate_grade_cache()
 
 
 # Subclass for English students
 class EnglishStudent(Student):
+    __slots__ = ("_attendance_score", "_final_exam_score", "_quiz1_score", "_quiz2_score")
+
+    # Weights of the assessment components in the final grade; a subjects.json
+    # entry for English may override them
+    attendance_score_weight = 0.1
+    final_exam_score_weight = 0.6
+    quiz1_score_weight = 0.15
+    quiz2_score_weight = 0.15
+
     def __init__(self, name, student_id):
         # Call the superclass constructor and set additional attributes for English students
         super().__init__(name, student_id, "English")
@@ -179,15 +424,26 @@ class EnglishStudent(Student):
         self._quiz1_score = 0   # Score for Quiz 1
         self._quiz2_score = 0   # Score for Quiz 2
 
-    # Method to compute the final grade for English students
+    # Method to compute final grade for English student
     def compute_final_grade(self):
         """
         Computes the final grade for the English student based on assessment components.
+        The result is cached until an assessment score changes.
 
         Returns:
             float: The final grade.
         """
-        final_grade = self._attendance_score * 0.1 + self._final_exam_score * 0.6 + self._quiz1_score * 0.15 + self._quiz2_score * 0.15
+        school = self._school
+        if self._cached_final_grade is not None:
+            if school is not None:
+                school.grade_cache_hits += 1
+            return self._cached_final_grade
+        if school is not None:
+            school.grade_cache_misses += 1
+
+        final_grade = (self._attendance_score * self.attendance_score_weight + self._final_exam_score * self.final_exam_score_weight
+                       + self._quiz1_score * self.quiz1_score_weight + self._quiz2_score * self.quiz2_score_weight)
+        self._cached_final_grade = final_grade
         return final_grade
 
     # Method to print English student information
@@ -196,207 +452,4210 @@ class EnglishStudent(Student):
         Generates a detailed report of English student information.
 
         Returns:
-            str: The formatted report with student information.
+            str: The formatted report with student information.
+        """
+        final_grade = self.compute_final_grade()
+        return f"{self}\nFinal Grade: {final_grade}\n"
+
+    # Getters and setters for assessment scores; setting a score invalidates the cached grade
+    @property
+    def attendance_score(self):
+        # Return the score for attendance
+        return self._attendance_score
+
+    @attendance_score.setter
+    def attendance_score(self, score):
+        self._attendance_score = score
+        self._invalidate_grade_cache()
+
+    @property
+    def final_exam_score(self):
+        # Return the score for the final exam
+        return self._final_exam_score
+
+    @final_exam_score.setter
+    def final_exam_score(self, score):
+        self._final_exam_score = score
+        self._invalidate_grade_cache()
+
+    @property
+    def quiz1_score(self):
+        # Return the score for Quiz 1
+        return self._quiz1_score
+
+    @quiz1_score.setter
+    def quiz1_score(self, score):
+        self._quiz1_score = score
+        self._invalidate_grade_cache()
+
+    @property
+    def quiz2_score(self):
+        # Return the score for Quiz 2
+        return self._quiz2_score
+
+    @quiz2_score.setter
+    def quiz2_score(self, score):
+        self._quiz2_score = score
+        self._invalidate_grade_cache()
+
+
+# Base class of the student classes generated for subjects defined only in the configuration
+class ConfiguredStudent(Student):
+    __slots__ = ()
+
+    # Name of the subject, and (slot, weight) pairs of the weighted scores in
+    # configuration order; both are set on each generated class
+    subject_name = None
+    score_weights = ()
+
+    def __init__(self, name, student_id):
+        super().__init__(name, student_id, self.subject_name)
+        for slot in self.__slots__:
+            setattr(self, slot, 0)
+
+    # Method to compute final grade from the configured weights
+    def compute_final_grade(self):
+        """
+        Computes the final grade by adding the weighted scores in configuration order.
+        The result is cached until an assessment score changes.
+
+        Returns:
+            float: The final grade.
+        """
+        school = self._school
+        if self._cached_final_grade is not None:
+            if school is not None:
+                school.grade_cache_hits += 1
+            return self._cached_final_grade
+        if school is not None:
+            school.grade_cache_misses += 1
+
+        final_grade = 0
+        for slot, weight in self.score_weights:
+            final_grade += getattr(self, slot) * weight
+        self._cached_final_grade = final_grade
+        return final_grade
+
+    # Method to print the student's information
+    def print_info(self):
+        """
+        Generates a detailed report of the student's information.
+
+        Returns:
+            str: The formatted report with student information.
+        """
+        final_grade = self.compute_final_grade()
+        return f"{self}\nFinal Grade: {final_grade}\n"
+
+
+# Built-in subjects, in the same format as the entries of the subject configuration
+BUILTIN_SUBJECTS = {
+    "Math": {
+        "class": "MathStudent",
+        "file": "mathstudent.txt",
+        "scores": [
+            {"name": "quizzes", "repeat": 5, "item": "quiz"},
+            {"name": "test1_score", "label": "Test 1", "optional": True},
+            {"name": "test2_score", "label": "Test 2", "optional": True},
+            {"name": "final_exam_score", "label": "Final Exam", "optional": True},
+        ],
+        "weights": {"quizzes": 0.15, "test1_score": 0.15, "test2_score": 0.15, "final_exam_score": 0.55},
+    },
+    "History": {
+        "class": "HistoryStudent",
+        "file": "historystudent.txt",
+        "scores": [
+            {"name": "attendance_score", "label": "Attendance"},
+            {"name": "project_score", "label": "Project"},
+            {"name": "exam1_score", "label": "Exam 1"},
+            {"name": "exam2_score", "label": "Exam 2"},
+        ],
+        "weights": {"attendance_score": 0.1, "project_score": 0.3, "exam1_score": 0.3, "exam2_score": 0.3},
+    },
+    "English": {
+        "class": "EnglishStudent",
+        "file": "englishstudent.txt",
+        "scores": [
+            {"name": "attendance_score", "label": "Attendance"},
+            {"name": "final_exam_score", "label": "Final Exam"},
+            {"name": "quiz1_score", "label": "Quiz 1"},
+            {"name": "quiz2_score", "label": "Quiz 2"},
+        ],
+        "weights": {"attendance_score": 0.1, "final_exam_score": 0.6, "quiz1_score": 0.15, "quiz2_score": 0.15},
+    },
+}
+
+# Path of the optional subject configuration, which adds subjects or replaces built-in
+# ones; set with the SCHOOL_SUBJECTS environment variable, in which case it must exist
+SUBJECTS_CONFIG_PATH = os.environ.get("SCHOOL_SUBJECTS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "subjects.json"))
+SUBJECTS_CONFIG_REQUIRED = "SCHOOL_SUBJECTS" in os.environ
+
+
+# Subject definition compiled from a built-in or configured subject entry
+class SubjectDefinition:
+    def __init__(self, subject, config):
+        """
+        Builds a subject from its built-in or configured entry: its student
+        class, score fields, record layout and grade weights. The layout is
+        compiled once into plain Python functions (parse, format, to_row,
+        from_columns, from_values, combine and parse_lines), so handling a
+        record only touches fixed positions and slots. The weights are set on
+        the student class, whose compute_final_grade applies them.
+
+        Parameters:
+            subject (str): The name of the subject.
+            config (dict): The subject's entry in the configuration.
+
+        Raises:
+            ValueError: If the entry is malformed; it is checked before any code is generated from it.
+        """
+        self._validate_config(subject, config)
+        self.subject = subject
+        self.file_path = config["file"]
+        base_path = os.path.splitext(self.file_path)[0]
+        self.journal_path = base_path + ".journal"
+        self.binary_file_path = base_path + ".bin"
+        self.index_path = base_path + ".idx"
+
+        # Score fields in record order; a repeated field holds up to "repeat" scores in an array
+        self.scores = [dict(score) for score in config["scores"]]
+        self.weights = [(name, float(weight)) for name, weight in config["weights"].items()]
+
+        names = [score["name"] for score in self.scores]
+        for name, _ in self.weights:
+            if name not in names:
+                raise ValueError(f"Weight for unknown score '{name}' in subject {subject}.")
+
+        # Fields accepted by imports, and columns of the binary files and database tables
+        import_fields = []
+        columns = []
+        optional_columns = []
+        for score in self.scores:
+            if "repeat" in score:
+                items = [f"{score['item']}{number}" for number in range(1, score["repeat"] + 1)]
+                import_fields += items
+                columns += [f"{score['item']}_count"] + items
+                optional_columns += items
+            else:
+                import_fields.append(score["name"])
+                columns.append(score["name"])
+        self.import_fields = tuple(import_fields)
+        self.columns = tuple(columns)
+        self.optional_columns = tuple(optional_columns)
+
+        self.student_class = self._student_class(config.get("class"))
+        self._compile()
+        self._compile_line_parser()
+
+    # Helper method checking every value of a subject's entry that ends up in generated code
+    @staticmethod
+    def _validate_config(subject, config):
+        # Subject names also name the generated classes and the SQLite tables
+        if not isinstance(subject, str) or not subject.replace(" ", "_").isidentifier():
+            raise ValueError(f"Invalid subject name {subject!r}; use letters, digits, underscores and spaces.")
+        if not isinstance(config, dict):
+            raise ValueError(f"The entry of subject {subject} must be an object.")
+        if not isinstance(config.get("file"), str) or not config["file"]:
+            raise ValueError(f"Subject {subject} needs a file name.")
+        if "class" in config and not (isinstance(config["class"], str) and config["class"].isidentifier()):
+            raise ValueError(f"Invalid class name {config['class']!r} in subject {subject}.")
+        if not isinstance(config.get("scores"), list) or not all(isinstance(score, dict) for score in config["scores"]):
+            raise ValueError(f"Subject {subject} needs a list of scores.")
+        if not isinstance(config.get("weights"), dict):
+            raise ValueError(f"Subject {subject} needs an object of weights.")
+
+        names = set()
+        for score in config["scores"]:
+            name = score.get("name")
+            # Score names become slots, properties and parameters of the generated functions
+            if not isinstance(name, str) or not name.isidentifier() or keyword.iskeyword(name):
+                raise ValueError(f"Invalid score name {name!r} in subject {subject}.")
+            if name in names:
+                raise ValueError(f"Duplicate score '{name}' in subject {subject}.")
+            names.add(name)
+            if "repeat" in score:
+                repeat = score["repeat"]
+                if not isinstance(repeat, int) or isinstance(repeat, bool) or repeat < 1:
+                    raise ValueError(f"The repeat count of score '{name}' in subject {subject} must be a positive integer.")
+                item = score.get("item")
+                if not isinstance(item, str) or not item.isidentifier():
+                    raise ValueError(f"Invalid item name {item!r} of score '{name}' in subject {subject}.")
+        for name, weight in config["weights"].items():
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not math.isfinite(weight):
+                raise ValueError(f"The weight of score '{name}' in subject {subject} must be a number.")
+
+    # Helper method finding the subject's hand-written student class or generating one
+    def _student_class(self, class_name):
+        existing = globals().get(class_name) if class_name else None
+        if isinstance(existing, type) and issubclass(existing, Student):
+            for score in self.scores:
+                if not hasattr(existing, "_" + score["name"]):
+                    raise ValueError(f"{class_name} has no attribute for score '{score['name']}'.")
+                if not hasattr(existing, score["name"] + "_weight"):
+                    raise ValueError(f"{class_name} has no weight for score '{score['name']}'.")
+            # The hand-written compute_final_grade reads the weights from the class;
+            # a score left out of the weights counts for nothing
+            weights = dict(self.weights)
+            for score in self.scores:
+                setattr(existing, score["name"] + "_weight", weights.get(score["name"], 0.0))
+            return existing
+
+        if any("repeat" in score for score in self.scores):
+            raise ValueError(f"Subject {self.subject} has repeated scores, which need a hand-written student class.")
+        class_name = class_name or f"{self.subject.replace(' ', '')}Student"
+        attributes = {"__slots__": tuple("_" + score["name"] for score in self.scores), "__module__": __name__,
+                      "subject_name": self.subject, "score_weights": tuple(("_" + name, weight) for name, weight in self.weights)}
+        for score in self.scores:
+            attributes[score["name"]] = self._score_property("_" + score["name"])
+        student_class = type(class_name, (ConfiguredStudent,), attributes)
+        # Register the class at module level so its students can be pickled
+        globals()[class_name] = student_class
+        return student_class
+
+    # Helper method creating a score property whose setter invalidates the cached grade
+    @staticmethod
+    def _score_property(attribute):
+        def get_score(student):
+            return getattr(student, attribute)
+
+        def set_score(student, score):
+            setattr(student, attribute, score)
+            student._invalidate_grade_cache()
+
+        return property(get_score, set_score)
+
+    # Helper method generating the source of the subject's functions and compiling them
+    def _compile(self):
+        subject = self.subject
+        count = 3 + sum(score.get("repeat", 1) for score in self.scores)
+        # A record's scores are read only if it has every field up to the last required one
+        required = 3
+        position = 3
+        for score in self.scores:
+            position += score.get("repeat", 1)
+            if not score.get("optional"):
+                required = position
+
+        parse = ["def parse(fields):", "    student = cls(fields[1], int(fields[2]))", f"    if len(fields) >= {required}:"]
+        record = [subject.replace("{", "{{").replace("}", "}}"), "{student._name}", "{student._student_id}"]
+        to_row = ["def to_row(student):", "    row = []"]
+        from_columns = ["def from_columns(name, student_id, columns, row):", "    student = cls(name, student_id)"]
+        from_values = ["def from_values(name, student_id, values):", "    student = cls(name, student_id)"]
+
+        position = 3
+        column = 0
+        for score in self.scores:
+            attribute = "student._" + score["name"]
+            if "repeat" in score:
+                repeat = score["repeat"]
+                parse.append(f"        {attribute} = array('d', [float(score) if score else MISSING_SCORE for score in fields[{position}:{position + repeat}]])")
+                record.append(f"{{join_scores({attribute})}}")
+                to_row += [f"    scores = list({attribute}[:{repeat}])",
+                           f"    row += [len(scores)] + scores + [MISSING_SCORE] * ({repeat} - len(scores))"]
+                from_columns += [f"    count = int(columns[{column}][row])",
+                                 f"    {attribute} = array('d', [columns[{column + 1} + item][row] for item in range(count)])"]
+                from_values += [f"    count = int(values[{column}])",
+                                f"    {attribute} = array('d', [MISSING_SCORE if score is None else score for score in values[{column + 1}:{column + 1} + count]])"]
+                position += repeat
+                column += 1 + repeat
+            else:
+                if score.get("optional"):
+                    parse.append(f"        {attribute} = float(fields[{position}]) if len(fields) > {position} and fields[{position}] else 0")
+                else:
+                    parse.append(f"        {attribute} = float(fields[{position}])")
+                record.append(f"{{{attribute}}}")
+                to_row.append(f"    row.append({attribute})")
+                from_columns.append(f"    {attribute} = columns[{column}][row]")
+                from_values.append(f"    {attribute} = values[{column}]")
+                position += 1
+                column += 1
+        parse.append("    return student")
+        to_row.append("    return row")
+        from_columns.append("    return student")
+        from_values.append("    return student")
+        format_record = ["def format(student):", f"    return f{','.join(record)!r}"]
+
+        # The grade engine adds the weighted components from left to right in configuration order
+        combine = [f"def combine({', '.join(name for name, _ in self.weights)}):",
+                   f"    return {' + '.join(f'{name} * {weight!r}' for name, weight in self.weights) or '0'}"]
+
+        namespace = {"cls": self.student_class, "array": array, "MISSING_SCORE": MISSING_SCORE, "join_scores": _join_scores}
+        functions = [parse, format_record, to_row, from_columns, from_values, combine]
+        source = "\n\n".join("\n".join(lines) for lines in functions)
+        exec(compile(source, f"<subject {subject}>", "exec"), namespace)
+
+        self.source = source
+        self.parse = namespace["parse"]
+        self.format = namespace["format"]
+        self.to_row = namespace["to_row"]
+        self.from_columns = namespace["from_columns"]
+        self.from_values = namespace["from_values"]
+        self.combine = namespace["combine"]
+        self.field_count = count
+        self.required_field_count = required
+
+        for score in self.scores:
+            if "repeat" in score:
+                setattr(self.student_class, f"max_{score['name']}", score["repeat"])
+
+
+    # Helper method compiling parse_lines, the validating parser of whole subject files
+    def _compile_line_parser(self):
+        """
+        Compiles parse_lines(lines, errors), a generator yielding the students
+        of a subject file's lines. Complete records are built inline, assigning
+        every slot directly instead of calling the constructor and parse, and
+        rows that fail validation, including scores that are not numbers
+        between 0 and 100, are reported in errors instead of raising.
+        """
+        subject = self.subject
+        student_class = self.student_class
+        count = self.field_count
+
+        # Slots outside the record take the defaults of a freshly constructed
+        # student; a default that is not a constant means using the constructor
+        record_slots = {"_name", "_student_id", "_subject"} | {"_" + score["name"] for score in self.scores}
+        prototype = student_class("", 0)
+        defaults = []
+        inline = True
+        for cls in student_class.__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if slot in record_slots:
+                    continue
+                value = getattr(prototype, slot, None)
+                if value is not None and not isinstance(value, (bool, int, float, str)):
+                    inline = False
+                defaults.append(f"                student.{slot} = {value!r}")
+
+        if inline:
+            build = ["                student = new(cls)",
+                     "                student._name = fields[1]",
+                     "                student._student_id = int(fields[2])",
+                     f"                student._subject = {subject!r}"] + defaults
+        else:
+            build = ["                student = cls(fields[1], int(fields[2]))"]
+        position = 3
+        for score in self.scores:
+            attribute = "student._" + score["name"]
+            if "repeat" in score:
+                repeat = score["repeat"]
+                # Convert and range-check in C with map(), min(), max() and sum() unless
+                # some scores are missing; the sum is NaN if any score is
+                build += [f"                scores = fields[{position}:{position + repeat}]",
+                          "                if all(scores):",
+                          "                    values = array('d', map(float, scores))",
+                          "                    total = sum(values)",
+                          "                    if total != total or min(values) < 0 or max(values) > 100:",
+                          "                        raise ValueError",
+                          "                else:",
+                          "                    values = array('d', [float(score) if score else MISSING_SCORE for score in scores])",
+                          "                    if not all(0 <= value <= 100 for value, score in zip(values, scores) if score):",
+                          "                        raise ValueError",
+                          f"                {attribute} = values"]
+                position += repeat
+            else:
+                if score.get("optional"):
+                    build.append(f"                value = float(fields[{position}]) if fields[{position}] else 0")
+                else:
+                    build.append(f"                value = float(fields[{position}])")
+                # Also rejects NaN, which fails every comparison
+                build += ["                if not 0 <= value <= 100:",
+                          "                    raise ValueError",
+                          f"                {attribute} = value"]
+                position += 1
+
+        # Complete records take the inline path; anything else is checked field
+        # by field, then parsed like a single record
+        source = "\n".join([
+            "def parse_lines(lines, errors, number=0):",
+            "    new = object.__new__",
+            "    for line in lines:",
+            "        number += 1",
+            "        fields = line.strip().split(',')",
+            "        try:",
+            f"            if len(fields) == {count} and fields[0] == {subject!r}:",
+            *build,
+            "            elif len(fields) == 1 and not fields[0]:",
+            "                continue",
+            "            else:",
+            "                problem = describe_error(fields)",
+            "                if problem is not None:",
+            "                    errors.append(f'Line {number}: {problem}')",
+            "                    continue",
+            "                student = parse(fields)",
+            "        except ValueError:",
+            "            errors.append(f'Line {number}: {describe_error(fields) or \"Invalid record.\"}')",
+            "            continue",
+            "        yield student",
+        ])
+        namespace = {"cls": student_class, "array": array, "MISSING_SCORE": MISSING_SCORE,
+                     "parse": self.parse, "describe_error": self.describe_record_error}
+        exec(compile(source, f"<subject {subject} line parser>", "exec"), namespace)
+        self.source += "\n\n" + source
+        self.parse_lines = namespace["parse_lines"]
+
+    # Method to explain why a record of the subject is malformed
+    def describe_record_error(self, fields):
+        """
+        Checks the fields of one record against the subject's layout.
+
+        Parameters:
+            fields (list): The fields of the record, split on commas.
+
+        Returns:
+            str or None: A description of the first problem found, or None if the record is valid.
+        """
+        if len(fields) < 3:
+            return f"Expected at least 3 fields, found {len(fields)}."
+        if fields[0] != self.subject:
+            return f"Expected a {self.subject} record, found '{fields[0]}'."
+        if len(fields) > self.field_count:
+            return f"Expected at most {self.field_count} fields, found {len(fields)}."
+        try:
+            int(fields[2])
+        except ValueError:
+            return f"Invalid student ID '{fields[2]}'."
+        if len(fields) < self.required_field_count:
+            # Records without every required score are read without their scores
+            return None
+
+        position = 3
+        for score in self.scores:
+            labels = ([f"{score['item'].capitalize()} {number}" for number in range(1, score["repeat"] + 1)]
+                      if "repeat" in score else [score.get("label", score["name"])])
+            for label in labels:
+                if position >= len(fields):
+                    return None
+                value = fields[position]
+                position += 1
+                if not value and ("repeat" in score or score.get("optional")):
+                    continue
+                try:
+                    number = float(value)
+                except ValueError:
+                    return f"Invalid {label} score '{value}' in field {position}."
+                if not 0 <= number <= 100:
+                    return f"{label} score '{value}' in field {position} should be between 0 and 100."
+        return None
+
+
+# Helper function joining repeated scores for a record, leaving missing ones blank
+def _join_scores(scores):
+    return ",".join("" if math.isnan(score) else str(score) for score in scores)
+
+
+# Helper function returning the function compressing archive chunks with a codec
+def _archive_compressor(codec, level=None):
+    if codec == "zlib":
+        level = zlib.Z_DEFAULT_COMPRESSION if level is None else level
+        return lambda data: zlib.compress(data, level)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("The zstd codec needs the zstandard package.")
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+# Helper function returning the function decompressing archive chunks of a codec
+def _archive_decompressor(codec):
+    if codec == "zlib":
+        return zlib.decompress
+    if zstandard is None:
+        raise ValueError("Reading a zstd archive needs the zstandard package.")
+    return zstandard.ZstdDecompressor().decompress
+
+
+# Helper function forcing a rename or removal in a directory to disk, where the platform allows it
+def _fsync_directory(directory):
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+# Helper function cutting off a final record left without its newline by an
+# interrupted append; the journal is open in binary append and read mode
+def _truncate_torn_record(journal):
+    end = journal.seek(0, os.SEEK_END)
+    if not end:
+        return
+    journal.seek(end - 1)
+    if journal.read(1) == b"\n":
+        return
+    position = end
+    while position:
+        start = max(position - 4096, 0)
+        journal.seek(start)
+        newline = journal.read(position - start).rfind(b"\n")
+        if newline != -1:
+            journal.truncate(start + newline + 1)
+            return
+        position = start
+    journal.truncate(0)
+
+
+# Function to load and compile the subject definitions
+def load_subject_definitions(file_path=SUBJECTS_CONFIG_PATH, required=SUBJECTS_CONFIG_REQUIRED):
+    """
+    Compiles the built-in subjects together with the subject configuration, if any.
+    Each entry of the configuration adds a subject or replaces the built-in one of
+    the same name.
+
+    Parameters:
+        file_path (str): The path of the JSON configuration.
+        required (bool): Whether a missing configuration is an error rather than
+            leaving only the built-in subjects.
+
+    Returns:
+        dict: A mapping of subject name to SubjectDefinition, built-in subjects first.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not valid JSON or describes a subject wrongly.
+    """
+    subjects = dict(BUILTIN_SUBJECTS)
+    if required or os.path.exists(file_path):
+        with open(file_path, "r") as file:
+            config = json.load(file)
+        if not isinstance(config, dict):
+            raise ValueError("The configuration must be an object mapping subject names to subjects.")
+        subjects.update(config)
+    return {subject: SubjectDefinition(subject, entry) for subject, entry in subjects.items()}
+
+
+# Compiled definitions of every subject. An unreadable or invalid configuration
+# leaves no subjects, so the module still imports; School then refuses to start
+# with SUBJECT_CONFIG_ERROR, which explains the problem
+try:
+    SUBJECT_DEFINITIONS = load_subject_definitions()
+    SUBJECT_CONFIG_ERROR = None
+except (OSError, ValueError) as error:
+    SUBJECT_DEFINITIONS = {}
+    SUBJECT_CONFIG_ERROR = f"Cannot load the subject configuration {SUBJECTS_CONFIG_PATH}: {error}"
+
+
+# Columnar grade engine computing the grades of many students in one pass
+class GradeEngine:
+    def __init__(self, students):
+        # Group the students by subject so each subject's components can be stored as columns
+        self._students_by_subject = {}
+        for student in students:
+            self._students_by_subject.setdefault(student.subject, []).append(student)
+        self._math_students = [student for student in students if isinstance(student, MathStudent)]
+
+    # Method to compute the quiz average of every Math student
+    def compute_quiz_averages(self):
+        """
+        Computes the quiz average of every Math student in one vectorized pass.
+
+        Missing quizzes (NaN) are masked out exactly like in
+        MathStudent.compute_quiz_average.
+
+        Returns:
+            dict: A mapping of student ID to quiz average.
+        """
+        students = self._math_students
+        if np is None or not students:
+            return {student.student_id: student.compute_quiz_average() for student in students}
+
+        averages = self._masked_averages(students, "_quizzes")
+        return dict(zip((student.student_id for student in students), averages.tolist()))
+
+    # Method to compute the final grade of every student
+    def compute_final_grades(self):
+        """
+        Computes the final grade of every student in one vectorized pass per subject.
+
+        Each subject's columns are combined by the function compiled from its
+        weights, which applies them in the same order as the scalar grade
+        function, so the results match compute_final_grade exactly.
+
+        Returns:
+            dict: A mapping of student ID to final grade.
+        """
+        final_grades = {}
+        for subject, students in self._students_by_subject.items():
+            definition = SUBJECT_DEFINITIONS.get(subject)
+            if np is None or definition is None:
+                final_grades.update((student.student_id, student.compute_final_grade()) for student in students)
+                continue
+
+            columns = []
+            for name, _ in definition.weights:
+                score = next(score for score in definition.scores if score["name"] == name)
+                if "repeat" in score:
+                    columns.append(self._masked_averages(students, "_" + name))
+                else:
+                    columns.append(self._column(students, "_" + name))
+            grades = definition.combine(*columns)
+            final_grades.update(zip((student.student_id for student in students), grades.tolist()))
+        return final_grades
+
+    # Helper method to gather one assessment component into a NumPy column
+    @staticmethod
+    def _column(students, attribute):
+        return np.fromiter((getattr(student, attribute) for student in students), dtype=np.float64, count=len(students))
+
+    # Helper method to compute the masked averages of a repeated score, such as the Math quizzes
+    @staticmethod
+    def _masked_averages(students, attribute):
+        arrays = [getattr(student, attribute) for student in students]
+        width = max(len(scores) for scores in arrays)
+        values = np.full((len(students), width), np.nan)
+        for row, scores in enumerate(arrays):
+            if scores:
+                values[row, :len(scores)] = np.frombuffer(scores, dtype=np.float64)
+
+        valid = ~np.isnan(values)
+        # Sum the scores column by column so the additions happen in the same
+        # order as the built-in sum() used by the scalar method
+        total = np.zeros(len(students))
+        for column in range(width):
+            total += np.where(valid[:, column], values[:, column], 0.0)
+        count = valid.sum(axis=1)
+        return np.where(count > 0, total / np.maximum(count, 1), 0.0)
+
+
+# Running statistics of the final grades in one subject
+class SubjectStatistics:
+    # Width of each histogram bucket; grades of 100 fall in the last bucket
+    BUCKET_WIDTH = 10
+
+    def __init__(self):
+        self.count = 0
+        self._total = 0.0
+        self._total_squares = 0.0
+        self.histogram = [0] * (100 // self.BUCKET_WIDTH)
+        # Number of students per exact grade, used to keep min/max correct after removals
+        self._grade_counts = {}
+        self._minimum = None
+        self._maximum = None
+        self._bounds_stale = False
+
+    # Method to add a grade to the statistics
+    def add(self, grade):
+        """
+        Adds a final grade to the running statistics in O(1). NaN and
+        infinite grades are left out.
+
+        Parameters:
+            grade (float): The final grade to add.
+
+        Returns:
+            None
+        """
+        if not math.isfinite(grade):
+            return
+        self.count += 1
+        self._total += grade
+        self._total_squares += grade * grade
+        self.histogram[self._bucket(grade)] += 1
+        self._grade_counts[grade] = self._grade_counts.get(grade, 0) + 1
+        if not self._bounds_stale:
+            if self._minimum is None or grade < self._minimum:
+                self._minimum = grade
+            if self._maximum is None or grade > self._maximum:
+                self._maximum = grade
+
+    # Method to remove a grade from the statistics
+    def remove(self, grade):
+        """
+        Removes a final grade from the running statistics in O(1).
+
+        Parameters:
+            grade (float): The final grade to remove.
+
+        Returns:
+            None
+        """
+        if not math.isfinite(grade):
+            return
+        self.count -= 1
+        self._total -= grade
+        self._total_squares -= grade * grade
+        self.histogram[self._bucket(grade)] -= 1
+        remaining = self._grade_counts[grade] - 1
+        if remaining:
+            self._grade_counts[grade] = remaining
+        else:
+            del self._grade_counts[grade]
+            # The minimum or maximum only needs recomputing if its last occurrence left
+            if grade == self._minimum or grade == self._maximum:
+                self._bounds_stale = True
+        if not self.count:
+            self._total = self._total_squares = 0.0
+
+    # Method to summarise the statistics
+    def summary(self):
+        """
+        Summarises the running statistics.
+
+        Returns:
+            dict: The count, mean, variance, minimum, maximum and histogram of the grades.
+        """
+        if self._bounds_stale:
+            self._minimum = min(self._grade_counts, default=None)
+            self._maximum = max(self._grade_counts, default=None)
+            self._bounds_stale = False
+
+        if not self.count:
+            return {"count": 0, "mean": None, "variance": None, "minimum": None, "maximum": None, "histogram": list(self.histogram)}
+        mean = self._total / self.count
+        variance = max(self._total_squares / self.count - mean * mean, 0.0)
+        return {
+            "count": self.count,
+            "mean": mean,
+            "variance": variance,
+            "minimum": self._minimum,
+            "maximum": self._maximum,
+            "histogram": list(self.histogram),
+        }
+
+    # Method to combine the summaries of several disjoint groups of students
+    @staticmethod
+    def merge_summaries(summaries):
+        """
+        Combines summaries of disjoint groups of grades, such as the shards of
+        a sharded school, into the summary of all of them.
+
+        Parameters:
+            summaries (iterable): Dictionaries returned by summary().
+
+        Returns:
+            dict: The combined count, mean, variance, minimum, maximum and histogram.
+        """
+        summaries = [summary for summary in summaries if summary["count"]]
+        histogram = [0] * (100 // SubjectStatistics.BUCKET_WIDTH)
+        for summary in summaries:
+            histogram = [total + count for total, count in zip(histogram, summary["histogram"])]
+        count = sum(summary["count"] for summary in summaries)
+        if not count:
+            return {"count": 0, "mean": None, "variance": None, "minimum": None, "maximum": None, "histogram": histogram}
+
+        # Combine the means, and the variances through each group's mean of squares
+        mean = sum(summary["mean"] * summary["count"] for summary in summaries) / count
+        squares = sum((summary["variance"] + summary["mean"] ** 2) * summary["count"] for summary in summaries) / count
+        return {
+            "count": count,
+            "mean": mean,
+            "variance": max(squares - mean * mean, 0.0),
+            "minimum": min(summary["minimum"] for summary in summaries),
+            "maximum": max(summary["maximum"] for summary in summaries),
+            "histogram": histogram,
+        }
+
+    # Helper method to find the histogram bucket of a grade
+    def _bucket(self, grade):
+        # Grades outside 0-100, including infinities and NaN, go to the nearest end
+        if not grade >= 0:
+            return 0
+        if grade >= 100:
+            return len(self.histogram) - 1
+        return int(grade // self.BUCKET_WIDTH)
+
+
+# Prefix and typo-tolerant search index over student names
+class NameIndex:
+    """
+    Prefix and typo-tolerant search over the distinct names of a roster.
+
+    Names are normalised (case-folded, whitespace collapsed) and split into
+    words. Each distinct word keeps the IDs of the names containing it, and
+    the distinct words are indexed twice: in a sorted list for prefix
+    lookups with bisect, and by their trigrams, padded with "$" at both
+    ends, for typo-tolerant lookups. Rosters repeat first names and
+    surnames heavily, so both word indexes stay small even for millions of
+    names. Adding a name only queues it; the queue is indexed by the next
+    search, so bulk loads do not pay for the index until it is used. Names
+    are never removed: a name matches only while the is_live callback
+    passed to search() accepts it, so a removed name that comes back needs
+    no reindexing.
+    """
+
+    # Maximum number of fuzzy candidate words whose edit distance is computed per query word
+    FUZZY_CANDIDATES = 200
+
+    def __init__(self):
+        # Name ID -> name, and name -> name ID
+        self._names = []
+        self._ids = {}
+        # Names added since the last search
+        self._pending = []
+        # Word -> word ID, word ID -> word and word ID -> IDs of the names containing it
+        self._word_ids = {}
+        self._words = []
+        self._word_names = []
+        # Distinct words in alphabetical order, and trigram -> IDs of the words containing it
+        self._sorted_words = []
+        self._trigrams = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    # Method to add a name to the index
+    def add(self, name):
+        """
+        Queues a name for indexing in O(1); names already known are ignored.
+
+        Parameters:
+            name (str): The name to add.
+
+        Returns:
+            None
+        """
+        if name not in self._ids:
+            self._ids[name] = len(self._names)
+            self._names.append(name)
+            self._pending.append(name)
+
+    # Method to search the index
+    def search(self, query, limit=10, is_live=None):
+        """
+        Finds the names best matching a query. A name matches exactly when
+        the query's words appear in it consecutively, the last one possibly
+        only as a prefix, so "ali" and "alice wi" both find "Alice
+        Winchester". These names come first, in alphabetical order of the
+        matched word. The rest of the results are within a few typos
+        (insertions, deletions, substitutions or swapped neighbours) of
+        such a match, closest first: one typo in words of up to five
+        characters and two in longer ones, and two in the whole query.
+
+        Parameters:
+            query (str): The whole or partial name to search for.
+            limit (int): The maximum number of names to return.
+            is_live (callable): Returns whether a name may be returned; all names are by default.
+
+        Returns:
+            list: Up to limit matching names, best match first.
+        """
+        query = self.normalize(query)
+        if not query or limit <= 0:
+            return []
+        self._index_pending()
+        words = query.split(" ")
+        results = []
+        found = set()
+
+        # Exact matches: expand the prefix of the last word and confirm the
+        # phrase, starting from the query word that occurs in the fewest names
+        matches = [{self._word_ids[word]: 0} if word in self._word_ids else {} for word in words[:-1]]
+        matches.append(dict.fromkeys(self._prefixed_words(words[-1]), 0))
+        phrase = f" {query}"
+        for name_id in self._candidate_names(matches):
+            name = self._names[name_id]
+            if name_id in found:
+                continue
+            if (len(words) == 1 or f" {self.normalize(name)}".find(phrase) != -1) and (is_live is None or is_live(name)):
+                found.add(name_id)
+                results.append(name)
+                if len(results) == limit:
+                    return results
+
+        # Fuzzy matches: every query word within the tolerance of some word
+        # of the name, ranked by the total edit distance
+        tolerance = self._tolerance(query)
+        matches = [self._similar_words(word, min(tolerance, self._tolerance(word)), prefix=position == len(words) - 1)
+                   for position, word in enumerate(words)]
+        ranked = [[] for _ in range(tolerance + 1)]
+        for name_id, anchor_distance in self._candidate_names(matches, with_distance=True):
+            # Names met later are at least this far, so the closer ranks are complete
+            if sum(len(names) for names in ranked[:anchor_distance]) >= limit - len(results):
+                break
+            if name_id in found:
+                continue
+            found.add(name_id)
+            name = self._names[name_id]
+            name_words = [self._word_ids[word] for word in self.normalize(name).split(" ")]
+            distance = 0
+            for similar in matches:
+                distance += min((similar[word_id] for word_id in name_words if word_id in similar), default=tolerance + 1)
+            if distance <= tolerance and (is_live is None or is_live(name)):
+                ranked[distance].append(name)
+        for names in ranked:
+            results.extend(names[:limit - len(results)])
+        return results
+
+    # Method to normalise a name or query
+    @staticmethod
+    def normalize(text):
+        """
+        Case-folds a name and collapses its whitespace.
+
+        Parameters:
+            text (str): The name or query.
+
+        Returns:
+            str: The normalised text.
+        """
+        return " ".join(text.casefold().split())
+
+    # Helper method returning the number of typos tolerated in a query or query word
+    @staticmethod
+    def _tolerance(text):
+        return 1 if len(text) <= 5 else 2
+
+    # Helper method indexing the names added since the last search
+    def _index_pending(self):
+        if not self._pending:
+            return
+        new_words = []
+        for name in self._pending:
+            name_id = self._ids[name]
+            for word in set(self.normalize(name).split(" ")):
+                word_id = self._word_ids.get(word)
+                if word_id is None:
+                    word_id = self._word_ids[word] = len(self._words)
+                    self._words.append(word)
+                    self._word_names.append(array("i"))
+                    new_words.append(word)
+                    padded = f"$${word}$"
+                    for i in range(len(padded) - 2):
+                        self._trigrams.setdefault(padded[i:i + 3], array("i")).append(word_id)
+                self._word_names[word_id].append(name_id)
+        self._pending.clear()
+        if new_words:
+            self._sorted_words.extend(new_words)
+            self._sorted_words.sort()
+
+    # Helper method listing the IDs of the words starting with a prefix in alphabetical order
+    def _prefixed_words(self, prefix):
+        position = bisect_left(self._sorted_words, prefix)
+        while position < len(self._sorted_words) and self._sorted_words[position].startswith(prefix):
+            yield self._word_ids[self._sorted_words[position]]
+            position += 1
+
+    # Helper method mapping the IDs of the words similar to a query word to their edit distance
+    def _similar_words(self, word, tolerance, prefix):
+        # An edit changes at most four trigrams of a word (a swap of neighbours
+        # does), so a word within the tolerance shares all but 4 * tolerance of them
+        padded = f"$${word}" if prefix else f"$${word}$"
+        trigrams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+        overlaps = Counter()
+        for trigram in trigrams:
+            overlaps.update(self._trigrams.get(trigram, ()))
+        required = len(trigrams) - 4 * tolerance
+
+        similar = {}
+        for word_id, overlap in overlaps.most_common(self.FUZZY_CANDIDATES):
+            if overlap < required:
+                break
+            if not prefix and abs(len(self._words[word_id]) - len(word)) > tolerance:
+                continue
+            distance = self._edit_distance(word, self._words[word_id], tolerance, prefix)
+            if distance <= tolerance:
+                similar[word_id] = distance
+        return similar
+
+    # Helper method yielding the IDs of the names containing a match of the
+    # query word with the fewest names, closest and alphabetically first words first
+    def _candidate_names(self, matches, with_distance=False):
+        anchor = min(matches, key=lambda similar: sum(len(self._word_names[word_id]) for word_id in similar))
+        for word_id in sorted(anchor, key=lambda word_id: (anchor[word_id], self._words[word_id])):
+            for name_id in self._word_names[word_id]:
+                yield (name_id, anchor[word_id]) if with_distance else name_id
+
+    # Helper method computing the edit distance between two words, counting a
+    # swap of neighbouring letters as one edit and giving up past a limit. With
+    # prefix set, the distance is to the closest prefix of the second word.
+    @staticmethod
+    def _edit_distance(word, other, limit, prefix=False):
+        if prefix:
+            other = other[:len(word) + limit]
+        elif abs(len(word) - len(other)) > limit:
+            return limit + 1
+        before = None
+        previous = list(range(len(other) + 1))
+        for i, character in enumerate(word, 1):
+            current = [i]
+            for j, other_character in enumerate(other, 1):
+                cost = previous[j - 1] + (character != other_character)
+                if previous[j] < cost:
+                    cost = previous[j] + 1
+                if current[j - 1] < cost:
+                    cost = current[j - 1] + 1
+                if j > 1 and i > 1 and character == other[j - 2] and word[i - 2] == other_character and before[j - 2] < cost:
+                    cost = before[j - 2] + 1
+                current.append(cost)
+            before, previous = previous, current
+            if min(previous) > limit:
+                return limit + 1
+        return min(previous) if prefix else previous[-1]
+
+
+# Call count, cumulative time and latency histogram of one instrumented operation
+class OperationMetrics:
+    # Upper bounds of the latency histogram buckets in seconds; slower calls
+    # fall in a final unbounded bucket
+    BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+
+    def __init__(self):
+        # Instrumented operations may run on several threads at once
+        self._lock = threading.Lock()
+        self.reset()
+
+    # Method to discard every recorded call
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+            self.bucket_counts = [0] * (len(self.BUCKETS) + 1)
+
+    # Method to record the duration of one call
+    def record(self, seconds):
+        """
+        Adds one call and its duration to the metrics.
+
+        Parameters:
+            seconds (float): How long the call took.
+
+        Returns:
+            None
+        """
+        bucket = bisect_left(self.BUCKETS, seconds)
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            if seconds > self.max_seconds:
+                self.max_seconds = seconds
+            self.bucket_counts[bucket] += 1
+
+    # Method to summarise the metrics
+    def summary(self):
+        """
+        Summarises the recorded calls.
+
+        Returns:
+            dict: The call count, total, mean and maximum time in seconds, and the
+            cumulative number of calls at or under each bucket bound ("+Inf" for all).
+        """
+        with self._lock:
+            count, total, maximum = self.count, self.total_seconds, self.max_seconds
+            bucket_counts = list(self.bucket_counts)
+        buckets = {}
+        cumulative = 0
+        for bound, bucket_count in zip(self.BUCKETS + ("+Inf",), bucket_counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": count,
+            "total_seconds": total,
+            "mean_seconds": total / count if count else None,
+            "max_seconds": maximum,
+            "buckets": buckets,
+        }
+
+
+# Define the interface of a pluggable storage backend
+class StorageBackend:
+    """
+    Storage used by a School in place of its subject files. A school created
+    without a backend keeps using its own text or binary files and journals.
+    """
+
+    # Method to stream the stored students of a subject
+    def iter_students(self, subject, min_id=None, max_id=None):
+        """
+        Lazily yields the stored students of a subject.
+
+        Parameters:
+            subject (str): The subject whose students are to be read.
+            min_id (int): Optional lowest student ID to yield.
+            max_id (int): Optional highest student ID to yield.
+
+        Yields:
+            Student: The stored student objects.
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    # Method to replace every stored student of a subject
+    def write_students(self, subject, students):
+        """
+        Replaces the stored students of a subject.
+
+        Parameters:
+            subject (str): The subject whose students are to be written.
+            students (iterable): The student objects to be stored.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    # Method to store new or updated students
+    def save_students(self, students):
+        """
+        Stores new or updated students of any subject.
+
+        Parameters:
+            students (iterable): The student objects to be saved.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    # Method to delete a stored student
+    def delete_student(self, student):
+        """
+        Deletes a stored student.
+
+        Parameters:
+            student (Student): The student object that was removed.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    # Method to load a single student without loading the rest of the roster
+    def load_student(self, student_id):
+        """
+        Loads one stored student by student ID.
+
+        Parameters:
+            student_id (int): The ID of the student to be loaded.
+
+        Returns:
+            Student or None: The stored student object or None if not found.
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    # Method to release the resources held by the backend
+    def close(self):
+        pass
+
+
+class SQLiteStorageBackend(StorageBackend):
+    # Table holding the students of each subject
+    TABLES = {subject: subject.lower().replace(" ", "_") + "_students" for subject in SUBJECT_DEFINITIONS}
+
+    # Score columns of each subject's table, in the layout of the subject's binary rows
+    COLUMNS = {subject: definition.columns for subject, definition in SUBJECT_DEFINITIONS.items()}
+
+    # Slots of repeated scores, such as the Math quizzes, left NULL when a score is missing
+    OPTIONAL_COLUMNS = {subject: definition.optional_columns for subject, definition in SUBJECT_DEFINITIONS.items()}
+
+    # Statement opening a transaction
+    BEGIN_STATEMENT = "BEGIN"
+
+    def __init__(self, path="school.db", batch_size=1000):
+        """
+        Opens (and if needed creates) an SQLite database with one table per
+        subject. Each table has a unique index on student_id, so a lookup by
+        ID reads a single row, and an index on name. Statements are fixed SQL
+        strings, which sqlite3 compiles once and keeps in its statement cache.
+
+        Parameters:
+            path (str): The database file.
+            batch_size (int): The number of rows sent per executemany() call.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        # The connection is shared by the school's worker threads, one statement at a time
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+
+        self._select_sql = {}
+        self._select_by_id_sql = {}
+        self._insert_sql = {}
+        self._upsert_sql = {}
+        self._delete_sql = {}
+        with self.transaction():
+            for subject, table in self.TABLES.items():
+                columns = self.COLUMNS[subject]
+                definitions = ", ".join(
+                    f"{column} REAL" if column in self.OPTIONAL_COLUMNS[subject] else f"{column} REAL NOT NULL DEFAULT 0"
+                    for column in columns
+                )
+                self._connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (student_id INTEGER NOT NULL UNIQUE, name TEXT NOT NULL, {definitions})"
+                )
+                self._connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_name ON {table} (name)")
+
+                # Rows are listed by rowid so students keep the order they were added in
+                names = ", ".join(("student_id", "name") + columns)
+                placeholders = ", ".join("?" * (len(columns) + 2))
+                updates = ", ".join(f"{column} = excluded.{column}" for column in ("name",) + columns)
+                self._select_sql[subject] = f"SELECT {names} FROM {table} WHERE student_id BETWEEN ? AND ? ORDER BY rowid"
+                self._select_by_id_sql[subject] = f"SELECT {names} FROM {table} WHERE student_id = ?"
+                self._insert_sql[subject] = f"INSERT INTO {table} ({names}) VALUES ({placeholders})"
+                self._upsert_sql[subject] = self._insert_sql[subject] + f" ON CONFLICT (student_id) DO UPDATE SET {updates}"
+                self._delete_sql[subject] = f"DELETE FROM {table} WHERE student_id = ?"
+
+    # Context manager grouping statements into a single transaction
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the enclosed statements in one transaction, committed on success
+        and rolled back on error. Nested transactions join the outer one.
+
+        Yields:
+            sqlite3.Connection: The database connection.
+        """
+        with self._lock:
+            if self._transaction_depth == 0:
+                self._connection.execute(self.BEGIN_STATEMENT)
+            self._transaction_depth += 1
+            try:
+                yield self._connection
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._connection.execute("ROLLBACK")
+                raise
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._connection.execute("COMMIT")
+
+    # Method to stream the stored students of a subject
+    def iter_students(self, subject, min_id=None, max_id=None):
+        """
+        Lazily yields the stored students of a subject in the order they were
+        added, reading the ID range through the student_id index.
+
+        Parameters:
+            subject (str): The subject whose students are to be read.
+            min_id (int): Optional lowest student ID to yield.
+            max_id (int): Optional highest student ID to yield.
+
+        Yields:
+            Student: The stored student objects.
+        """
+        if subject not in self.TABLES:
+            return
+        low = -(1 << 63) if min_id is None else min_id
+        high = (1 << 63) - 1 if max_id is None else max_id
+
+        # Rows are fetched in batches so the lock is not held while the caller works
+        cursor = None
+        while True:
+            with self._lock:
+                if cursor is None:
+                    cursor = self._connection.execute(self._select_sql[subject], (low, high))
+                rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield self._row_to_student(subject, row)
+
+    # Method to replace every stored student of a subject
+    def write_students(self, subject, students):
+        """
+        Replaces the stored students of a subject in a single transaction,
+        inserting them in batches.
+
+        Parameters:
+            subject (str): The subject whose students are to be written.
+            students (iterable): The student objects to be stored.
+
+        Returns:
+            None
+        """
+        if subject not in self.TABLES:
+            return
+        rows = (self._student_to_row(student) for student in students)
+        with self.transaction() as connection:
+            connection.execute(f"DELETE FROM {self.TABLES[subject]}")
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                connection.executemany(self._insert_sql[subject], batch)
+
+    # Method to store new or updated students
+    def save_students(self, students):
+        """
+        Inserts or updates students in a single transaction, sending the rows
+        of each subject in batches.
+
+        Parameters:
+            students (iterable): The student objects to be saved.
+
+        Returns:
+            None
+        """
+        batches = {subject: [] for subject in self.TABLES}
+        with self.transaction() as connection:
+            for student in students:
+                batch = batches.get(student.subject)
+                if batch is None:
+                    continue
+                batch.append(self._student_to_row(student))
+                if len(batch) >= self.batch_size:
+                    connection.executemany(self._upsert_sql[student.subject], batch)
+                    batch.clear()
+            for subject, batch in batches.items():
+                if batch:
+                    connection.executemany(self._upsert_sql[subject], batch)
+
+    # Method to delete a stored student
+    def delete_student(self, student):
+        """
+        Deletes a stored student.
+
+        Parameters:
+            student (Student): The student object that was removed.
+
+        Returns:
+            None
+        """
+        if student.subject in self.TABLES:
+            with self.transaction() as connection:
+                connection.execute(self._delete_sql[student.subject], (student.student_id,))
+
+    # Method to load a single student without loading the rest of the roster
+    def load_student(self, student_id):
+        """
+        Loads one stored student by student ID through the student_id indexes.
+
+        Parameters:
+            student_id (int): The ID of the student to be loaded.
+
+        Returns:
+            Student or None: The stored student object or None if not found.
+        """
+        with self._lock:
+            for subject in self.TABLES:
+                row = self._connection.execute(self._select_by_id_sql[subject], (student_id,)).fetchone()
+                if row is not None:
+                    return self._row_to_student(subject, row)
+        return None
+
+    # Method to count the stored students of a subject
+    def count_students(self, subject):
+        """
+        Counts the stored students of a subject.
+
+        Parameters:
+            subject (str): The subject whose students are counted.
+
+        Returns:
+            int: The number of stored students.
+        """
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {self.TABLES[subject]}").fetchone()[0]
+
+    # Method to close the database
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    # Helper method converting a student into a row of its subject's table, storing missing scores as NULL
+    def _student_to_row(self, student):
+        scores = SUBJECT_DEFINITIONS[student.subject].to_row(student)
+        return (student.student_id, student.name, *[None if score != score else score for score in scores])
+
+    # Helper method building a student from a row of a subject's table
+    def _row_to_student(self, subject, row):
+        return SUBJECT_DEFINITIONS[subject].from_values(row[1], row[0], row[2:])
+
+
+# Versioned store of every student's score changes, for point-in-time queries
+class GradeHistory:
+    # Transactions take the write lock up front, so the latest versions read at
+    # the start of a change stay the latest until it commits
+    BEGIN_STATEMENT = "BEGIN IMMEDIATE"
+
+    def __init__(self, path="history.db", checkpoint_interval=10000):
+        """
+        Opens (and if needed creates) an SQLite database recording every saved
+        change to a student as a delta: only the fields that differ from the
+        student's previous version, as compact JSON. Several processes may
+        record into the same database: deltas are computed inside the write
+        transaction, against the latest versions stored by any of them. Changes are indexed by
+        (student_id, timestamp) for per-student queries. Every
+        checkpoint_interval changes to a subject, the whole roster is stored
+        as a compressed checkpoint, so a roster at any time is rebuilt from
+        the nearest earlier checkpoint plus the changes after it, in one
+        ordered scan.
+
+        Timestamps are seconds since the epoch and may not go backwards.
+
+        Parameters:
+            path (str): The database file.
+            checkpoint_interval (int): The number of changes to a subject between checkpoints.
+        """
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY, subject TEXT NOT NULL, student_id INTEGER NOT NULL, "
+                "timestamp REAL NOT NULL, removed INTEGER NOT NULL DEFAULT 0, name TEXT, delta TEXT)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS changes_student ON changes (student_id, timestamp)")
+            connection.execute("CREATE INDEX IF NOT EXISTS changes_subject ON changes (subject, seq)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints (subject TEXT NOT NULL, seq INTEGER NOT NULL, timestamp REAL NOT NULL, roster BLOB NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS checkpoints_subject ON checkpoints (subject, timestamp)")
+            connection.execute("CREATE TABLE IF NOT EXISTS terms (label TEXT PRIMARY KEY, timestamp REAL NOT NULL)")
+            self._last_timestamp = connection.execute("SELECT MAX(timestamp) FROM changes").fetchone()[0] or 0.0
+            self._last_seq = connection.execute("SELECT MAX(seq) FROM changes").fetchone()[0] or 0
+
+        # Per-subject latest version of every student, {ID: (name, row)}, loaded on first
+        # use and brought up to date with other writers' changes by _catch_up
+        self._current = {}
+        # Per-subject number of changes since the last checkpoint
+        self._since_checkpoint = {}
+
+    # Same transaction handling as the SQLite storage backend
+    transaction = SQLiteStorageBackend.transaction
+
+    # Method to record new or updated students
+    def record_students(self, students, timestamp=None):
+        """
+        Records the students whose name or scores differ from their latest
+        recorded version. Unchanged students add nothing.
+
+        Parameters:
+            students (iterable): The student objects to record.
+            timestamp (float): Optional time of the change; defaults to now.
+
+        Returns:
+            int: The number of changes recorded.
+        """
+        with self._lock, self.transaction():
+            self._catch_up()
+            timestamp = self._next_timestamp(timestamp)
+            changes = []
+            for student in students:
+                definition = SUBJECT_DEFINITIONS.get(student.subject)
+                if definition is None:
+                    continue
+                current = self._current_versions(student.subject)
+                row = tuple(None if score != score else score for score in definition.to_row(student))
+                previous = current.get(student.student_id)
+                if previous is None:
+                    delta = dict(zip(definition.columns, row))
+                    name = student.name
+                else:
+                    delta = {column: value for column, value, old in zip(definition.columns, row, previous[1]) if value != old}
+                    name = student.name if student.name != previous[0] else None
+                    if not delta and name is None:
+                        continue
+                current[student.student_id] = (student.name, row)
+                changes.append((student.subject, student.student_id, timestamp, 0, name, json.dumps(delta, separators=(",", ":"))))
+            self._write_changes(changes, timestamp)
+            return len(changes)
+
+    # Method to record removed students
+    def record_removals(self, students, timestamp=None):
+        """
+        Records the removal of students.
+
+        Parameters:
+            students (iterable): The student objects that were removed.
+            timestamp (float): Optional time of the removal; defaults to now.
+
+        Returns:
+            int: The number of removals recorded.
+        """
+        with self._lock, self.transaction():
+            self._catch_up()
+            timestamp = self._next_timestamp(timestamp)
+            changes = []
+            for student in students:
+                if self._current_versions(student.subject).pop(student.student_id, None) is not None:
+                    changes.append((student.subject, student.student_id, timestamp, 1, None, None))
+            self._write_changes(changes, timestamp)
+            return len(changes)
+
+    # Method to record the complete roster at the end of a term
+    def end_term(self, label, students, timestamp=None):
+        """
+        Records a complete roster under a term label: every change since the
+        last recorded versions, the removal of students missing from the
+        roster, and a checkpoint of each subject.
+
+        Parameters:
+            label (str): The name of the term, e.g. "2024 Autumn".
+            students (iterable): Every student at the end of the term.
+            timestamp (float): Optional time the term ends; defaults to now.
+
+        Returns:
+            None
+        """
+        students = list(students)
+        with self._lock, self.transaction() as connection:
+            self._catch_up()
+            timestamp = self._next_timestamp(timestamp)
+            self.record_students(students, timestamp)
+            present = {student.student_id for student in students}
+            for subject in SUBJECT_DEFINITIONS:
+                current = self._current_versions(subject)
+                removed = [SUBJECT_DEFINITIONS[subject].from_values(current[student_id][0], student_id, current[student_id][1])
+                           for student_id in current if student_id not in present]
+                self.record_removals(removed, timestamp)
+                self._checkpoint(subject, timestamp)
+            connection.execute("INSERT OR REPLACE INTO terms (label, timestamp) VALUES (?, ?)", (label, timestamp))
+
+    # Method to list the recorded terms
+    def terms(self):
+        """
+        Lists the recorded terms in the order they ended.
+
+        Returns:
+            list: (label, timestamp) pairs.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT label, timestamp FROM terms ORDER BY timestamp").fetchall()
+
+    # Method to find when a term ended
+    def term_timestamp(self, label):
+        """
+        Looks up the time a term ended.
+
+        Parameters:
+            label (str): The name of the term.
+
+        Returns:
+            float or None: The timestamp of the term, or None if no such term was recorded.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT timestamp FROM terms WHERE label = ?", (label,)).fetchone()
+        return row[0] if row else None
+
+    # Method to rebuild the roster of a subject at a point in time
+    def roster_as_of(self, subject, timestamp):
+        """
+        Rebuilds a subject's students as they were at a point in time: the
+        nearest checkpoint taken at or before it, plus the changes after that
+        checkpoint up to the time, read in one ordered pass.
+
+        Parameters:
+            subject (str): The subject to rebuild.
+            timestamp (float): The point in time.
+
+        Returns:
+            list: The student objects of the subject at that time.
+        """
+        definition = SUBJECT_DEFINITIONS[subject]
+        with self._lock:
+            versions = self._versions_as_of(subject, timestamp)
+        return [definition.from_values(name, student_id, row) for student_id, (name, row) in versions.items()]
+
+    # Method to rebuild one student at a point in time
+    def student_as_of(self, student_id, timestamp):
+        """
+        Rebuilds a student as they were at a point in time from their own
+        changes, read through the (student_id, timestamp) index.
+
+        Parameters:
+            student_id (int): The ID of the student.
+            timestamp (float): The point in time.
+
+        Returns:
+            Student or None: The student at that time, or None if not enrolled then.
+        """
+        versions = self.student_versions(student_id, end=timestamp)
+        return versions[-1][1] if versions else None
+
+    # Method to find a student's final grade at a point in time
+    def grade_as_of(self, student_id, timestamp):
+        """
+        Computes a student's final grade at a point in time.
+
+        Parameters:
+            student_id (int): The ID of the student.
+            timestamp (float): The point in time.
+
+        Returns:
+            float or None: The final grade, or None if the student was not enrolled then.
+        """
+        student = self.student_as_of(student_id, timestamp)
+        return student.compute_final_grade() if student is not None else None
+
+    # Method to list every recorded version of a student
+    def student_versions(self, student_id, start=None, end=None):
+        """
+        Lists the recorded versions of a student, oldest first.
+
+        Parameters:
+            student_id (int): The ID of the student.
+            start (float): Optional earliest time to list.
+            end (float): Optional latest time to list.
+
+        Returns:
+            list: (timestamp, student) pairs, where student is None after a removal.
+        """
+        high = math.inf if end is None else end
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT subject, timestamp, removed, name, delta FROM changes WHERE student_id = ? AND timestamp <= ? ORDER BY timestamp, seq",
+                (student_id, high),
+            ).fetchall()
+
+        versions = []
+        name = row = None
+        for subject, timestamp, removed, changed_name, delta in rows:
+            definition = SUBJECT_DEFINITIONS.get(subject)
+            if definition is None:
+                continue
+            if removed:
+                name = row = None
+                student = None
+            else:
+                name, row = self._apply_delta(definition, (name, row), changed_name, delta)
+                student = definition.from_values(name, student_id, row)
+            if start is None or timestamp >= start:
+                versions.append((timestamp, student))
+        return versions
+
+    # Method to follow a student's final grade over time
+    def grade_trend(self, student_id, start=None, end=None):
+        """
+        Lists a student's final grade after each recorded change.
+
+        Parameters:
+            student_id (int): The ID of the student.
+            start (float): Optional earliest time to list.
+            end (float): Optional latest time to list.
+
+        Returns:
+            list: (timestamp, final grade) pairs, with None for removals.
+        """
+        return [(timestamp, student.compute_final_grade() if student is not None else None)
+                for timestamp, student in self.student_versions(student_id, start, end)]
+
+    # Method to close the database
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    # Helper method applying the changes other writers stored since this one last
+    # wrote or caught up to the loaded latest versions; the caller holds the transaction
+    def _catch_up(self):
+        cursor = self._connection.execute(
+            "SELECT seq, subject, student_id, timestamp, removed, name, delta FROM changes WHERE seq > ? ORDER BY seq",
+            (self._last_seq,),
+        )
+        for seq, subject, student_id, changed_at, removed, name, delta in cursor:
+            self._last_seq = seq
+            self._last_timestamp = max(self._last_timestamp, changed_at)
+            current = self._current.get(subject)
+            if current is None:
+                # Loaded from the database on first use, with these changes included
+                continue
+            self._since_checkpoint[subject] += 1
+            if removed:
+                current.pop(student_id, None)
+            else:
+                current[student_id] = self._apply_delta(SUBJECT_DEFINITIONS[subject], current.get(student_id, (None, None)), name, delta)
+
+    # Helper method returning the latest recorded versions of a subject, loading them on first use
+    def _current_versions(self, subject):
+        current = self._current.get(subject)
+        if current is None:
+            current = self._current[subject] = self._versions_as_of(subject, math.inf)
+        return current
+
+    # Helper method rebuilding {ID: (name, row)} for a subject from its nearest checkpoint
+    # and the changes after it; the caller holds the lock
+    def _versions_as_of(self, subject, timestamp):
+        definition = SUBJECT_DEFINITIONS[subject]
+        checkpoint = self._connection.execute(
+            "SELECT seq, roster FROM checkpoints WHERE subject = ? AND timestamp <= ? ORDER BY timestamp DESC, seq DESC LIMIT 1",
+            (subject, timestamp),
+        ).fetchone()
+        versions = {}
+        after = 0
+        if checkpoint is not None:
+            after = checkpoint[0]
+            for student_id, name, *row in json.loads(zlib.decompress(checkpoint[1])):
+                versions[student_id] = (name, tuple(row))
+
+        changes = 0
+        cursor = self._connection.execute(
+            "SELECT student_id, timestamp, removed, name, delta FROM changes WHERE subject = ? AND seq > ? ORDER BY seq",
+            (subject, after),
+        )
+        for student_id, changed_at, removed, name, delta in cursor:
+            changes += 1
+            if changed_at > timestamp:
+                # Timestamps never go backwards, so the rest are later still
+                break
+            if removed:
+                versions.pop(student_id, None)
+            else:
+                versions[student_id] = self._apply_delta(definition, versions.get(student_id, (None, None)), name, delta)
+        if timestamp == math.inf:
+            self._since_checkpoint[subject] = changes
+        return versions
+
+    # Helper method applying one recorded delta to a (name, row) version
+    @staticmethod
+    def _apply_delta(definition, version, name, delta):
+        old_name, row = version
+        values = dict(zip(definition.columns, row)) if row is not None else {}
+        values.update(json.loads(delta))
+        return (name if name is not None else old_name, tuple(values.get(column) for column in definition.columns))
+
+    # Helper method storing a compressed checkpoint of a subject's latest versions; the caller holds the lock
+    def _checkpoint(self, subject, timestamp):
+        current = self._current_versions(subject)
+        seq = self._connection.execute("SELECT MAX(seq) FROM changes WHERE subject = ?", (subject,)).fetchone()[0] or 0
+        roster = [[student_id, name, *row] for student_id, (name, row) in current.items()]
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT INTO checkpoints (subject, seq, timestamp, roster) VALUES (?, ?, ?, ?)",
+                (subject, seq, timestamp, zlib.compress(json.dumps(roster, separators=(",", ":")).encode("utf-8"))),
+            )
+        self._since_checkpoint[subject] = 0
+
+    # Helper method writing change rows, then any checkpoints they make due; the caller holds the lock
+    def _write_changes(self, changes, timestamp):
+        if not changes:
+            return
+        with self.transaction() as connection:
+            connection.executemany(
+                "INSERT INTO changes (subject, student_id, timestamp, removed, name, delta) VALUES (?, ?, ?, ?, ?, ?)", changes
+            )
+            self._last_timestamp = timestamp
+            self._last_seq = connection.execute("SELECT MAX(seq) FROM changes").fetchone()[0]
+            for subject in {change[0] for change in changes}:
+                self._since_checkpoint[subject] += sum(1 for change in changes if change[0] == subject)
+                if self._since_checkpoint[subject] >= self.checkpoint_interval:
+                    self._checkpoint(subject, timestamp)
+
+    # Helper method checking a change's timestamp, defaulting to now
+    def _next_timestamp(self, timestamp):
+        if timestamp is None:
+            timestamp = max(time.time(), self._last_timestamp)
+        if timestamp < self._last_timestamp:
+            raise ValueError("History timestamps must not go backwards.")
+        return timestamp
+
+
+class School:
+    # Compiled definition of each subject, built in or loaded from subjects.json
+    SUBJECTS = SUBJECT_DEFINITIONS
+
+    # File paths for storing student data for different subjects
+    FILE_PATHS = {subject: definition.file_path for subject, definition in SUBJECT_DEFINITIONS.items()}
+
+    # Journal files holding change records appended since the last snapshot
+    JOURNAL_PATHS = {subject: definition.journal_path for subject, definition in SUBJECT_DEFINITIONS.items()}
+
+    # Binary columnar files, an optional alternative to the text files
+    BINARY_FILE_PATHS = {subject: definition.binary_file_path for subject, definition in SUBJECT_DEFINITIONS.items()}
+
+    # Layout of the binary files: magic, version, number of score columns,
+    # number of students and size of the name table, padded to 16 bytes
+    BINARY_MAGIC = b"SMSB"
+    BINARY_VERSION = 1
+    BINARY_HEADER = struct.Struct("<4sHHII")
+
+    # Index files mapping every student ID in a snapshot to the position of
+    # its record: a byte offset in a text file or a row in a binary file
+    INDEX_PATHS = {subject: definition.index_path for subject, definition in SUBJECT_DEFINITIONS.items()}
+
+    # Layout of the index files: magic, version, number of entries and the size,
+    # modification time and inode of the snapshot they were built for, followed
+    # by the sorted IDs and their positions
+    INDEX_MAGIC = b"SMSX"
+    INDEX_VERSION = 1
+    INDEX_HEADER = struct.Struct("<4sHxxQQqQ")
+
+    # Layout of archive files: a header (magic, version, codec number), chunks
+    # of compressed text records of one subject each, a zlib-compressed JSON
+    # table of the chunks and a trailer (table position, table size, magic)
+    ARCHIVE_MAGIC = b"SMSA"
+    ARCHIVE_VERSION = 1
+    ARCHIVE_HEADER = struct.Struct("<4sHBx")
+    ARCHIVE_TRAILER = struct.Struct("<QQ4s")
+    ARCHIVE_CODECS = ("zlib", "zstd")
+    # Fields of each entry in an archive's table of chunks; line is the number
+    # of records of the subject in earlier chunks
+    ARCHIVE_CHUNK_FIELDS = ("subject", "offset", "size", "count", "min_id", "max_id", "line", "crc32")
+
+    # Score columns stored in the binary files for each subject
+    BINARY_COLUMNS = {subject: definition.columns for subject, definition in SUBJECT_DEFINITIONS.items()}
+
+    # Student class used for each subject
+    STUDENT_CLASSES = {subject: definition.student_class for subject, definition in SUBJECT_DEFINITIONS.items()}
+
+    # Score fields accepted by bulk imports for each subject
+    IMPORT_SCORE_FIELDS = {subject: definition.import_fields for subject, definition in SUBJECT_DEFINITIONS.items()}
+
+    # Text written before and after the entries of a report in each format
+    REPORT_HEADERS = {"text": "\n===== STUDENT REPORTS =====\n", "csv": "subject,name,student_id,quiz_average,final_grade\r\n", "json": "["}
+    REPORT_FOOTERS = {"text": "===========================\n", "csv": "", "json": "\n]\n"}
+
+    # School methods timed while instrumentation is enabled; grading is timed
+    # where the school grades in bulk, so the student classes stay untouched
+    INSTRUMENTED_OPERATIONS = (
+        "read_student_data",
+        "write_student_data",
+        "add_student",
+        "remove_student",
+        "find_student_by_id",
+        "compute_final_grades",
+        "write_student_reports",
+    )
+
+    # When file writes are forced to disk: "always" (snapshots, their directory
+    # entries and journal appends), "snapshots" (snapshot files only) or "never"
+    FSYNC_POLICIES = ("always", "snapshots", "never")
+
+    # The ordered grade index of a subject is rebuilt with one sort, rather than
+    # updated one insertion at a time, once more than 1/8 of its entries are stale
+    GRADE_INDEX_REBUILD_RATIO = 8
+
+    def __init__(self, journaling=False, compaction_threshold=1000, storage_format="text", data_dir=None, storage=None, lazy=None, history=None,
+                 write_behind=False, flush_interval=5.0, flush_threshold=100, fsync="snapshots"):
+        if SUBJECT_CONFIG_ERROR is not None:
+            raise ValueError(SUBJECT_CONFIG_ERROR)
+
+        # Keep the files in another directory instead of the working directory
+        if data_dir is not None:
+            self.FILE_PATHS = {subject: os.path.join(data_dir, path) for subject, path in School.FILE_PATHS.items()}
+            self.JOURNAL_PATHS = {subject: os.path.join(data_dir, path) for subject, path in School.JOURNAL_PATHS.items()}
+            self.BINARY_FILE_PATHS = {subject: os.path.join(data_dir, path) for subject, path in School.BINARY_FILE_PATHS.items()}
+            self.INDEX_PATHS = {subject: os.path.join(data_dir, path) for subject, path in School.INDEX_PATHS.items()}
+
+        # Format of the subject snapshot files: "text" or "binary"
+        if storage_format not in ("text", "binary"):
+            raise ValueError(f"Unknown storage format: {storage_format}")
+        self.storage_format = storage_format
+
+        # Optional StorageBackend used instead of the subject files
+        self.storage = storage
+        # Optional GradeHistory recording every saved change for point-in-time queries
+        self.history = history
+
+        # A lazy school starts empty and loads stored students on demand: one
+        # student at a time for lookups by ID, and a whole subject the first
+        # time an operation needs every student of it. Schools with a storage
+        # backend are lazy unless told otherwise.
+        self.lazy = storage is not None if lazy is None else lazy
+        self._loaded_subjects = set() if self.lazy else set(self.FILE_PATHS)
+        # Per-subject cache of the index file last read: (snapshot signature, IDs, positions)
+        self._indexes = {}
+        # Per-subject cache of the journal read by indexed lookups, so the lookups
+        # and the subject's load share one read: (journal signature, changes, record count, errors)
+        self._journals = {}
+
+        # When journaling is enabled, single edits are appended to a per-subject
+        # journal instead of rewriting the whole subject file
+        self.journaling = journaling
+        self.compaction_threshold = compaction_threshold
+        self._journal_sizes = {subject: 0 for subject in self.FILE_PATHS}
+
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.fsync = fsync
+
+        # In write-behind mode saves only mark students dirty. The dirty changes
+        # are written flush_interval seconds after the first of them, as soon as
+        # flush_threshold students are dirty, and by flush() and close().
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        # Subject -> {student ID: (student, removed)} of the changes not written yet
+        self._dirty = {}
+        self._dirty_lock = threading.Lock()
+        self._flush_lock = threading.RLock()
+        self._flush_timer = None
+        if write_behind:
+            _write_behind_schools.add(self)
+
+        # Primary index: student ID -> student, kept in insertion order so
+        # reports still list students in the order they were added
+        self._students_by_id = {}
+        # Secondary indexes: subject -> {ID: student} and name -> {ID: student}
+        self._students_by_subject = {subject: {} for subject in self.FILE_PATHS}
+        self._students_by_name = {}
+        # Prefix and fuzzy search over the names in the name index
+        self._name_index = NameIndex()
+
+        # Per-subject grade statistics, the grade each student currently contributes
+        # to them and the IDs of students whose grade changed since the last query
+        self._statistics = {subject: SubjectStatistics() for subject in self.FILE_PATHS}
+        self._recorded_grades = {}
+        self._stale_grades = set()
+        # Per-subject list of (final grade, student ID) pairs kept in ascending order
+        self._grade_index = {subject: [] for subject in self.FILE_PATHS}
+
+        # Set once no background load is in progress
+        self._loaded = threading.Event()
+        self._loaded.set()
+        self._load_error = None
+
+        # Operation name -> OperationMetrics, filled while instrumentation is enabled.
+        # Nothing is timed until enable_instrumentation() is called.
+        self.instrumented = False
+        self._metrics = {}
+
+        # Per-subject list of the malformed records skipped by the last read of
+        # its text file, as "Line N: problem" messages
+        self.record_errors = {}
+
+        # Hit and miss counters of the grade caches of this school's students
+        self.grade_cache_hits = 0
+        self.grade_cache_misses = 0
+        # Per-subject list of the malformed records skipped by the last read of its journal
+        self.journal_errors = {}
+
+    # Property returning all students in insertion order
+    @property
+    def students(self):
+        """
+        Returns all students in the school in the order they were added. The
+        tuple is a read-only snapshot, so appending to it raises instead of
+        leaving the indexes out of date; use add_student and remove_student.
+
+        Returns:
+            tuple: The student objects.
+        """
+        self.ensure_loaded()
+        return tuple(self._students_by_id.values())
+
+    # Method to count the students in the school
+    def count_students(self):
+        """
+        Counts the students in the school.
+
+        Returns:
+            int: The number of students.
+        """
+        self.ensure_loaded()
+        return len(self._students_by_id)
+
+    # Method to add a student to the school
+    def add_student(self, student):
+        """
+        Adds a student to the school.
+
+        Parameters:
+            student (Student): The student object to be added.
+
+        Returns:
+            bool: True if the student was added, False if the ID already exists.
+        """
+        # Check if a student with the same ID already exists
+        if student.student_id in self._students_by_id:
+            print(f"Error: Student with ID {student.student_id} already exists.")
+            return False
+
+        self._students_by_id[student.student_id] = student
+        self._students_by_subject.setdefault(student.subject, {})[student.student_id] = student
+        same_name = self._students_by_name.get(student.name)
+        if same_name is None:
+            same_name = self._students_by_name[student.name] = {}
+            self._name_index.add(student.name)
+        same_name[student.student_id] = student
+
+        # The student's grade is folded into the statistics on the next query
+        student._school = self
+        self._stale_grades.add(student.student_id)
+        return True
+
+    # Method to add several students to the school at once
+    def add_students(self, students):
+        """
+        Adds every student from an iterable of student objects to the school.
+
+        Parameters:
+            students (iterable): The student objects to be added.
+
+        Returns:
+            int: The number of students that were added.
+        """
+        added = 0
+        for student in students:
+            if self.add_student(student):
+                added += 1
+        return added
+
+    # Method to remove a student from the school by student ID
+    def remove_student(self, student_id):
+        """
+        Removes a student from the school based on student ID.
+
+        Parameters:
+            student_id (int): The ID of the student to be removed.
+
+        Returns:
+            Student or None: The removed student object or None if not found.
+        """
+        self.find_student_by_id(student_id)
+        student = self._students_by_id.pop(student_id, None)
+        if student is None:
+            print(f"Error: Student with ID {student_id} not found.")
+            return None
+
+        # Keep the secondary indexes in sync with the primary index
+        self._students_by_subject[student.subject].pop(student_id, None)
+        same_name = self._students_by_name.get(student.name)
+        if same_name is not None:
+            same_name.pop(student_id, None)
+            if not same_name:
+                del self._students_by_name[student.name]
+
+        # Take the student's grade back out of the statistics
+        student._school = None
+        self._stale_grades.discard(student_id)
+        if student_id in self._recorded_grades:
+            grade = self._recorded_grades.pop(student_id)
+            self._statistics[student.subject].remove(grade)
+            self._remove_from_grade_index(student.subject, grade, student_id)
+        return student
+
+    # Method to find a student by student ID
+    def find_student_by_id(self, student_id):
+        """
+        Finds a student by student ID.
+
+        Parameters:
+            student_id (int): The ID of the student to be found.
+
+        Returns:
+            Student or None: The found student object or None if not found.
+        """
+        student = self._students_by_id.get(student_id)
+        if student is None and len(self._loaded_subjects) < len(self.FILE_PATHS):
+            # Load just this student rather than the whole roster
+            student = self._load_student(student_id)
+        return student
+
+    # Helper method loading one stored student of a subject that is not loaded yet
+    def _load_student(self, student_id):
+        # Stored students must reflect the write-behind changes, such as removals
+        if self._dirty:
+            self.flush()
+        if self.storage is not None:
+            student = self.storage.load_student(student_id)
+            if student is None or student.subject in self._loaded_subjects:
+                return None
+            self.add_student(student)
+            return student
+
+        for subject in self.FILE_PATHS:
+            if subject in self._loaded_subjects:
+                continue
+            indexed, student = self.read_indexed_student(subject, student_id)
+            if not indexed:
+                # Without a usable index the whole subject has to be read
+                self._load_subjects([subject])
+                student = self._students_by_id.get(student_id)
+            elif student is not None:
+                self.add_student(student)
+            if student is not None:
+                return student
+        return None
+
+    # Method to find all students taking a given subject
+    def find_students_by_subject(self, subject):
+        """
+        Finds all students taking a given subject.
+
+        Parameters:
+            subject (str): The subject to look up.
+
+        Returns:
+            list: The matching student objects in insertion order.
+        """
+        self.ensure_loaded([subject])
+        return list(self._students_by_subject.get(subject, {}).values())
+
+    # Method to find all students with a given name
+    def find_students_by_name(self, name):
+        """
+        Finds all students whose name matches exactly.
+
+        Parameters:
+            name (str): The name to look up.
+
+        Returns:
+            list: The matching student objects in insertion order.
+        """
+        self.ensure_loaded()
+        return list(self._students_by_name.get(name, {}).values())
+
+    # Method to search students by whole or partial, possibly misspelt, name
+    def search_students_by_name(self, query, limit=10):
+        """
+        Searches the roster by name. Students whose name, or any part of it
+        from the start of a word, begins with the query come first; then
+        students whose name is within one or two typos of such a match.
+        Matching ignores case and extra whitespace.
+
+        Parameters:
+            query (str): The whole or partial name to search for.
+            limit (int): The maximum number of students to return.
+
+        Returns:
+            list: Up to limit matching student objects, best match first.
+        """
+        self.ensure_loaded()
+        students = []
+        for name in self._name_index.search(query, limit, self._students_by_name.__contains__):
+            students.extend(islice(self._students_by_name[name].values(), limit - len(students)))
+            if len(students) == limit:
+                break
+        return students
+
+    # Method to compute the final grades of all students in bulk
+    def compute_final_grades(self):
+        """
+        Computes the final grade of every student using the columnar grade engine.
+
+        Returns:
+            dict: A mapping of student ID to final grade, in insertion order.
+        """
+        final_grades = GradeEngine(self.students).compute_final_grades()
+        return {student_id: final_grades[student_id] for student_id in self._students_by_id}
+
+    # Method called by a student of this school when one of its scores changes
+    def _student_grade_changed(self, student):
+        # Only remember the student; its new grade is computed when statistics are next needed
+        self._stale_grades.add(student.student_id)
+
+    # Method to fold changed grades into the statistics
+    def _refresh_grades(self):
+        stale_by_subject = {}
+        for student_id in self._stale_grades:
+            stale_by_subject.setdefault(self._students_by_id[student_id].subject, []).append(student_id)
+
+        for subject, student_ids in stale_by_subject.items():
+            statistics = self._statistics.setdefault(subject, SubjectStatistics())
+            grade_index = self._grade_index.setdefault(subject, [])
+            # After a bulk load most of the subject is stale, and one sort of the
+            # whole index beats an O(n) insertion per student
+            rebuild = len(student_ids) * self.GRADE_INDEX_REBUILD_RATIO > len(grade_index)
+            if rebuild:
+                stale = set(student_ids)
+                entries = [entry for entry in grade_index if entry[1] not in stale]
+            for student_id in student_ids:
+                old_grade = self._recorded_grades.get(student_id)
+                if old_grade is not None:
+                    statistics.remove(old_grade)
+                    if not rebuild:
+                        self._remove_from_grade_index(subject, old_grade, student_id)
+                grade = self._students_by_id[student_id].compute_final_grade()
+                statistics.add(grade)
+                if rebuild:
+                    entries.append((grade, student_id))
+                else:
+                    insort(grade_index, (grade, student_id))
+                self._recorded_grades[student_id] = grade
+                self._stale_grades.discard(student_id)
+            if rebuild:
+                entries.sort()
+                grade_index[:] = entries
+
+    # Helper method to remove an entry from the ordered grade index of a subject
+    def _remove_from_grade_index(self, subject, grade, student_id):
+        grade_index = self._grade_index[subject]
+        position = bisect_left(grade_index, (grade, student_id))
+        if position < len(grade_index) and grade_index[position] == (grade, student_id):
+            del grade_index[position]
+
+    # Method to find the students with the highest final grades in a subject
+    def top_students(self, subject, count=10):
+        """
+        Finds the students with the highest final grades in a subject.
+
+        Parameters:
+            subject (str): The subject to rank.
+            count (int): The number of students to return.
+
+        Returns:
+            list: (student, final grade) pairs, best first.
+        """
+        self.ensure_loaded([subject])
+        self._refresh_grades()
+        grade_index = self._grade_index.get(subject, [])
+        top = grade_index[max(len(grade_index) - count, 0):]
+        return [(self._students_by_id[student_id], grade) for grade, student_id in reversed(top)]
+
+    # Method to find the students whose final grade lies in a range
+    def students_in_grade_range(self, subject, low=None, high=None):
+        """
+        Finds the students of a subject whose final grade lies in a range.
+
+        Parameters:
+            subject (str): The subject to search.
+            low (float): Optional lowest grade to include.
+            high (float): Optional highest grade to include.
+
+        Returns:
+            list: (student, final grade) pairs in ascending order of grade.
+        """
+        self.ensure_loaded([subject])
+        self._refresh_grades()
+        grade_index = self._grade_index.get(subject, [])
+        start = 0 if low is None else bisect_left(grade_index, (low,))
+        stop = len(grade_index) if high is None else bisect_right(grade_index, (high, math.inf))
+        return [(self._students_by_id[student_id], grade) for grade, student_id in grade_index[start:stop]]
+
+    # Method to find the rank of a student within their subject
+    def student_rank(self, student_id):
+        """
+        Finds a student's rank and percentile within their subject.
+
+        Parameters:
+            student_id (int): The ID of the student.
+
+        Returns:
+            dict or None: The rank (1 is the best grade), the number of students,
+            the percentile (share of students with a lower grade) and the final
+            grade, or None if the student was not found.
+        """
+        student = self.find_student_by_id(student_id)
+        if student is None:
+            return None
+        self.ensure_loaded([student.subject])
+        self._refresh_grades()
+        grade_index = self._grade_index[student.subject]
+        grade = self._recorded_grades[student_id]
+        below = bisect_left(grade_index, (grade,))
+        above = len(grade_index) - bisect_right(grade_index, (grade, math.inf))
+        return {
+            "rank": above + 1,
+            "count": len(grade_index),
+            "percentile": below / len(grade_index) * 100,
+            "final_grade": grade,
+        }
+
+    # Method to get the grade statistics of each subject
+    def subject_statistics(self, subject=None):
+        """
+        Returns the running grade statistics of one or every subject. Only the
+        grades that changed since the last call are recomputed.
+
+        Parameters:
+            subject (str): Optional subject; defaults to every subject.
+
+        Returns:
+            dict: The statistics of the subject, or a mapping of subject to statistics.
+        """
+        self.ensure_loaded(None if subject is None else [subject])
+        self._refresh_grades()
+        if subject is not None:
+            return self._statistics.get(subject, SubjectStatistics()).summary()
+        return {name: statistics.summary() for name, statistics in self._statistics.items()}
+
+    # Method to print the grade statistics of every subject
+    def print_subject_statistics(self):
+        """
+        Prints the grade statistics of every subject.
+
+        Returns:
+            None
+        """
+        lines = ["\n===== SUBJECT STATISTICS =====\n"]
+        for subject, summary in self.subject_statistics().items():
+            lines.append(f"{subject}: {summary['count']} students\n")
+            if not summary["count"]:
+                continue
+            lines.append(f"  Average: {summary['mean']:.2f}  Std. Dev.: {math.sqrt(summary['variance']):.2f}  "
+                         f"Min: {summary['minimum']:.2f}  Max: {summary['maximum']:.2f}\n")
+            width = SubjectStatistics.BUCKET_WIDTH
+            for bucket, count in enumerate(summary["histogram"]):
+                upper = 100 if bucket == len(summary["histogram"]) - 1 else (bucket + 1) * width - 1
+                lines.append(f"  {bucket * width:>3}-{upper:<3} {count}\n")
+        lines.append("==============================\n")
+        sys.stdout.write("".join(lines))
+
+    # Method to report the effectiveness of the cached grades
+    def grade_cache_stats(self):
+        """
+        Returns the hit and miss counters of the grade caches of this school's students.
+
+        Returns:
+            dict: The number of cache hits and misses and the hit rate.
+        """
+        hits = self.grade_cache_hits
+        misses = self.grade_cache_misses
+        lookups = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0}
+
+    # Method to reset the grade cache counters
+    def reset_grade_cache_stats(self):
+        """
+        Resets the hit and miss counters of the grade caches of this school's students.
+
+        Returns:
+            None
+        """
+        self.grade_cache_hits = 0
+        self.grade_cache_misses = 0
+
+    # Method to start timing the instrumented operations
+    def enable_instrumentation(self):
+        """
+        Starts recording call counts, cumulative time and latency histograms for
+        the operations in INSTRUMENTED_OPERATIONS. The timed versions are only
+        installed on this school while instrumentation is enabled, so other
+        schools and a school that never enables it run the plain methods.
+
+        Returns:
+            None
+        """
+        if self.instrumented:
+            return
+        for name in self.INSTRUMENTED_OPERATIONS:
+            setattr(self, name, self._timed_operation(name, getattr(self, name)))
+        self.instrumented = True
+
+    # Method to stop timing the instrumented operations
+    def disable_instrumentation(self):
+        """
+        Stops recording metrics and restores the plain methods. The metrics
+        recorded so far are kept.
+
+        Returns:
+            None
+        """
+        if not self.instrumented:
+            return
+        for name in self.INSTRUMENTED_OPERATIONS:
+            vars(self).pop(name, None)
+        self.instrumented = False
+
+    # Method to return the recorded metrics
+    def metrics(self):
+        """
+        Returns the metrics recorded while instrumentation was enabled.
+
+        Returns:
+            dict: Operation name mapped to its OperationMetrics summary.
+        """
+        return {name: metrics.summary() for name, metrics in self._metrics.items()}
+
+    # Method to discard the recorded metrics
+    def reset_metrics(self):
+        """
+        Discards the metrics recorded so far.
+
+        Returns:
+            None
+        """
+        for metrics in self._metrics.values():
+            metrics.reset()
+
+    # Method to write the recorded metrics to a file
+    def export_metrics(self, file_path, metrics_format=None):
+        """
+        Writes the recorded metrics as JSON or in the Prometheus text exposition format.
+
+        Parameters:
+            file_path (str): The file to write.
+            metrics_format (str): "json" or "prometheus"; by default JSON for
+                files ending in .json and Prometheus text otherwise.
+
+        Returns:
+            None
+        """
+        if metrics_format is None:
+            metrics_format = "json" if file_path.lower().endswith(".json") else "prometheus"
+        if metrics_format == "json":
+            content = json.dumps(self.metrics(), indent=2) + "\n"
+        elif metrics_format == "prometheus":
+            content = self.format_prometheus_metrics()
+        else:
+            raise ValueError(f"Unknown metrics format: {metrics_format}")
+        self.write_file_atomically(file_path, lambda file: file.write(content))
+
+    # Method to render the recorded metrics in the Prometheus text format
+    def format_prometheus_metrics(self):
+        """
+        Renders the recorded metrics as a Prometheus histogram per operation.
+
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+        """
+        lines = [
+            "# HELP school_operation_seconds Time spent in School operations.\n",
+            "# TYPE school_operation_seconds histogram\n",
+        ]
+        for name, summary in self.metrics().items():
+            for bound, count in summary["buckets"].items():
+                lines.append(f'school_operation_seconds_bucket{{operation="{name}",le="{bound}"}} {count}\n')
+            lines.append(f'school_operation_seconds_sum{{operation="{name}"}} {summary["total_seconds"]!r}\n')
+            lines.append(f'school_operation_seconds_count{{operation="{name}"}} {summary["count"]}\n')
+        return "".join(lines)
+
+    # Method to print the recorded metrics as a table
+    def print_metrics(self):
+        """
+        Prints the call count, total, mean and maximum time of each instrumented operation.
+
+        Returns:
+            None
+        """
+        lines = ["=== Performance Metrics ===\n"]
+        metrics = self.metrics()
+        if not metrics:
+            lines.append("No metrics recorded.\n")
+        else:
+            lines.append(f"{'Operation':<24}{'Calls':>10}{'Total (s)':>12}{'Mean (ms)':>12}{'Max (ms)':>12}\n")
+            for name, summary in metrics.items():
+                mean = summary["mean_seconds"]
+                mean_text = f"{mean * 1000:.4f}" if mean is not None else "-"
+                lines.append(f"{name:<24}{summary['count']:>10}{summary['total_seconds']:>12.4f}{mean_text:>12}{summary['max_seconds'] * 1000:>12.4f}\n")
+        lines.append("===========================\n")
+        sys.stdout.write("".join(lines))
+
+    # Helper method to wrap a bound method in a timer recording into this school's metrics
+    def _timed_operation(self, name, method):
+        metrics = self._metrics.setdefault(name, OperationMetrics())
+        perf_counter = time.perf_counter
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                metrics.record(perf_counter() - start)
+
+        return timed
+
+    # Method to print information of all students in the school
+    def print_all_students_info(self):
+        """
+        Prints information of all students in the school.
+
+        Returns:
+            None
+        """
+        self.ensure_loaded()
+        if not self._students_by_id:
+            print("No students found.")
+        else:
+            # Render into one buffer and write it out once instead of printing line by line
+            lines = ["\n===== ALL STUDENTS =====\n"]
+            lines.extend(f"{student.subject}: {student.name} (ID: {student.student_id})\n" for student in self._students_by_id.values())
+            lines.append("=========================\n")
+            sys.stdout.write("".join(lines))
+
+    # Method to parse a single record from a subject file into a student object
+    def parse_student_record(self, subject, student_data):
+        """
+        Builds a student object from the comma-separated fields of one record.
+
+        Parameters:
+            subject (str): The subject the record belongs to.
+            student_data (list): The fields of the record, split on commas.
+
+        Returns:
+            Student or None: The parsed student object or None if the record is incomplete.
+        """
+        if len(student_data) < 3:
+            # Skip incomplete data
+            return None
+
+        definition = self.SUBJECTS.get(subject)
+        if definition is None:
+            # Invalid subject, skip this data
+            return None
+        return definition.parse(student_data)
+
+    # Method to format a student object as a single record of a subject file
+    def format_student_record(self, student):
+        """
+        Formats a student object as one comma-separated record.
+
+        Parameters:
+            student (Student): The student object to be formatted.
+
+        Returns:
+            str or None: The record without a trailing newline, or None for an unknown subject.
+        """
+        definition = self.SUBJECTS.get(student.subject)
+        if definition is None:
+            return None
+        return definition.format(student)
+
+    # Method to read the pending journal changes of a subject
+    def read_journal_changes(self, subject, keep=False):
+        """
+        Reads the change records left in a subject's journal. Malformed
+        records are skipped and reported in the subject's entry in
+        journal_errors as "Line N: problem" messages.
+
+        A journal kept by an earlier call is reused while the file is
+        unchanged, so indexed lookups and the load that follows them read
+        it once.
+
+        Parameters:
+            subject (str): The subject whose journal is to be read.
+            keep (bool): Keep the parsed journal for later calls.
+
+        Returns:
+            dict: A mapping of student ID to the latest student object, or None for removed students.
+        """
+        journal_path = self.JOURNAL_PATHS.get(subject, "")
+        try:
+            journal_stat = os.stat(journal_path)
+        except OSError:
+            self._journals.pop(subject, None)
+            self._journal_sizes[subject] = 0
+            self.journal_errors[subject] = []
+            return {}
+        signature = (journal_stat.st_size, journal_stat.st_mtime_ns, journal_stat.st_ino)
+
+        cached = self._journals.get(subject) if keep else self._journals.pop(subject, None)
+        if cached is not None and cached[0] == signature:
+            _, changes, self._journal_sizes[subject], errors = cached
+            self.journal_errors[subject] = list(errors)
+            # Callers consume the mapping, so each gets its own copy
+            return dict(changes)
+
+        changes = {}
+        errors = []
+        self._journal_sizes[subject] = 0
+        self.journal_errors[subject] = errors
+
+        definition = self.SUBJECTS[subject]
+        with open(journal_path, "r") as journal:
+            for number, line in enumerate(journal, 1):
+                # A final record without its newline was cut short by a crash
+                if not line.endswith("\n"):
+                    break
+                record = line.strip().split(",")
+                if record[0] == "U":
+                    problem = definition.describe_record_error(record[1:])
+                    if problem is not None:
+                        errors.append(f"Line {number}: {problem}")
+                        continue
+                    student = self.parse_student_record(subject, record[1:])
+                    if student is not None:
+                        changes[student.student_id] = student
+                elif record[0] == "D" and len(record) == 2:
+                    try:
+                        changes[int(record[1])] = None
+                    except ValueError:
+                        errors.append(f"Line {number}: Invalid student ID '{record[1]}'.")
+                        continue
+                elif line.strip():
+                    errors.append(f"Line {number}: Unknown journal record '{record[0]}'.")
+                    continue
+                else:
+                    continue
+                self._journal_sizes[subject] += 1
+        if keep:
+            self._journals[subject] = (signature, dict(changes), self._journal_sizes[subject], list(errors))
+        return changes
+
+    # Generator method to stream student data from a file for a given subject
+    def iter_student_data(self, subject, min_id=None, max_id=None):
+        """
+        Lazily yields the students stored in a subject's file, one line at a time.
+
+        Pending journal changes are applied while streaming: updated students
+        are yielded in place of their snapshot record, removed students are
+        skipped and students added since the last compaction come last.
+
+        Parameters:
+            subject (str): The subject for which student data is to be read.
+            min_id (int): Optional lowest student ID to yield.
+            max_id (int): Optional highest student ID to yield.
+
+        Yields:
+            Student: The student objects read from the file.
+        """
+        if subject not in self.FILE_PATHS:
+            return
+        if self.storage is not None:
+            yield from self.storage.iter_students(subject, min_id, max_id)
+            return
+
+        def in_range(student):
+            return (min_id is None or student.student_id >= min_id) and (max_id is None or student.student_id <= max_id)
+
+        # Only the journal is held in memory; it stays small between compactions.
+        # Open the snapshot and read the journal together under a shared lock, so
+        # both belong to the same version even if another writer compacts later
+        with self.subject_lock(subject, shared=True):
+            changes = self.read_journal_changes(subject)
+            snapshot = self._open_snapshot(subject)
+
+        students = self._apply_journal_changes(snapshot, changes)
+        if min_id is None and max_id is None:
+            yield from students
+        else:
+            yield from filter(in_range, students)
+
+    # Helper method opening a subject's snapshot file and returning an iterator over its students
+    def _open_snapshot(self, subject):
+        if self.storage_format == "binary":
+            return self.iter_binary_student_data(subject, open(self.BINARY_FILE_PATHS[subject], "rb"))
+        return self.iter_text_student_data(subject, open(self.FILE_PATHS[subject], "r"))
+
+    # Helper generator applying journal changes to the students of a snapshot
+    @staticmethod
+    def _apply_journal_changes(snapshot, changes):
+        if not changes:
+            yield from snapshot
+            return
+        for student in snapshot:
+            if student.student_id in changes:
+                student = changes.pop(student.student_id)
+                if student is None:
+                    continue
+            yield student
+
+        # Yield the students that only exist in the journal
+        for student in changes.values():
+            if student is not None:
+                yield student
+
+    # Generator method to stream the students stored in a subject's text file
+    def iter_text_student_data(self, subject, file=None, errors=None):
+        """
+        Lazily yields the students stored in a subject's text file, without
+        applying the journal. Malformed records are skipped and reported in
+        errors, which also becomes the subject's entry in record_errors.
+
+        Parameters:
+            subject (str): The subject for which student data is to be read.
+            file (file): Optional file already opened for reading; it is closed afterwards.
+            errors (list): Optional list receiving a "Line N: problem" message per malformed record.
+
+        Yields:
+            Student: The student objects read from the file.
+        """
+        if file is None:
+            file = open(self.FILE_PATHS[subject], "r")
+        if errors is None:
+            errors = []
+        self.record_errors[subject] = errors
+        with file:
+            yield from self.SUBJECTS[subject].parse_lines(file, errors)
+
+    # Generator method to load the students stored in a subject's binary file
+    def iter_binary_student_data(self, subject, file=None):
+        """
+        Yields the students stored in a subject's binary file, without applying
+        the journal.
+
+        The file is memory-mapped and its ID and score columns are read through
+        typed memoryviews, so no text has to be split or parsed as floats.
+
+        Parameters:
+            subject (str): The subject for which student data is to be read.
+            file (file): Optional file already opened for binary reading; it is closed afterwards.
+
+        Yields:
+            Student: The student objects read from the file.
+        """
+        if file is None:
+            file = open(self.BINARY_FILE_PATHS[subject], "rb")
+        with file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    yield from self._iter_binary_columns(subject, view)
+                finally:
+                    view.release()
+
+    # Helper generator building students from the columns of a mapped binary
+    # file, optionally only those in the given rows
+    def _iter_binary_columns(self, subject, view, rows=None):
+        magic, version, column_count, count, names_size = self.BINARY_HEADER.unpack_from(view)
+        if magic != self.BINARY_MAGIC or version != self.BINARY_VERSION:
+            raise ValueError(f"Not a student data file: {self.BINARY_FILE_PATHS[subject]}")
+        if column_count != len(self.BINARY_COLUMNS[subject]):
+            raise ValueError(f"Unexpected column count in {self.BINARY_FILE_PATHS[subject]}")
+
+        # Slice the typed columns straight out of the mapping
+        offset = self.BINARY_HEADER.size
+        ids = view[offset:offset + 8 * count].cast("q")
+        offset += 8 * count
+        columns = []
+        for _ in range(column_count):
+            columns.append(view[offset:offset + 8 * count].cast("d"))
+            offset += 8 * count
+        name_offsets = view[offset:offset + 4 * (count + 1)].cast("I")
+        offset += 4 * (count + 1)
+        names = view[offset:offset + names_size]
+
+        # Each row is built by the subject's compiled column reader
+        from_columns = self.SUBJECTS[subject].from_columns
+        try:
+            for row in (range(count) if rows is None else rows):
+                name = str(names[name_offsets[row]:name_offsets[row + 1]], "utf-8")
+                yield from_columns(name, ids[row], columns, row)
+        finally:
+            # Views into the mapping must be released before it is closed
+            for column in [ids, name_offsets, names] + columns:
+                column.release()
+
+    # Method to read one student by seeking through a subject's index file
+    def read_indexed_student(self, subject, student_id):
+        """
+        Reads a single student of a subject without reading the rest of the
+        subject: the index file gives the position of the student's record in
+        the snapshot, and pending journal changes are applied on top.
+
+        Parameters:
+            subject (str): The subject to search.
+            student_id (int): The ID of the student to be read.
+
+        Returns:
+            tuple: Whether the subject has an index matching its snapshot, and
+            the student object or None if the subject has no such student.
+        """
+        with self.subject_lock(subject, shared=True):
+            index = self._open_index(subject)
+            if index is None:
+                return False, None
+            changes = self.read_journal_changes(subject, keep=True)
+            if student_id in changes:
+                return True, changes[student_id]
+
+            ids, positions = index
+            entry = bisect_left(ids, student_id)
+            if entry == len(ids) or ids[entry] != student_id:
+                return True, None
+            return True, self._read_record_at(subject, positions[entry])
+
+    # Helper method returning the IDs and positions of a subject's index, or None
+    # if the index is missing or was built for another version of the snapshot;
+    # the caller holds the subject lock
+    def _open_index(self, subject):
+        snapshot_path = self.BINARY_FILE_PATHS[subject] if self.storage_format == "binary" else self.FILE_PATHS[subject]
+        try:
+            snapshot = os.stat(snapshot_path)
+        except OSError:
+            return None
+        signature = (snapshot.st_size, snapshot.st_mtime_ns, snapshot.st_ino)
+
+        cached = self._indexes.get(subject)
+        if cached is not None and cached[0] == signature:
+            return cached[1], cached[2]
+
+        try:
+            with open(self.INDEX_PATHS[subject], "rb") as file:
+                magic, version, count, *built_for = self.INDEX_HEADER.unpack(file.read(self.INDEX_HEADER.size))
+                if magic != self.INDEX_MAGIC or version != self.INDEX_VERSION or tuple(built_for) != signature:
+                    return None
+                ids = array("q")
+                positions = array("q")
+                ids.fromfile(file, count)
+                positions.fromfile(file, count)
+        except (OSError, EOFError, struct.error):
+            return None
+
+        self._indexes[subject] = (signature, ids, positions)
+        return ids, positions
+
+    # Helper method reading the record at a position of a subject's snapshot
+    def _read_record_at(self, subject, position):
+        if self.storage_format == "binary":
+            with open(self.BINARY_FILE_PATHS[subject], "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    rows = self._iter_binary_columns(subject, view, [position])
+                    try:
+                        return next(rows)
+                    finally:
+                        rows.close()
+                        view.release()
+
+        with open(self.FILE_PATHS[subject], "r") as file:
+            file.seek(position)
+            errors = []
+            for student in self.SUBJECTS[subject].parse_lines([file.readline()], errors):
+                return student
+            self.record_errors[subject] = [error.replace("Line 1", f"Record at offset {position}", 1) for error in errors]
+            return None
+
+    # Method to validate subject files without loading them
+    def check_student_data(self, subjects=None):
+        """
+        Reads the text files of several subjects through the validating parser
+        without adding anything to the school.
+
+        Parameters:
+            subjects (iterable): Optional subjects to check; defaults to every subject.
+
+        Returns:
+            dict: Subject mapped to its list of "Line N: problem" messages, empty if the file is valid.
+        """
+        report = {}
+        for subject in self.FILE_PATHS if subjects is None else subjects:
+            errors = []
+            if os.path.exists(self.FILE_PATHS[subject]):
+                for _ in self.iter_text_student_data(subject, errors=errors):
+                    pass
+            report[subject] = errors
+        return report
+
+    # Method to print the malformed records skipped while reading subject files
+    def print_record_errors(self, subjects=None, limit=10):
+        """
+        Prints the malformed records skipped by the last read of each subject's
+        text file and journal.
+
+        Parameters:
+            subjects (iterable): Optional subjects to report on; defaults to every subject.
+            limit (int): The most messages to print per subject, or None for all of them.
+
+        Returns:
+            int: The number of malformed records.
+        """
+        total = 0
+        for subject in self.FILE_PATHS if subjects is None else subjects:
+            for errors, path in ((self.record_errors.get(subject), self.FILE_PATHS[subject]),
+                                 (self.journal_errors.get(subject), self.JOURNAL_PATHS[subject])):
+                if not errors:
+                    continue
+                total += len(errors)
+                print(f"Error: Skipped {len(errors)} malformed record(s) in {path}:")
+                for error in errors[:limit]:
+                    print(f"  {error}")
+                if limit is not None and len(errors) > limit:
+                    print(f"  ... and {len(errors) - limit} more.")
+        return total
+
+    # Generator method to stream student data for several subjects
+    def iter_students(self, subjects=None, min_id=None, max_id=None):
+        """
+        Lazily yields the students stored in the files of several subjects.
+
+        Parameters:
+            subjects (iterable): Optional subjects to read; defaults to every subject.
+            min_id (int): Optional lowest student ID to yield.
+            max_id (int): Optional highest student ID to yield.
+
+        Yields:
+            Student: The student objects read from the files.
+        """
+        for subject in (self.FILE_PATHS if subjects is None else subjects):
+            yield from self.iter_student_data(subject, min_id, max_id)
+
+    # Method to read student data from a file for a given subject
+    def read_student_data(self, subject):
+        """
+        Reads student data from a file for a given subject.
+
+        The snapshot file is read first and any change records left in the
+        subject's journal are then replayed on top of it.
+
+        Parameters:
+            subject (str): The subject for which student data is to be read.
+
+        Returns:
+            list: A list of student objects read from the file.
+        """
+        return list(self.iter_student_data(subject))
+
+    # Method to describe where and how this school stores its files
+    def storage_config(self):
+        """
+        Returns the settings a worker process needs to read or write this
+        school's files.
+
+        Returns:
+            dict: The storage format and the file paths of every subject.
+        """
+        return {
+            "storage_format": self.storage_format,
+            "FILE_PATHS": self.FILE_PATHS,
+            "BINARY_FILE_PATHS": self.BINARY_FILE_PATHS,
+            "JOURNAL_PATHS": self.JOURNAL_PATHS,
+            "INDEX_PATHS": self.INDEX_PATHS,
+        }
+
+    # Class method to create a school from the settings returned by storage_config
+    @classmethod
+    def from_storage_config(cls, config):
+        """
+        Creates an empty school that reads and writes the files described by
+        a storage configuration.
+
+        Parameters:
+            config (dict): The settings returned by storage_config.
+
+        Returns:
+            School: The new school object.
+        """
+        school = cls(storage_format=config["storage_format"])
+        school.FILE_PATHS = config["FILE_PATHS"]
+        school.BINARY_FILE_PATHS = config["BINARY_FILE_PATHS"]
+        school.JOURNAL_PATHS = config["JOURNAL_PATHS"]
+        school.INDEX_PATHS = config["INDEX_PATHS"]
+        return school
+
+    # Method to read the data of several subjects concurrently
+    def read_all_student_data(self, subjects=None, use_processes=False):
+        """
+        Reads the files of several subjects concurrently, one worker per subject.
+
+        Threads only overlap the file reads: parsing holds the interpreter
+        lock, so a threaded load takes about as long as reading the subjects
+        one after another. Worker processes parse in parallel, but every
+        student is pickled back to this process, which costs about as much
+        as parsing it, so they only pay off with a free core per subject.
+
+        Parameters:
+            subjects (iterable): Optional subjects to read; defaults to every subject.
+            use_processes (bool): Use worker processes instead of threads.
+
+        Returns:
+            list: The student objects read, grouped by subject in the order given.
+        """
+        subjects = list(self.FILE_PATHS if subjects is None else subjects)
+        if not subjects:
+            return []
+
+        students = []
+        # A storage backend's connection stays in this process, so it is read from threads
+        if use_processes and self.storage is None:
+            config = self.storage_config()
+            with ProcessPoolExecutor(max_workers=len(subjects)) as executor:
+                results = executor.map(_read_subject_worker, [config] * len(subjects), subjects)
+                for subject, (subject_students, journal_size, errors, journal_errors) in zip(subjects, results):
+                    students.extend(subject_students)
+                    self._journal_sizes[subject] = journal_size
+                    self.record_errors[subject] = errors
+                    self.journal_errors[subject] = journal_errors
+        else:
+            with ThreadPoolExecutor(max_workers=len(subjects)) as executor:
+                for subject_students in executor.map(self.read_student_data, subjects):
+                    students.extend(subject_students)
+        return students
+
+    # Method to write the data of several subjects concurrently
+    def write_all_student_data(self, subjects=None, use_processes=False):
+        """
+        Writes the files of several subjects concurrently. Each worker is
+        handed only its own subject's students. As with reading, threads only
+        overlap the file writes, since formatting holds the interpreter lock.
+
+        Parameters:
+            subjects (iterable): Optional subjects to write; defaults to every subject.
+            use_processes (bool): Use worker processes instead of threads.
+
+        Returns:
+            None
+        """
+        subjects = [subject for subject in (self.FILE_PATHS if subjects is None else subjects) if subject in self.FILE_PATHS]
+        if not subjects:
+            return
+
+        # Take each subject's partition up front so workers never share state
+        self.ensure_loaded(subjects)
+        partitions = [list(self._students_by_subject.get(subject, {}).values()) for subject in subjects]
+        if use_processes and self.storage is None:
+            config = self.storage_config()
+            with ProcessPoolExecutor(max_workers=len(subjects)) as executor:
+                list(executor.map(_write_subject_worker, [config] * len(subjects), subjects, partitions))
+            for subject in subjects:
+                self._journal_sizes[subject] = 0
+        else:
+            with ThreadPoolExecutor(max_workers=len(subjects)) as executor:
+                list(executor.map(self.write_student_data, subjects, partitions))
+
+    # Method to load every subject's students on a background thread
+    def load_student_data_in_background(self, subjects=None):
+        """
+        Starts loading the students of every subject on a background thread so
+        the caller can carry on (e.g. show the menu) while the files are read.
+
+        Parameters:
+            subjects (iterable): Optional subjects to load; defaults to every subject.
+
+        Returns:
+            None
+        """
+        self._loaded.clear()
+        self._load_error = None
+
+        def load():
+            try:
+                self._load_subjects(self.FILE_PATHS if subjects is None else subjects)
+            except Exception as error:
+                self._load_error = error
+            finally:
+                self._loaded.set()
+
+        threading.Thread(target=load, daemon=True).start()
+
+    # Method to wait for a background load to finish
+    def wait_until_loaded(self):
+        """
+        Blocks until a background load started by load_student_data_in_background
+        has finished, re-raising any error it ran into.
+
+        Returns:
+            None
+        """
+        self._loaded.wait()
+        if self._load_error is not None:
+            error, self._load_error = self._load_error, None
+            raise error
+
+    # Method to make sure the students of some subjects are loaded
+    def ensure_loaded(self, subjects=None):
+        """
+        Loads the students of every given subject that has not been loaded
+        yet. Operations that need every student of a subject call this first,
+        so a lazy school reads each subject the first time it is needed.
+
+        Parameters:
+            subjects (iterable): Optional subjects to load; defaults to every subject.
+
+        Returns:
+            None
+        """
+        self.wait_until_loaded()
+        missing = [subject for subject in (self.FILE_PATHS if subjects is None else subjects) if subject not in self._loaded_subjects]
+        if missing:
+            self._load_subjects(missing)
+
+    # Helper method loading whole subjects. Students already in memory (loaded on
+    # demand or added since) are kept, but moved so the roster stays in file order
+    # with students not saved yet at the end.
+    def _load_subjects(self, subjects):
+        subjects = list(subjects)
+        if self._dirty:
+            self.flush(subjects)
+        earlier = {student_id: student for student_id, student in self._students_by_id.items() if student.subject in subjects}
+        for student in self.read_all_student_data(subjects):
+            if student.student_id in earlier:
+                self._move_to_end(earlier.pop(student.student_id))
+            else:
+                self.add_student(student)
+        for student in earlier.values():
+            self._move_to_end(student)
+        self._loaded_subjects.update(subjects)
+        self.print_record_errors(subjects)
+
+    # Helper method moving a student to the end of the insertion-ordered indexes
+    def _move_to_end(self, student):
+        student_id = student.student_id
+        for index in (self._students_by_id, self._students_by_subject[student.subject], self._students_by_name[student.name]):
+            index[student_id] = index.pop(student_id)
+
+    # Context manager locking a subject's files against other threads and processes
+    @contextmanager
+    def subject_lock(self, subject, shared=False):
+        """
+        Locks a subject's files. Exclusive locks are taken by writers: a
+        per-subject thread lock within this process plus an advisory lock on
+        the subject's .lock file across processes. Shared locks are taken by
+        readers and only use the advisory file lock.
+
+        Parameters:
+            subject (str): The subject whose files are locked.
+            shared (bool): Take a shared (read) lock instead of an exclusive one.
+
+        Yields:
+            None
+        """
+        lock_path = self.FILE_PATHS[subject] + ".lock"
+        thread_lock = None
+        if not shared:
+            with _subject_locks_guard:
+                thread_lock = _subject_locks.setdefault(os.path.abspath(lock_path), threading.Lock())
+            thread_lock.acquire()
+        try:
+            with open(lock_path, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                # Closing the lock file releases the advisory lock
+                yield
+        finally:
+            if thread_lock is not None:
+                thread_lock.release()
+
+    # Method to replace a file atomically
+    def write_file_atomically(self, file_path, write, binary=False):
+        """
+        Writes a file through a temporary file in the same directory that is
+        flushed to disk and then renamed over the target, so a crash leaves
+        either the old or the new file, never a truncated one. With the
+        "never" fsync policy the temporary file is not forced to disk, and
+        with "always" the rename is as well.
+
+        Parameters:
+            file_path (str): The file to replace.
+            write (callable): Called with the open temporary file to write the contents.
+            binary (bool): Open the temporary file in binary mode.
+
+        Returns:
+            None
+        """
+        directory = os.path.dirname(os.path.abspath(file_path))
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(file_path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb" if binary else "w") as file:
+                write(file)
+                file.flush()
+                if self.fsync != "never":
+                    os.fsync(file.fileno())
+            os.replace(temporary_path, file_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        if self.fsync == "always":
+            _fsync_directory(directory)
+
+    # Method to write student data to a file for a given subject
+    def write_student_data(self, subject, students=None):
+        """
+        Writes student data to a file for a given subject.
+
+        Writing a full snapshot also compacts the subject: the journal is
+        emptied because every change it held is now part of the snapshot.
+        The file is replaced atomically while the subject is locked.
+
+        Parameters:
+            subject (str): The subject for which student data is to be written.
+            students (iterable): Optional students to write; defaults to the
+                school's students of that subject.
+
+        Returns:
+            None
+        """
+        if subject not in self.FILE_PATHS:
+            return
+
+        if students is None:
+            self.ensure_loaded([subject])
+            students = list(self._students_by_subject.get(subject, {}).values())
+        if self.storage is not None:
+            self.storage.write_students(subject, students)
+            return
+        with self.subject_lock(subject):
+            self._write_snapshot(subject, students)
+
+    # Method to compact a subject's journal into its snapshot file
+    def compact_student_data(self, subject):
+        """
+        Folds a subject's journal into its snapshot file. Unlike
+        write_student_data, the new snapshot is built from the files on disk
+        rather than from this school's students, so changes journaled by other
+        processes are kept.
+
+        Parameters:
+            subject (str): The subject to be compacted.
+
+        Returns:
+            None
+        """
+        # Write-behind changes go out first so the snapshot includes them
+        self.flush([subject])
+        # Storage backends apply every change in place, so there is nothing to compact
+        if subject not in self.FILE_PATHS or self.storage is not None:
+            return
+
+        with self.subject_lock(subject):
+            # Nothing to fold in, and the index already matches the snapshot
+            if not os.path.exists(self.JOURNAL_PATHS[subject]) and self._open_index(subject) is not None:
+                return
+            changes = self.read_journal_changes(subject)
+            snapshot = self._open_snapshot(subject)
+            self._write_snapshot(subject, self._apply_journal_changes(snapshot, changes))
+
+    # Method to compact the journals of several subjects concurrently
+    def compact_all_student_data(self, subjects=None):
+        """
+        Compacts the journals of several subjects concurrently.
+
+        Parameters:
+            subjects (iterable): Optional subjects to compact; defaults to every subject.
+
+        Returns:
+            None
+        """
+        subjects = list(self.FILE_PATHS if subjects is None else subjects)
+        with ThreadPoolExecutor(max_workers=max(len(subjects), 1)) as executor:
+            list(executor.map(self.compact_student_data, subjects))
+
+    # Helper method writing a snapshot and its index and discarding the journal;
+    # the caller holds the subject lock
+    def _write_snapshot(self, subject, students):
+        if self.storage_format == "binary":
+            ids, positions = self.write_binary_student_data(subject, students)
+        else:
+            ids, positions = self.write_text_student_data(subject, students)
+        self._write_index(subject, ids, positions)
+
+        # The snapshot now holds every change, so the journal can be discarded
+        journal_path = self.JOURNAL_PATHS.get(subject, "")
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+        self._journal_sizes[subject] = 0
+
+    # Helper method writing the index file of a subject's snapshot; the caller holds the subject lock
+    def _write_index(self, subject, ids, positions):
+        snapshot_path = self.BINARY_FILE_PATHS[subject] if self.storage_format == "binary" else self.FILE_PATHS[subject]
+        snapshot = os.stat(snapshot_path)
+
+        # Sort the entries by ID so lookups can use a binary search
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        sorted_ids = array("q", [ids[entry] for entry in order])
+        sorted_positions = array("q", [positions[entry] for entry in order])
+
+        def write(file):
+            file.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC, self.INDEX_VERSION, len(sorted_ids),
+                                              snapshot.st_size, snapshot.st_mtime_ns, snapshot.st_ino))
+            file.write(sorted_ids.tobytes())
+            file.write(sorted_positions.tobytes())
+
+        self.write_file_atomically(self.INDEX_PATHS[subject], write, binary=True)
+
+    # Method to write students to a subject's text file
+    def write_text_student_data(self, subject, students):
+        """
+        Atomically writes students to a subject's text file, one comma-separated
+        record per line. Callers are expected to hold the subject lock.
+
+        Parameters:
+            subject (str): The subject whose file is to be written.
+            students (iterable): The student objects to be written.
+
+        Returns:
+            tuple: Arrays of the IDs written and the byte offset of each record.
+        """
+        ids = array("q")
+        offsets = array("q")
+
+        def write(file):
+            offset = 0
+            for student in students:
+                record = self.format_student_record(student)
+                if record is not None:
+                    line = record + "\n"
+                    file.write(line)
+                    ids.append(student.student_id)
+                    offsets.append(offset)
+                    offset += len(line) if line.isascii() else len(line.encode(file.encoding))
+
+        self.write_file_atomically(self.FILE_PATHS[subject], write)
+        return ids, offsets
+
+    # Method to write students to a subject's binary file
+    def write_binary_student_data(self, subject, students):
+        """
+        Atomically writes students to a subject's binary file: a header, a column
+        of IDs, one float column per score and a table of UTF-8 encoded names.
+        Callers are expected to hold the subject lock. Scores are read back as
+        floats, so an integer score such as 0 becomes 0.0.
+
+        Parameters:
+            subject (str): The subject whose file is to be written.
+            students (iterable): The student objects to be written.
+
+        Returns:
+            tuple: Arrays of the IDs written and the row of each student.
+        """
+        column_names = self.BINARY_COLUMNS[subject]
+        ids = array("q")
+        columns = [array("d") for _ in column_names]
+        name_offsets = array("I", [0])
+        names = bytearray()
+
+        to_row = self.SUBJECTS[subject].to_row
+        for student in students:
+            row = to_row(student)
+            ids.append(student.student_id)
+            for column, value in zip(columns, row):
+                column.append(value)
+            names += student.name.encode("utf-8")
+            name_offsets.append(len(names))
+
+        def write(file):
+            file.write(self.BINARY_HEADER.pack(self.BINARY_MAGIC, self.BINARY_VERSION, len(column_names), len(ids), len(names)))
+            file.write(ids.tobytes())
+            for column in columns:
+                file.write(column.tobytes())
+            file.write(name_offsets.tobytes())
+            file.write(names)
+
+        self.write_file_atomically(self.BINARY_FILE_PATHS[subject], write, binary=True)
+        return ids, array("q", range(len(ids)))
+
+    # Method to convert a subject's text file into the binary format
+    def convert_text_to_binary(self, subject):
+        """
+        Converts a subject's text file into a binary file with the same students.
+
+        Parameters:
+            subject (str): The subject to be converted.
+
+        Returns:
+            None
+        """
+        with self.subject_lock(subject):
+            self.write_binary_student_data(subject, self.iter_text_student_data(subject))
+
+    # Method to convert a subject's binary file into the text format
+    def convert_binary_to_text(self, subject):
+        """
+        Converts a subject's binary file into a text file with the same students.
+        Every score is written as a float, e.g. 0.0 for a score stored from 0.
+
+        Parameters:
+            subject (str): The subject to be converted.
+
+        Returns:
+            None
+        """
+        with self.subject_lock(subject):
+            self.write_text_student_data(subject, list(self.iter_binary_student_data(subject)))
+
+    # Method to append a change record to the journal of a subject
+    def append_journal_record(self, subject, record):
+        """
+        Appends a change record to the journal of a subject, compacting the
+        subject once the journal grows past the compaction threshold.
+
+        Parameters:
+            subject (str): The subject whose journal receives the record.
+            record (str): The change record without a trailing newline.
+
+        Returns:
+            None
+        """
+        self.append_journal_records(subject, [record])
+
+    # Method to append several change records to the journal of a subject at once
+    def append_journal_records(self, subject, records):
+        """
+        Appends change records to the journal of a subject with a single
+        write, compacting the subject once the journal grows past the
+        compaction threshold. A record left incomplete at the end of the
+        journal by an interrupted append is cut off first.
+
+        Parameters:
+            subject (str): The subject whose journal receives the records.
+            records (list): The change records without trailing newlines.
+
+        Returns:
+            None
+        """
+        journal_path = self.JOURNAL_PATHS.get(subject, "")
+        if not journal_path or not records:
+            return
+
+        # The records are written with a single call while the subject is locked,
+        # so concurrent writers never interleave partial records
+        with self.subject_lock(subject):
+            with open(journal_path, "ab+") as raw:
+                _truncate_torn_record(raw)
+                journal = io.TextIOWrapper(raw)
+                journal.write("".join(record + "\n" for record in records))
+                journal.flush()
+                if self.fsync == "always":
+                    os.fsync(raw.fileno())
+                journal.detach()
+        self._journal_sizes[subject] = self._journal_sizes.get(subject, 0) + len(records)
+
+        if self._journal_sizes[subject] >= self.compaction_threshold:
+            self.compact_student_data(subject)
+
+    # Method to persist a new or updated student
+    def save_student(self, student):
+        """
+        Persists a new or updated student, either as a single journal record
+        or by rewriting the whole subject file when journaling is disabled.
+
+        Parameters:
+            student (Student): The student object to be saved.
+
+        Returns:
+            None
+        """
+        if self.write_behind:
+            # The change goes into the history once a flush has written it
+            self._mark_dirty([student])
+            return
+        if self.storage is not None:
+            self.storage.save_students([student])
+        elif not self.journaling:
+            self.write_student_data(student.subject)
+        else:
+            record = self.format_student_record(student)
+            if record is not None:
+                self.append_journal_record(student.subject, f"U,{record}")
+
+        # Only a change that was saved goes into the history
+        if self.history is not None:
+            self.history.record_students([student])
+
+    # Method to persist the removal of a student
+    def save_removal(self, student):
+        """
+        Persists the removal of a student, either as a single tombstone record
+        or by rewriting the whole subject file when journaling is disabled.
+
+        Parameters:
+            student (Student): The student object that was removed.
+
+        Returns:
+            None
+        """
+        if self.write_behind:
+            self._mark_dirty([student], removed=True)
+            return
+        if self.storage is not None:
+            self.storage.delete_student(student)
+        elif not self.journaling:
+            self.write_student_data(student.subject)
+        else:
+            self.append_journal_record(student.subject, f"D,{student.student_id}")
+
+        if self.history is not None:
+            self.history.record_removals([student])
+
+    # Method to persist several new or updated students at once
+    def save_students(self, students):
+        """
+        Persists several new or updated students: in one batched transaction
+        with a storage backend, as one journal append per subject when
+        journaling, or otherwise by rewriting each touched subject file once.
+
+        Parameters:
+            students (iterable): The student objects to be saved.
+
+        Returns:
+            None
+        """
+        students = list(students)
+        if self.write_behind:
+            self._mark_dirty(students)
+            return
+        if self.storage is not None:
+            self.storage.save_students(students)
+        elif self.journaling:
+            records = {}
+            for student in students:
+                record = self.format_student_record(student)
+                if record is not None:
+                    records.setdefault(student.subject, []).append(f"U,{record}")
+            for subject, subject_records in records.items():
+                self.append_journal_records(subject, subject_records)
+        else:
+            for subject in {student.subject for student in students}:
+                self.write_student_data(subject)
+
+        if self.history is not None:
+            self.history.record_students(students)
+
+    # Method to write the changes saved in write-behind mode
+    def flush(self, subjects=None):
+        """
+        Writes the changes saved in write-behind mode since the last flush,
+        in one batch per subject: a single journal append when journaling,
+        one rewrite of the subject file otherwise, or one transaction with a
+        storage backend. Changes that could not be written stay dirty.
+
+        Parameters:
+            subjects (iterable): Optional subjects to flush; defaults to every subject.
+
+        Returns:
+            int: The number of students whose changes were written.
+        """
+        with self._flush_lock:
+            with self._dirty_lock:
+                pending = [(subject, self._dirty.pop(subject)) for subject in list(self._dirty) if subjects is None or subject in subjects]
+                # Changes marked from now on start a new flush window
+                if not self._dirty and self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+
+            flushed = 0
+            for position, (subject, changes) in enumerate(pending):
+                try:
+                    self._flush_subject(subject, list(changes.values()))
+                except BaseException:
+                    self._restore_dirty(pending[position:])
+                    raise
+                flushed += len(changes)
+            return flushed
+
+    # Method to count the students with changes not written yet
+    def count_dirty(self):
+        """
+        Counts the students whose write-behind changes are not written yet.
+
+        Returns:
+            int: The number of dirty students.
+        """
+        with self._dirty_lock:
+            return sum(len(changes) for changes in self._dirty.values())
+
+    # Helper method recording saved changes for the next write-behind flush
+    def _mark_dirty(self, students, removed=False):
+        with self._dirty_lock:
+            for student in students:
+                self._dirty.setdefault(student.subject, {})[student.student_id] = (student, removed)
+            dirty = sum(len(changes) for changes in self._dirty.values())
+            self._arm_flush_timer()
+        if dirty >= self.flush_threshold:
+            self.flush()
+
+    # Helper method writing the dirty changes of one subject
+    def _flush_subject(self, subject, changes):
+        if self.storage is not None:
+            saved = [student for student, removed in changes if not removed]
+            if saved:
+                self.storage.save_students(saved)
+            for student, removed in changes:
+                if removed:
+                    self.storage.delete_student(student)
+        elif self.journaling:
+            records = []
+            for student, removed in changes:
+                record = f"D,{student.student_id}" if removed else self.format_student_record(student)
+                if record is not None:
+                    records.append(record if removed else f"U,{record}")
+            self.append_journal_records(subject, records)
+        else:
+            self.write_student_data(subject)
+
+        # Only changes that were written go into the history
+        if self.history is not None:
+            saved = [student for student, removed in changes if not removed]
+            removals = [student for student, removed in changes if removed]
+            if saved:
+                self.history.record_students(saved)
+            if removals:
+                self.history.record_removals(removals)
+
+    # Helper method putting back changes that failed to be written, unless newer ones replaced them
+    def _restore_dirty(self, pending):
+        with self._dirty_lock:
+            for subject, changes in pending:
+                dirty = self._dirty.setdefault(subject, {})
+                for student_id, change in changes.items():
+                    dirty.setdefault(student_id, change)
+            # The restored changes are retried when the timer fires again
+            if self._dirty:
+                self._arm_flush_timer()
+
+    # Helper method starting the write-behind timer unless it is already running;
+    # the caller holds the dirty lock
+    def _arm_flush_timer(self):
+        if self._flush_timer is None and self.flush_interval is not None:
+            self._flush_timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    # Helper method flushing when the write-behind timer fires
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception as error:
+            print(f"Error: Could not write the saved changes: {error}")
+
+    # Method to copy the subject files into a storage backend
+    def migrate_to_storage(self, storage, subjects=None):
+        """
+        Copies the students in this school's subject files, with their
+        journals applied, into a storage backend, replacing what it held.
+
+        Parameters:
+            storage (StorageBackend): The backend receiving the students.
+            subjects (iterable): Optional subjects to copy; defaults to every subject.
+
+        Returns:
+            dict: The number of students copied for each subject.
+        """
+        if self.storage is not None:
+            raise ValueError("The school already reads from a storage backend.")
+        counts = {}
+        for subject in (self.FILE_PATHS if subjects is None else subjects):
+            students = list(self.iter_student_data(subject))
+            storage.write_students(subject, students)
+            counts[subject] = len(students)
+        return counts
+
+    # Method to export the stored students into a compressed archive
+    def export_archive(self, file_path, subjects=None, codec="zlib", level=None, chunk_size=10000):
+        """
+        Writes the stored students of several subjects, with their journals
+        applied, into a single compressed archive. Each subject is split into
+        chunks of chunk_size records that are compressed separately, and a
+        table at the end of the archive records the subject, ID range and
+        position of every chunk, so one subject or ID range can be read back
+        without decompressing the rest. The archive is replaced atomically.
+        Records are stored as text lines in the subject file format; a text
+        file without pending journal changes is copied line by line, without
+        parsing and formatting every student.
+
+        Parameters:
+            file_path (str): The archive to write.
+            subjects (iterable): Optional subjects to export; defaults to every subject.
+            codec (str): "zlib", or "zstd" if the zstandard package is installed.
+            level (int): Optional compression level; defaults to the codec's default.
+            chunk_size (int): The number of students per chunk.
+
+        Returns:
+            dict: The number of records exported for each subject.
+        """
+        compress = _archive_compressor(codec, level)
+        subjects = list(self.FILE_PATHS if subjects is None else subjects)
+        for subject in subjects:
+            if subject not in self.FILE_PATHS:
+                raise ValueError(f"Unknown subject: {subject}")
+        # Saved changes still waiting in write-behind mode belong in the export
+        self.flush(subjects)
+
+        counts = {}
+
+        def write(file):
+            file.write(self.ARCHIVE_HEADER.pack(self.ARCHIVE_MAGIC, self.ARCHIVE_VERSION, self.ARCHIVE_CODECS.index(codec)))
+            chunks = []
+            for subject in subjects:
+                counts[subject] = 0
+                lines = self._iter_archive_lines(subject)
+                while True:
+                    batch = list(islice(lines, chunk_size))
+                    if not batch:
+                        break
+                    data = "".join(batch).encode("utf-8")
+                    payload = compress(data)
+                    ids = []
+                    for line in batch:
+                        try:
+                            ids.append(int(line.split(",", 3)[2]))
+                        except (IndexError, ValueError):
+                            # Malformed records are skipped when the chunk is read
+                            continue
+                    # A chunk without valid IDs gets an empty range
+                    low, high = (min(ids), max(ids)) if ids else (0, -1)
+                    chunks.append([subject, file.tell(), len(payload), len(batch), low, high, counts[subject], zlib.crc32(data)])
+                    file.write(payload)
+                    counts[subject] += len(batch)
+
+            table = zlib.compress(json.dumps(chunks).encode("utf-8"))
+            table_offset = file.tell()
+            file.write(table)
+            file.write(self.ARCHIVE_TRAILER.pack(table_offset, len(table), self.ARCHIVE_MAGIC))
+
+        self.write_file_atomically(file_path, write, binary=True)
+        return counts
+
+    # Method to read the table of chunks of an archive
+    def read_archive_table(self, file_path):
+        """
+        Reads the codec and the table of chunks of an archive.
+
+        Parameters:
+            file_path (str): The archive to read.
+
+        Returns:
+            tuple: The codec name and a list of dictionaries with the fields in ARCHIVE_CHUNK_FIELDS.
+        """
+        with open(file_path, "rb") as file:
+            header = file.read(self.ARCHIVE_HEADER.size)
+            if len(header) < self.ARCHIVE_HEADER.size:
+                raise ValueError(f"Not a student archive: {file_path}")
+            magic, version, codec_number = self.ARCHIVE_HEADER.unpack(header)
+            if magic != self.ARCHIVE_MAGIC or version != self.ARCHIVE_VERSION or codec_number >= len(self.ARCHIVE_CODECS):
+                raise ValueError(f"Not a student archive: {file_path}")
+            end = file.seek(0, os.SEEK_END)
+            if end < self.ARCHIVE_HEADER.size + self.ARCHIVE_TRAILER.size:
+                raise ValueError(f"Incomplete student archive: {file_path}")
+            file.seek(end - self.ARCHIVE_TRAILER.size)
+            table_offset, table_size, magic = self.ARCHIVE_TRAILER.unpack(file.read(self.ARCHIVE_TRAILER.size))
+            if magic != self.ARCHIVE_MAGIC:
+                raise ValueError(f"Incomplete student archive: {file_path}")
+            file.seek(table_offset)
+            chunks = json.loads(zlib.decompress(file.read(table_size)))
+        return self.ARCHIVE_CODECS[codec_number], [dict(zip(self.ARCHIVE_CHUNK_FIELDS, chunk)) for chunk in chunks]
+
+    # Helper generator yielding a subject's stored records as text lines for an archive
+    def _iter_archive_lines(self, subject):
+        if self.storage is None and self.storage_format == "text" and not os.path.exists(self.JOURNAL_PATHS[subject]):
+            # Without pending journal changes the text file's lines are the records
+            with self.subject_lock(subject, shared=True):
+                with open(self.FILE_PATHS[subject], "r") as file:
+                    for line in file:
+                        if line.strip():
+                            yield line if line.endswith("\n") else line + "\n"
+            return
+
+        format_record = self.SUBJECTS[subject].format
+        for student in self.iter_student_data(subject):
+            yield format_record(student) + "\n"
+
+    # Generator method to read students back from an archive
+    def iter_archive_students(self, file_path, subjects=None, min_id=None, max_id=None, errors=None):
+        """
+        Lazily yields the students stored in an archive. Only the chunks of
+        the given subjects whose ID range overlaps [min_id, max_id] are read
+        and decompressed; each is checked against its CRC-32 first.
+        Malformed records are skipped, as read_student_data skips them.
+
+        Parameters:
+            file_path (str): The archive to read.
+            subjects (iterable): Optional subjects to read; defaults to every subject in the archive.
+            min_id (int): Optional lowest student ID to yield.
+            max_id (int): Optional highest student ID to yield.
+            errors (list): Optional list receiving a "Subject record N: problem" message per malformed record.
+
+        Yields:
+            Student: The student objects read from the archive, in the order they were exported.
+        """
+        codec, chunks = self.read_archive_table(file_path)
+        decompress = _archive_decompressor(codec)
+        subjects = None if subjects is None else set(subjects)
+        with open(file_path, "rb") as file:
+            for chunk in chunks:
+                subject = chunk["subject"]
+                if subjects is not None and subject not in subjects:
+                    continue
+                if (min_id is not None and chunk["max_id"] < min_id) or (max_id is not None and chunk["min_id"] > max_id):
+                    continue
+                if subject not in self.SUBJECTS:
+                    raise ValueError(f"Unknown subject in {file_path}: {subject}")
+
+                file.seek(chunk["offset"])
+                try:
+                    data = decompress(file.read(chunk["size"]))
+                except Exception as error:
+                    raise ValueError(f"Corrupt chunk at offset {chunk['offset']} of {file_path}: {error}") from error
+                if zlib.crc32(data) != chunk["crc32"]:
+                    raise ValueError(f"Corrupt chunk at offset {chunk['offset']} of {file_path}")
+                chunk_errors = []
+                for student in self.SUBJECTS[subject].parse_lines(io.StringIO(data.decode("utf-8")), chunk_errors, chunk["line"]):
+                    if (min_id is None or student.student_id >= min_id) and (max_id is None or student.student_id <= max_id):
+                        yield student
+                if errors is not None:
+                    errors.extend(f"{subject} {error.replace('Line', 'record', 1)}" for error in chunk_errors)
+
+    # Method to restore students from an archive
+    def restore_archive(self, file_path, subjects=None, min_id=None, max_id=None):
+        """
+        Restores the students of the given subjects and ID range from an
+        archive. Archived students are added or replace the current ones,
+        current students in the range that are not in the archive are
+        removed, and every subject touched is then written once. Restored
+        students move to the end of the roster order, as added students do.
+
+        Parameters:
+            file_path (str): The archive to restore from.
+            subjects (iterable): Optional subjects to restore; defaults to every subject.
+            min_id (int): Optional lowest student ID to restore.
+            max_id (int): Optional highest student ID to restore.
+
+        Returns:
+            int: The number of students restored.
         """
-        final_grade = self.compute_final_grade()
-
-        report = f"{self}\n"
-        report += f"Final Grade: {final_grade}\n"
-        return report
+        subjects = list(self.FILE_PATHS if subjects is None else subjects)
+        errors = []
+        restored = list(self.iter_archive_students(file_path, subjects, min_id, max_id, errors))
+        if errors:
+            print(f"Error: Skipped {len(errors)} malformed record(s) in {file_path}:")
+            for error in errors[:10]:
+                print(f"  {error}")
+        self.flush()
+        self.ensure_loaded(subjects)
 
+        # Remove the current students of the range that the archive does not hold
+        archived = {student.student_id for student in restored}
+        removed = [
+            student
+            for subject in subjects
+            for student in self._students_by_subject.get(subject, {}).values()
+            if student.student_id not in archived
+            and (min_id is None or student.student_id >= min_id)
+            and (max_id is None or student.student_id <= max_id)
+        ]
+        for student in removed:
+            self.remove_student(student.student_id)
+        touched = {student.subject for student in removed}
 
-class School:
-    # File paths for storing student data for different subjects
-    FILE_PATHS = {
-        "Math": "mathstudent.txt",
-        "History": "historystudent.txt",
-        "English": "englishstudent.txt",
-    }
+        # Archived students take the place of current students with the same ID
+        for student in restored:
+            current = self.find_student_by_id(student.student_id)
+            if current is not None:
+                self.remove_student(student.student_id)
+                touched.add(current.subject)
+            self.add_student(student)
+            touched.add(student.subject)
 
-    def __init__(self):
-        # Initialize an empty list to store students
-        self.students = []
+        for subject in touched:
+            self.write_student_data(subject)
+        if self.history is not None:
+            self.history.record_removals(removed)
+            self.history.record_students(restored)
+        return len(restored)
 
-    # Method to add a student to the school
-    def add_student(self, student):
+    # Method to record the complete roster as the end of a term
+    def end_term(self, label, timestamp=None):
         """
-        Adds a student to the school.
+        Records every student in the grade history under a term label, so the
+        term's final roster and grades can be queried later.
 
         Parameters:
-            student (Student): The student object to be added.
+            label (str): The name of the term, e.g. "2024 Autumn".
+            timestamp (float): Optional time the term ends; defaults to now.
 
         Returns:
             None
         """
-        # Check if a student with the same ID already exists
-        if any(stud.student_id == student.student_id for stud in self.students):
-            print(f"Error: Student with ID {student.student_id} already exists.")
-            return
-        self.students.append(student)
+        if self.history is None:
+            raise ValueError("The school has no grade history.")
+        self.ensure_loaded()
+        self.history.end_term(label, self.students, timestamp)
 
-    # Method to remove a student from the school by student ID
-    def remove_student(self, student_id):
+    # Method to close the storage backend and grade history, if any
+    def close(self):
         """
-        Removes a student from the school based on student ID.
-
-        Parameters:
-            student_id (int): The ID of the student to be removed.
+        Writes any write-behind changes, then releases the storage backend and
+        grade history used by the school.
 
         Returns:
             None
         """
-        found = False
-        updated_students = []
-        for student in self.students:
-            if student.student_id == student_id:
-                found = True
+        self.flush()
+        if self.storage is not None:
+            self.storage.close()
+        if self.history is not None:
+            self.history.close()
+
+    # Generator method to read the rows of a bulk import file
+    def iter_import_rows(self, file_path, errors=None):
+        """
+        Lazily yields the rows of a bulk import file. Files ending in .jsonl
+        hold one JSON object per line; any other file is read as CSV with a
+        header row. JSONL lines that are not valid JSON objects are skipped.
+
+        Parameters:
+            file_path (str): The path of the import file.
+            errors (list): Optional list receiving a "Line N: problem" message per skipped line.
+
+        Yields:
+            tuple: The line number and the row as a dictionary.
+        """
+        if errors is None:
+            errors = []
+        with open(file_path, "r", newline="") as file:
+            if file_path.endswith(".jsonl"):
+                for line_number, line in enumerate(file, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError as error:
+                        errors.append(f"Line {line_number}: Invalid JSON ({error.msg}).")
+                        continue
+                    if not isinstance(row, dict):
+                        errors.append(f"Line {line_number}: Expected a JSON object, found {type(row).__name__}.")
+                        continue
+                    yield line_number, row
             else:
-                updated_students.append(student)
+                reader = csv.DictReader(file)
+                for row in reader:
+                    yield reader.line_num, row
 
-        if not found:
-            print(f"Error: Student with ID {student_id} not found.")
-            return
+    # Method to validate a student name
+    def validate_name(self, name):
+        """
+        Validates a student name for the subject files, which separate fields
+        with commas and records with line breaks.
 
-        self.students = updated_students
+        Parameters:
+            name (str): The name entered.
 
-    # Method to find a student by student ID
-    def find_student_by_id(self, student_id):
+        Returns:
+            tuple: The name without surrounding whitespace and a list of error messages.
         """
-        Finds a student by student ID.
+        name = "" if name is None else str(name).strip()
+        if not name:
+            return name, ["A name is required."]
+        if any(character in name for character in ",\r\n"):
+            return name, ["Names cannot contain commas or line breaks."]
+        return name, []
+
+    # Method to validate the score fields of a subject
+    def validate_scores(self, subject, values):
+        """
+        Validates score fields with the same 0-100 rules as the console.
 
         Parameters:
-            student_id (int): The ID of the student to be found.
+            subject (str): The subject whose score fields (IMPORT_SCORE_FIELDS) are accepted.
+            values (dict): Field names mapped to raw values; blank values are ignored.
 
         Returns:
-            Student or None: The found student object or None if not found.
+            tuple: The valid scores as floats and a list of error messages.
         """
-        for student in self.students:
-            if student.student_id == student_id:
-                return student
-        return None
+        scores = {}
+        errors = []
+        for field in self.IMPORT_SCORE_FIELDS[subject]:
+            value = values.get(field)
+            if value is None or value == "":
+                continue
+            try:
+                score = float(value)
+            except (TypeError, ValueError):
+                errors.append(f"Invalid {field} '{value}'.")
+                continue
+            if not 0 <= score <= 100:
+                errors.append(f"{field} should be between 0 and 100.")
+                continue
+            scores[field] = score
+        return scores, errors
 
-    # Method to print information of all students in the school
-    def print_all_students_info(self):
+    # Method to apply validated scores to a student
+    def apply_scores(self, student, scores):
         """
-        Prints information of all students in the school.
+        Applies scores returned by validate_scores to a student.
+
+        Parameters:
+            student (Student): The student to update.
+            scores (dict): Field names mapped to validated scores.
 
         Returns:
             None
         """
-        if not self.students:
-            print("No students found.")
-        else:
-            print("\n===== ALL STUDENTS =====")
-            for student in self.students:
-                print(f"{student.subject}: {student.name} (ID: {student.student_id})")
-            print("=========================")
+        scores = dict(scores)
+        definition = self.SUBJECTS.get(student.subject)
+        for score in (definition.scores if definition is not None else ()):
+            if "repeat" not in score:
+                continue
+            fields = [f"{score['item']}{number}" for number in range(1, score["repeat"] + 1)]
+            if any(field in scores for field in fields):
+                # Update the given items and keep every slot so the record stays positional
+                current = getattr(student, score["name"])
+                values = current + [None] * (score["repeat"] - len(current))
+                for index, field in enumerate(fields):
+                    if field in scores:
+                        values[index] = scores.pop(field)
+                getattr(student, f"set_{score['item']}_scores")(values)
+        for field, score in scores.items():
+            setattr(student, field, score)
 
-    # Method to read student data from a file for a given subject
-    def read_student_data(self, subject):
+    # Helper method copying the slots holding a student's scores
+    def _score_slots(self, student):
+        definition = self.SUBJECTS[student.subject]
+        slots = {"_" + score["name"]: getattr(student, "_" + score["name"]) for score in definition.scores}
+        return {slot: value[:] if isinstance(value, array) else value for slot, value in slots.items()}
+
+    # Method to import enrollments and score updates in bulk
+    def import_student_data(self, file_path):
         """
-        Reads student data from a file for a given subject.
+        Imports enrollments and score updates from a CSV or JSONL file.
+
+        Each row holds a student_id and any of the subject's score fields (see
+        IMPORT_SCORE_FIELDS); rows for new students also need a subject and a
+        name. Every row is validated with the same 0-100 rules as the console
+        first, and nothing is applied unless the whole file is valid. The
+        touched students are then saved together with save_students; if the
+        save fails, the changes are undone in memory as well.
 
         Parameters:
-            subject (str): The subject for which student data is to be read.
+            file_path (str): The path of the import file.
 
         Returns:
-            list: A list of student objects read from the file.
+            dict: The number of rows, enrolled and updated students, any errors
+            and the throughput in rows per second.
         """
-        students = []
-        file_path = self.FILE_PATHS.get(subject, "")
-        if not file_path:
-            return students
+        start = time.perf_counter()
+        errors = []
+        new_students = {}
+        updates = []
+        rows = 0
 
-        with open(file_path, "r") as file:
-            lines = file.readlines()
-            for line in lines:
-                student_data = line.strip().split(",")
-                if len(student_data) < 3:
-                    # Skip incomplete data
-                    continue
+        for line_number, row in self.iter_import_rows(file_path, errors):
+            rows += 1
+            try:
+                student_id = int(row.get("student_id", ""))
+            except (TypeError, ValueError):
+                errors.append(f"Line {line_number}: Invalid student ID.")
+                continue
 
-                name = student_data[1]
-                student_id = int(student_data[2])
-
-                if subject == "Math":
-                    # Create a MathStudent object and set its attributes
-                    student = MathStudent(name, student_id)
-                    if len(student_data) >= 8:
-                        student._quizzes = [float(score) if score else None for score in student_data[3:8]]
-                        student._test1_score = float(student_data[8]) if len(student_data) > 8 and student_data[8] else 0
-                        student._test2_score = float(student_data[9]) if len(student_data) > 9 and student_data[9] else 0
-                        student._final_exam_score = float(student_data[10]) if len(student_data) > 10 and student_data[10] else 0
-                elif subject == "History":
-                    # Create a HistoryStudent object and set its attributes
-                    student = HistoryStudent(name, student_id)
-                    if len(student_data) >= 7:
-                        student._attendance_score = float(student_data[3])
-                        student._project_score = float(student_data[4])
-                        student._exam1_score = float(student_data[5])
-                        student._exam2_score = float(student_data[6])
-                elif subject == "English":
-                    # Create an EnglishStudent object and set its attributes
-                    student = EnglishStudent(name, student_id)
-                    if len(student_data) >= 7:
-                        student._attendance_score = float(student_data[3])
-                        student._final_exam_score = float(student_data[4])
-                        student._quiz1_score = float(student_data[5])
-                        student._quiz2_score = float(student_data[6])
-                else:
-                    # Invalid subject, skip this data
+            # Look the student up among existing and newly imported students
+            student = self.find_student_by_id(student_id) or new_students.get(student_id)
+            subject = row.get("subject") or (student.subject if student is not None else "")
+            if not isinstance(subject, str) or subject not in self.STUDENT_CLASSES:
+                errors.append(f"Line {line_number}: Invalid subject '{subject}'.")
+                continue
+            if student is not None and student.subject != subject:
+                errors.append(f"Line {line_number}: Student with ID {student_id} is not a {subject} student.")
+                continue
+            if student is None:
+                name, name_errors = self.validate_name(row.get("name"))
+                if name_errors:
+                    errors.extend(f"Line {line_number}: {error} (student {student_id})" for error in name_errors)
                     continue
+                student = self.STUDENT_CLASSES[subject](name, student_id)
+                new_students[student_id] = student
 
-                # Add the student object to the list
-                students.append(student)
+            # Validate every score before anything is applied
+            scores, score_errors = self.validate_scores(subject, row)
+            errors.extend(f"Line {line_number}: {error}" for error in score_errors)
+            updates.append((student, scores))
 
-        return students
+        if errors:
+            print(f"Import aborted: {len(errors)} invalid row(s), no changes were made.")
+            return {"rows": rows, "enrolled": 0, "updated": 0, "errors": errors, "seconds": time.perf_counter() - start, "rows_per_second": 0.0}
 
+        # Apply the whole import now that every row is known to be valid,
+        # keeping the scores of existing students in case it has to be undone
+        originals = {}
+        for student, _ in updates:
+            if student.student_id not in new_students and student.student_id not in originals:
+                originals[student.student_id] = (student, self._score_slots(student))
+        touched_students = dict(new_students)
+        try:
+            for student in new_students.values():
+                self.add_student(student)
+            for student, scores in updates:
+                self.apply_scores(student, scores)
+                touched_students[student.student_id] = student
 
-    # Method to write student data to a file for a given subject
-    def write_student_data(self, subject):
+            # Persist the touched students together
+            self.save_students(list(touched_students.values()))
+        except BaseException:
+            # Leave the roster in memory as it was, matching what is stored
+            for student_id in new_students:
+                if self._students_by_id.get(student_id) is new_students[student_id]:
+                    self.remove_student(student_id)
+            for student, slots in originals.values():
+                for slot, value in slots.items():
+                    setattr(student, slot, value)
+                student._invalidate_grade_cache()
+            raise
+
+        seconds = time.perf_counter() - start
+        return {
+            "rows": rows,
+            "enrolled": len(new_students),
+            "updated": len({student.student_id for student, _ in updates} - set(new_students)),
+            "errors": errors,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds else 0.0,
+        }
+
+    # Method to generate and print student reports for all students in the school
+    def generate_student_reports(self, limit=None, offset=0):
         """
-        Writes student data to a file for a given subject.
+        Generates and prints student reports for all students in the school.
 
         Parameters:
-            subject (str): The subject for which student data is to be written.
+            limit (int): Optional maximum number of reports to print.
+            offset (int): The number of students to skip first.
 
         Returns:
-            None
+            int: The number of reports printed.
         """
-        file_path = self.FILE_PATHS.get(subject, "")
-        if not file_path:
-            return
-
-        with open(file_path, "w") as file:
-            for student in self.students:
-                if student.subject == subject:
-                    if isinstance(student, MathStudent):
-                        # Write Math student data to the file
-                        quiz_scores = ",".join(str(score) if score is not None else "" for score in student._quizzes)
-                        file.write(f"Math,{student.name},{student.student_id},{quiz_scores},{student._test1_score},{student._test2_score},{student._final_exam_score}\n")
-                    elif isinstance(student, HistoryStudent):
-                        # Write History student data to the file
-                        file.write(f"History,{student.name},{student.student_id},{student._attendance_score},{student._project_score},{student._exam1_score},{student._exam2_score}\n")
-                    elif isinstance(student, EnglishStudent):
-                        # Write English student data to the file
-                        file.write(f"English,{student.name},{student.student_id},{student._attendance_score},{student._final_exam_score},{student._quiz1_score},{student._quiz2_score}\n")
+        self.ensure_loaded()
+        if not self._students_by_id:
+            print("No students found.")
+            return 0
+        return self.write_student_reports(sys.stdout, "text", limit, offset)
 
-    # Method to generate and print student reports for all students in the school
-    def generate_student_reports(self):
+    # Method to render student reports into a writer in buffered chunks
+    def write_student_reports(self, output, report_format="text", limit=None, offset=0, chunk_size=1000):
         """
-        Generates and prints student reports for all students in the school.
+        Renders student reports into a file-like object or a file path.
+
+        Reports are rendered chunk by chunk into a buffer, and each chunk is
+        written with a single call instead of one print() per line.
+
+        Parameters:
+            output (file or str): The writer, or the path of a file to create.
+            report_format (str): "text" (as printed by the menu), "csv" or "json".
+            limit (int): Optional maximum number of students to report on.
+            offset (int): The number of students to skip first, in insertion order.
+            chunk_size (int): The number of students rendered per write.
 
         Returns:
-            None
+            int: The number of students reported on.
         """
-        if not self.students:
-            print("No students found.")
-        else:
-            print("\n===== STUDENT REPORTS =====")
-            for student in self.students:
-                print(student.print_info())
-                print("-" * 30)
-            print("===========================")
+        if report_format not in ("text", "csv", "json"):
+            raise ValueError(f"Unknown report format: {report_format}")
+        if isinstance(output, str):
+            # Call the plain method so an instrumented school times the report once
+            with open(output, "w", newline="", buffering=1024 * 1024) as file:
+                return type(self).write_student_reports(self, file, report_format, limit, offset, chunk_size)
+
+        self.ensure_loaded()
+        stop = None if limit is None else offset + limit
+        students = islice(self._students_by_id.values(), offset, stop)
+
+        output.write(self.REPORT_HEADERS[report_format])
+        count = 0
+        for text, rendered in self.render_student_reports(students, report_format, chunk_size):
+            output.write(text)
+            count += rendered
+        output.write(self.REPORT_FOOTERS[report_format])
+        return count
+
+    # Generator method rendering the entries of a report a chunk at a time
+    def render_student_reports(self, students, report_format="text", chunk_size=1000):
+        """
+        Renders the report entries of some students, without the report's
+        header and footer, one chunk of students per string.
+
+        Parameters:
+            students (iterable): The students to report on.
+            report_format (str): "text", "csv" or "json".
+            chunk_size (int): The number of students rendered per string.
+
+        Yields:
+            tuple: The rendered text of a chunk and the number of students in it.
+        """
+        students = iter(students)
+        count = 0
+        while True:
+            chunk = list(islice(students, chunk_size))
+            if not chunk:
+                break
+            buffer = io.StringIO()
+            if report_format == "text":
+                separator = "\n" + "-" * 30 + "\n"
+                for student in chunk:
+                    buffer.write(student.print_info())
+                    buffer.write(separator)
+            elif report_format == "csv":
+                writer = csv.writer(buffer)
+                for student in chunk:
+                    quiz_average = student.compute_quiz_average() if isinstance(student, MathStudent) else ""
+                    writer.writerow((student.subject, student.name, student.student_id, quiz_average, student.compute_final_grade()))
+            else:
+                for index, student in enumerate(chunk):
+                    row = {
+                        "subject": student.subject,
+                        "name": student.name,
+                        "student_id": student.student_id,
+                        "quiz_average": student.compute_quiz_average() if isinstance(student, MathStudent) else None,
+                        "final_grade": student.compute_final_grade(),
+                    }
+                    buffer.write("," if count or index else "")
+                    buffer.write("\n" + json.dumps(row))
+            yield buffer.getvalue(), len(chunk)
+            count += len(chunk)
+
+
+# Worker function reading one subject's file in a separate process
+def _read_subject_worker(config, subject):
+    school = School.from_storage_config(config)
+    students = school.read_student_data(subject)
+    return students, school._journal_sizes[subject], school.record_errors.get(subject, []), school.journal_errors.get(subject, [])
+
+
+# Worker function writing one subject's file in a separate process
+def _write_subject_worker(config, subject, students):
+    School.from_storage_config(config).write_student_data(subject, students)
 
 
 # Function to simulate login (always returns True for this example)
@@ -409,6 +4668,21 @@ def login():
     """
     username = input("Enter your username: ")
     password = input("Enter your password: ")
+    return check_credentials(username, password)
+
+
+# Function to check an administrator's username and password
+def check_credentials(username, password):
+    """
+    Checks an administrator's username and password.
+
+    Parameters:
+        username (str): The username entered.
+        password (str): The password entered.
+
+    Returns:
+        bool: True if the credentials are valid, False otherwise.
+    """
     return username == "admin" and password == "password"
 
 
@@ -442,8 +4716,8 @@ def update_student_data(student):
         # Get and validate Test 1 score
         while True:
             try:
-                student._test1_score = float(input("Enter Test 1 score: "))
-                if 0 <= student._test1_score <= 100:
+                student.test1_score = float(input("Enter Test 1 score: "))
+                if 0 <= student.test1_score <= 100:
                     break
                 else:
                     print("Error: Test 1 score should be between 0 and 100.")
@@ -453,8 +4727,8 @@ def update_student_data(student):
         # Get and validate Test 2 score
         while True:
             try:
-                student._test2_score = float(input("Enter Test 2 score: "))
-                if 0 <= student._test2_score <= 100:
+                student.test2_score = float(input("Enter Test 2 score: "))
+                if 0 <= student.test2_score <= 100:
                     break
                 else:
                     print("Error: Test 2 score should be between 0 and 100.")
@@ -464,8 +4738,8 @@ def update_student_data(student):
         # Get and validate Final Exam score
         while True:
             try:
-                student._final_exam_score = float(input("Enter Final Exam score: "))
-                if 0 <= student._final_exam_score <= 100:
+                student.final_exam_score = float(input("Enter Final Exam score: "))
+                if 0 <= student.final_exam_score <= 100:
                     break
                 else:
                     print("Error: Final Exam score should be between 0 and 100.")
@@ -478,8 +4752,8 @@ def update_student_data(student):
         # Get and validate Attendance score
         while True:
             try:
-                student._attendance_score = float(input("Enter Attendance score: "))
-                if 0 <= student._attendance_score <= 100:
+                student.attendance_score = float(input("Enter Attendance score: "))
+                if 0 <= student.attendance_score <= 100:
                     break
                 else:
                     print("Error: Attendance score should be between 0 and 100.")
@@ -489,8 +4763,8 @@ def update_student_data(student):
         # Get and validate Project score
         while True:
             try:
-                student._project_score = float(input("Enter Project score: "))
-                if 0 <= student._project_score <= 100:
+                student.project_score = float(input("Enter Project score: "))
+                if 0 <= student.project_score <= 100:
                     break
                 else:
                     print("Error: Project score should be between 0 and 100.")
@@ -500,8 +4774,8 @@ def update_student_data(student):
         # Get and validate Exam 1 score
         while True:
             try:
-                student._exam1_score = float(input("Enter Exam 1 score: "))
-                if 0 <= student._exam1_score <= 100:
+                student.exam1_score = float(input("Enter Exam 1 score: "))
+                if 0 <= student.exam1_score <= 100:
                     break
                 else:
                     print("Error: Exam 1 score should be between 0 and 100.")
@@ -511,8 +4785,8 @@ def update_student_data(student):
         # Get and validate Exam 2 score
         while True:
             try:
-                student._exam2_score = float(input("Enter Exam 2 score: "))
-                if 0 <= student._exam2_score <= 100:
+                student.exam2_score = float(input("Enter Exam 2 score: "))
+                if 0 <= student.exam2_score <= 100:
                     break
                 else:
                     print("Error: Exam 2 score should be between 0 and 100.")
@@ -525,8 +4799,8 @@ def update_student_data(student):
         # Get and validate Attendance score
         while True:
             try:
-                student._attendance_score = float(input("Enter Attendance score: "))
-                if 0 <= student._attendance_score <= 100:
+                student.attendance_score = float(input("Enter Attendance score: "))
+                if 0 <= student.attendance_score <= 100:
                     break
                 else:
                     print("Error: Attendance score should be between 0 and 100.")
@@ -536,8 +4810,8 @@ def update_student_data(student):
         # Get and validate Final Exam score
         while True:
             try:
-                student._final_exam_score = float(input("Enter Final Exam score: "))
-                if 0 <= student._final_exam_score <= 100:
+                student.final_exam_score = float(input("Enter Final Exam score: "))
+                if 0 <= student.final_exam_score <= 100:
                     break
                 else:
                     print("Error: Final Exam score should be between 0 and 100.")
@@ -547,8 +4821,8 @@ def update_student_data(student):
         # Get and validate Quiz 1 score
         while True:
             try:
-                student._quiz1_score = float(input("Enter Quiz 1 score: "))
-                if 0 <= student._quiz1_score <= 100:
+                student.quiz1_score = float(input("Enter Quiz 1 score: "))
+                if 0 <= student.quiz1_score <= 100:
                     break
                 else:
                     print("Error: Quiz 1 score should be between 0 and 100.")
@@ -558,34 +4832,251 @@ def update_student_data(student):
         # Get and validate Quiz 2 score
         while True:
             try:
-                student._quiz2_score = float(input("Enter Quiz 2 score: "))
-                if 0 <= student._quiz2_score <= 100:
+                student.quiz2_score = float(input("Enter Quiz 2 score: "))
+                if 0 <= student.quiz2_score <= 100:
                     break
                 else:
                     print("Error: Quiz 2 score should be between 0 and 100.")
             except ValueError:
                 print("Error: Invalid input. Please enter a valid quiz score.")
 
+    elif isinstance(student, ConfiguredStudent):
+        # Update the scores of a subject with a generated student class
+        print(f"\n===== UPDATE {student.subject.upper()} STUDENT DATA =====")
+        for score in School.SUBJECTS[student.subject].scores:
+            label = score.get("label", score["name"])
+            while True:
+                try:
+                    value = float(input(f"Enter {label} score: "))
+                    if 0 <= value <= 100:
+                        setattr(student, score["name"], value)
+                        break
+                    else:
+                        print(f"Error: {label} score should be between 0 and 100.")
+                except ValueError:
+                    print("Error: Invalid input. Please enter a valid score.")
+
     else:
         # Invalid student type
         print("Invalid student type.")
 
 
+# Function to ask for a subject by name
+def input_subject():
+    """
+    Asks the user for one of the school's subjects.
+
+    Returns:
+        str or None: The subject, or None if the input was invalid.
+    """
+    subject = input(f"Enter subject ({'/'.join(School.FILE_PATHS)}): ").strip()
+    # Accept any capitalisation of a configured subject name
+    subject = next((name for name in School.FILE_PATHS if name.lower() == subject.lower()), subject)
+    if subject not in School.FILE_PATHS:
+        print("Error: Invalid subject.")
+        return None
+    return subject
+
+
+# Function to run the grade ranking queries from the menu
+def query_grade_rankings(school):
+    """
+    Lets the user list the top students, students in a grade range or a student's rank.
+
+    Parameters:
+        school (School): The school to query.
+
+    Returns:
+        None
+    """
+    print("\n===== GRADE RANKINGS =====")
+    print("1. Top students in a subject")
+    print("2. Students within a grade range")
+    print("3. Rank of a student")
+    query_choice = input("Enter query type (1/2/3): ")
+
+    try:
+        if query_choice == "1":
+            subject = input_subject()
+            if subject is None:
+                return
+            count = int(input("How many students? "))
+            results = school.top_students(subject, count)
+        elif query_choice == "2":
+            subject = input_subject()
+            if subject is None:
+                return
+            low = float(input("Lowest grade: "))
+            high = float(input("Highest grade: "))
+            results = school.students_in_grade_range(subject, low, high)
+        elif query_choice == "3":
+            student_id = int(input("Enter student ID: "))
+            rank = school.student_rank(student_id)
+            if rank is None:
+                print("Student not found.")
+            else:
+                print(f"Rank {rank['rank']} of {rank['count']} (percentile {rank['percentile']:.1f}), "
+                      f"final grade {rank['final_grade']:.2f}")
+            return
+        else:
+            print("Error: Invalid query type.")
+            return
+    except ValueError:
+        print("Error: Invalid input. Please enter a valid number.")
+        return
+
+    if not results:
+        print("No students found.")
+    for student, grade in results:
+        print(f"{student} - Final Grade: {grade:.2f}")
+
+
+# Function to turn a date or a term label typed by the user into a timestamp
+def input_point_in_time(school):
+    """
+    Prompts for a date (YYYY-MM-DD, meaning the end of that day) or the label of a recorded term.
+
+    Parameters:
+        school (School): The school whose grade history holds the terms.
+
+    Returns:
+        float or None: The timestamp, or None if the input is neither.
+    """
+    answer = input("Enter a date (YYYY-MM-DD) or a term: ").strip()
+    timestamp = school.history.term_timestamp(answer)
+    if timestamp is not None:
+        return timestamp
+    try:
+        day = datetime.date.fromisoformat(answer)
+    except ValueError:
+        print(f"Error: '{answer}' is neither a date nor a recorded term.")
+        return None
+    return time.mktime((day + datetime.timedelta(days=1)).timetuple()) - 1e-6
+
+
+# Function to answer grade history queries from the console
+def query_grade_history(school):
+    """
+    Lets the user follow a student's grade over time, look up a grade or a
+    roster at a past date or term, or record the end of a term.
+
+    Parameters:
+        school (School): The school whose grade history is queried.
+
+    Returns:
+        None
+    """
+    if school.history is None:
+        print("Error: Grade history is disabled. Start with --history DB to record it.")
+        return
+
+    print("\n===== GRADE HISTORY =====")
+    print("1. Grade trend of a student")
+    print("2. Grade of a student at a date or term")
+    print("3. Subject roster at a date or term")
+    print("4. End the current term")
+    query_choice = input("Enter query type (1/2/3/4): ")
+
+    try:
+        if query_choice == "1":
+            trend = school.history.grade_trend(int(input("Enter student ID: ")))
+            if not trend:
+                print("No history recorded for this student.")
+            for timestamp, grade in trend:
+                when = time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+                print(f"{when} - " + ("Removed" if grade is None else f"Final Grade: {grade:.2f}"))
+        elif query_choice == "2":
+            student_id = int(input("Enter student ID: "))
+            timestamp = input_point_in_time(school)
+            if timestamp is None:
+                return
+            student = school.history.student_as_of(student_id, timestamp)
+            if student is None:
+                print("The student was not enrolled then.")
+            else:
+                print(student.print_info())
+        elif query_choice == "3":
+            subject = input_subject()
+            if subject is None:
+                return
+            timestamp = input_point_in_time(school)
+            if timestamp is None:
+                return
+            students = school.history.roster_as_of(subject, timestamp)
+            if not students:
+                print("No students found.")
+            for student in students:
+                print(f"{student} - Final Grade: {student.compute_final_grade():.2f}")
+        elif query_choice == "4":
+            label = input("Enter the term name: ").strip()
+            if not label:
+                print("Error: A term name is required.")
+                return
+            school.end_term(label)
+            print(f"Term '{label}' recorded for {school.count_students()} students.")
+        else:
+            print("Error: Invalid query type.")
+    except ValueError:
+        print("Error: Invalid input. Please enter a valid number.")
+
+
+# Function to create a school backed by the subject files or an SQLite database
+def open_school(database=None, history=None, **options):
+    """
+    Creates a lazy school that stores its students in the subject files or,
+    if a database path is given, in an SQLite database.
+
+    Parameters:
+        database (str): Optional path of the SQLite database to use.
+        history (str): Optional path of an SQLite database recording the grade history.
+        **options: Further keyword arguments for School.
+
+    Returns:
+        School: The new school object.
+    """
+    if database is not None:
+        options["storage"] = SQLiteStorageBackend(database)
+    if history is not None:
+        options["history"] = GradeHistory(history)
+    options.setdefault("lazy", True)
+    return School(**options)
+
+
 # Main function to run the school management system
-def main():
+def main(database=None, metrics_file=None, history=None, **options):
     # Check if the login is successful before proceeding
     if not login():
         print("Invalid login credentials. Exiting...")
         return
 
-    # Create the school object to manage students
-    school = School()
+    # Create the school object to manage students. Nothing is read yet: each
+    # subject is loaded the first time an option needs it, and a lookup by
+    # ID reads just that student through the subject's index
+    school = open_school(database, history, journaling=True, **options)
+    # Time the School operations from the start when metrics are to be exported on exit
+    if metrics_file:
+        school.enable_instrumentation()
 
-    # Read existing student data from files and add to the school
-    school.students.extend(school.read_student_data("Math"))
-    school.students.extend(school.read_student_data("History"))
-    school.students.extend(school.read_student_data("English"))
+    # Write-behind changes are flushed however the loop ends, including
+    # Ctrl+C, end of input and unexpected errors, not only through option 6
+    try:
+        school_menu(school, metrics_file)
+    finally:
+        school.close()
 
+
+# Function to run the interactive menu until the user exits
+def school_menu(school, metrics_file=None):
+    """
+    Shows the main menu and carries out the chosen options until option 6.
+
+    Parameters:
+        school (School): The school to manage.
+        metrics_file (str): Optional file to export the performance metrics to on exit.
+
+    Returns:
+        None
+    """
     # Main loop for the school management system
     while True:
         print("\n===== SCHOOL MANAGEMENT SYSTEM =====")
@@ -595,7 +5086,12 @@ def main():
         print("4. Update student data")
         print("5. Generate student reports")
         print("6. Exit")
-        choice = input("Enter your choice (1-6): ")
+        print("7. View subject statistics")
+        print("8. Query grade rankings")
+        print("9. View performance metrics")
+        print("10. Query grade history")
+        print("11. Search students by name")
+        choice = input("Enter your choice (1-11): ")
 
         if choice == "1":
             # View all students' information
@@ -603,35 +5099,34 @@ def main():
         elif choice == "2":
             print("\n===== ADD A NEW STUDENT =====")
             print("Student Types:")
-            print("1. Math")
-            print("2. History")
-            print("3. English")
-            student_type_choice = input("Enter student type (1/2/3): ")
-            if student_type_choice not in ("1", "2", "3"):
+            # One numbered type per subject, built in or configured
+            subjects = list(School.STUDENT_CLASSES)
+            for number, subject in enumerate(subjects, start=1):
+                print(f"{number}. {subject}")
+            student_type_choice = input(f"Enter student type ({'/'.join(str(number) for number in range(1, len(subjects) + 1))}): ")
+            if student_type_choice not in [str(number) for number in range(1, len(subjects) + 1)]:
                 print("Error: Invalid student type choice.")
                 continue
 
             # Get student name and ID
-            name = input("Enter student name: ")
+            name, name_errors = school.validate_name(input("Enter student name: "))
+            if name_errors:
+                print(f"Error: {name_errors[0]}")
+                continue
             try:
                 student_id = int(input("Enter student ID: "))
             except ValueError:
                 print("Error: Invalid student ID. Please enter a valid number.")
                 continue
 
-            if student_type_choice == "1":
-                # Create a Math student object and add it to the school
-                student = MathStudent(name, student_id)
-            elif student_type_choice == "2":
-                # Create a History student object and add it to the school
-                student = HistoryStudent(name, student_id)
-            else:
-                # Create an English student object and add it to the school
-                student = EnglishStudent(name, student_id)
+            # Create a student of the chosen subject's class
+            student = School.STUDENT_CLASSES[subjects[int(student_type_choice) - 1]](name, student_id)
 
-            # Add the new student to the school and write data to file
-            school.add_student(student)
-            school.write_student_data(student.subject)
+            # Add the new student to the school and record it in the journal
+            if school.find_student_by_id(student_id) is not None:
+                print(f"Error: Student with ID {student_id} already exists.")
+            elif school.add_student(student):
+                school.save_student(student)
 
         elif choice == "3":
             # Remove a student from the school
@@ -642,11 +5137,10 @@ def main():
                 print("Error: Invalid student ID. Please enter a valid number.")
                 continue
 
-            school.remove_student(student_id)
-            # Update student data in files after removing the student
-            school.write_student_data("Math")
-            school.write_student_data("History")
-            school.write_student_data("English")
+            # Record a tombstone for the removed student in its subject's journal
+            student = school.remove_student(student_id)
+            if student is not None:
+                school.save_removal(student)
 
         elif choice == "4":
             # Update student data in the school
@@ -668,27 +5162,276 @@ def main():
                 update_choice = input("Do you want to update this student's data? (yes/no): ").lower()
                 if update_choice == "yes":
                     update_student_data(student)
-                    # Update student data in files after updating the data
-                    school.write_student_data(student.subject)
+                    # Record the updated student in its subject's journal
+                    school.save_student(student)
 
         elif choice == "5":
-            # Generate and print student reports
-            school.generate_student_reports()
+            # Generate and print student reports, one page at a time if requested
+            page_size = input("Enter the number of reports per page (leave blank for all): ").strip()
+            if not page_size:
+                school.generate_student_reports()
+                continue
+            try:
+                page_size = int(page_size)
+                if page_size <= 0:
+                    raise ValueError
+            except ValueError:
+                print("Error: Invalid page size. Please enter a positive number.")
+                continue
+
+            offset = 0
+            while True:
+                offset += school.generate_student_reports(limit=page_size, offset=offset)
+                if offset >= school.count_students():
+                    break
+                if input("Press Enter for the next page or 'q' to stop: ").lower() == "q":
+                    break
 
         elif choice == "6":
             # Exit the program
-            # Before exiting, write all student data back to files
-            school.write_student_data("Math")
-            school.write_student_data("History")
-            school.write_student_data("English")
+            # Before exiting, write any write-behind changes and compact all
+            # student data back into the snapshot files
+            school.compact_all_student_data()
+            if metrics_file:
+                school.export_metrics(metrics_file)
+                print(f"Performance metrics written to {metrics_file}.")
             print("Exiting the school management system. Goodbye!")
             break
 
+        elif choice == "7":
+            # Show the running grade statistics of every subject
+            school.print_subject_statistics()
+
+        elif choice == "8":
+            # Answer ranking queries from the ordered grade index
+            query_grade_rankings(school)
+
+        elif choice == "9":
+            # Show the operation timings, enabling instrumentation first if needed
+            if not school.instrumented:
+                if input("Performance metrics are disabled. Enable them now? (yes/no): ").lower() == "yes":
+                    school.enable_instrumentation()
+                    print("Performance metrics enabled.")
+                continue
+            school.print_metrics()
+            export_path = input("Export to file (.json for JSON, otherwise Prometheus text; leave blank to skip): ").strip()
+            if export_path:
+                try:
+                    school.export_metrics(export_path)
+                    print(f"Performance metrics written to {export_path}.")
+                except OSError as error:
+                    print(f"Error: Could not write {export_path}: {error}")
+
+        elif choice == "10":
+            # Look back at past grades and terms in the grade history
+            query_grade_history(school)
+
+        elif choice == "11":
+            # Search the name index by prefix, tolerating typos
+            print("\n===== SEARCH STUDENTS BY NAME =====")
+            query = input("Enter a whole or partial name: ").strip()
+            if not query:
+                print("Error: Please enter a name to search for.")
+                continue
+            results = school.search_students_by_name(query)
+            if not results:
+                print("No students found.")
+            for student in results:
+                print(student)
+
         else:
             # Invalid choice, prompt user to try again
-            print("Invalid choice. Please select a valid option (1-6).")
+            print("Invalid choice. Please select a valid option (1-11).")
+
+
+# Function to run a bulk import without the interactive menu
+def run_import(file_path, database=None, history=None):
+    """
+    Loads the school, imports a CSV or JSONL file and prints a summary.
+
+    Parameters:
+        file_path (str): The path of the import file.
+        database (str): Optional SQLite database to import into instead of the subject files.
+        history (str): Optional SQLite grade history database recording the imported changes.
+
+    Returns:
+        bool: True if the import was applied, False otherwise.
+    """
+    # The imported students are looked up on demand
+    school = open_school(database, history)
+    try:
+        result = school.import_student_data(file_path)
+    finally:
+        school.close()
+
+    for error in result["errors"]:
+        print(error)
+    if result["errors"]:
+        return False
+
+    print(f"Imported {result['rows']} rows ({result['enrolled']} enrolled, {result['updated']} updated) "
+          f"in {result['seconds']:.3f}s ({result['rows_per_second']:.0f} rows/sec).")
+    return True
+
+
+# Function to validate the subject files without the interactive menu
+def run_check_data():
+    """
+    Checks every subject file and prints the malformed records found.
+
+    Returns:
+        bool: True if every record is valid, False otherwise.
+    """
+    school = School()
+    report = school.check_student_data()
+    if not school.print_record_errors(limit=None):
+        print(f"All records are valid in {', '.join(school.FILE_PATHS[subject] for subject in report)}.")
+        return True
+    return False
+
+
+# Function to write student reports without the interactive menu
+def run_report(report_format, output=None, limit=None, offset=0, database=None):
+    """
+    Loads the school and writes student reports to a file or to stdout.
+
+    Parameters:
+        report_format (str): "text", "csv" or "json".
+        output (str): Optional path of the file to write; defaults to stdout.
+        limit (int): Optional maximum number of students to report on.
+        offset (int): The number of students to skip first.
+        database (str): Optional SQLite database to read instead of the subject files.
+
+    Returns:
+        None
+    """
+    school = open_school(database)
+    try:
+        school.write_student_reports(output or sys.stdout, report_format, limit, offset)
+    finally:
+        school.close()
+
+
+# Function to export the stored students into an archive
+def run_export_archive(file_path, codec="zlib", database=None):
+    """
+    Exports every stored student into a compressed archive and prints how
+    many were exported.
+
+    Parameters:
+        file_path (str): The archive to write.
+        codec (str): "zlib" or "zstd".
+        database (str): Optional SQLite database to read instead of the subject files.
+
+    Returns:
+        None
+    """
+    school = open_school(database)
+    try:
+        counts = school.export_archive(file_path, codec=codec)
+    finally:
+        school.close()
+    for subject, count in counts.items():
+        print(f"{subject}: {count} records exported to {file_path}")
+
+
+# Function to restore students from an archive
+def run_restore_archive(file_path, subjects=None, min_id=None, max_id=None, database=None):
+    """
+    Restores students from an archive into the subject files or database
+    and prints how many were restored.
+
+    Parameters:
+        file_path (str): The archive to restore from.
+        subjects (list): Optional subjects to restore; defaults to every subject.
+        min_id (int): Optional lowest student ID to restore.
+        max_id (int): Optional highest student ID to restore.
+        database (str): Optional SQLite database to restore into instead of the subject files.
+
+    Returns:
+        None
+    """
+    school = open_school(database, journaling=True)
+    try:
+        count = school.restore_archive(file_path, subjects, min_id, max_id)
+    finally:
+        school.close()
+    print(f"{count} students restored from {file_path}")
+
+
+# Function to copy the subject files into an SQLite database
+def run_migration(database):
+    """
+    Copies the students in the subject files into an SQLite database and
+    prints how many were copied.
+
+    Parameters:
+        database (str): The path of the SQLite database to fill.
+
+    Returns:
+        None
+    """
+    storage = SQLiteStorageBackend(database)
+    try:
+        counts = School().migrate_to_storage(storage)
+    finally:
+        storage.close()
+    for subject, count in counts.items():
+        print(f"{subject}: {count} students copied to {database}")
 
 
 # Driver Code 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if SUBJECT_CONFIG_ERROR is not None:
+        print(f"Error: {SUBJECT_CONFIG_ERROR}")
+        raise SystemExit(1)
+    parser = argparse.ArgumentParser(description="School Management System")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="import enrollments and score updates from a CSV or JSONL file and exit")
+    parser.add_argument("--report", action="store_true", help="write student reports and exit")
+    parser.add_argument("--format", choices=("text", "csv", "json"), default="text", help="report format (default: text)")
+    parser.add_argument("--output", metavar="FILE", help="write the report to FILE instead of stdout")
+    parser.add_argument("--limit", type=int, help="report on at most this many students")
+    parser.add_argument("--offset", type=int, default=0, help="skip this many students first")
+    parser.add_argument("--database", metavar="DB", help="store students in this SQLite database instead of the subject files")
+    parser.add_argument("--migrate-sqlite", metavar="DB", help="copy the subject files into an SQLite database and exit")
+    parser.add_argument("--history", metavar="DB", help="record every saved change in this SQLite grade history database")
+    parser.add_argument("--check-data", action="store_true", help="report malformed records in the subject files and exit")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="time School operations and write the metrics to FILE on exit (.json for JSON, otherwise Prometheus text)")
+    parser.add_argument("--export-archive", metavar="FILE", help="write every student into a compressed archive and exit")
+    parser.add_argument("--restore-archive", metavar="FILE", help="restore students from a compressed archive and exit")
+    parser.add_argument("--codec", choices=School.ARCHIVE_CODECS, default="zlib", help="compression of --export-archive (default: zlib)")
+    parser.add_argument("--subjects", nargs="+", choices=list(School.FILE_PATHS), help="with --restore-archive, restore only these subjects")
+    parser.add_argument("--min-id", type=int, help="with --restore-archive, restore only students with at least this ID")
+    parser.add_argument("--max-id", type=int, help="with --restore-archive, restore only students with at most this ID")
+    parser.add_argument("--write-behind", action="store_true",
+                        help="buffer saved changes and write them in batches instead of after every edit")
+    parser.add_argument("--flush-interval", type=float, default=5.0, metavar="SECONDS",
+                        help="with --write-behind, write buffered changes this long after the first one (default: 5)")
+    parser.add_argument("--flush-threshold", type=int, default=100, metavar="N",
+                        help="with --write-behind, write buffered changes once N students are dirty (default: 100)")
+    parser.add_argument("--fsync", choices=School.FSYNC_POLICIES, default="snapshots",
+                        help="force to disk: every write (always), snapshot files only (snapshots, the default) or nothing (never)")
+    args = parser.parse_args()
+
+    if args.migrate_sqlite:
+        run_migration(args.migrate_sqlite)
+        raise SystemExit(0)
+    if args.export_archive:
+        if args.codec == "zstd" and zstandard is None:
+            parser.error("--codec zstd needs the zstandard package")
+        run_export_archive(args.export_archive, args.codec, args.database)
+        raise SystemExit(0)
+    if args.restore_archive:
+        run_restore_archive(args.restore_archive, args.subjects, args.min_id, args.max_id, args.database)
+        raise SystemExit(0)
+    if args.check_data:
+        raise SystemExit(0 if run_check_data() else 1)
+    if args.import_file:
+        raise SystemExit(0 if run_import(args.import_file, args.database, args.history) else 1)
+    if args.report:
+        run_report(args.format, args.output, args.limit, args.offset, args.database)
+        raise SystemExit(0)
+    main(args.database, args.metrics, args.history, write_behind=args.write_behind, flush_interval=args.flush_interval,
+         flush_threshold=args.flush_threshold, fsync=args.fsync)
\ No newline at end of file
@@ -0,0 +1,391 @@
+"""
+Network service for the School Management System.
+
+Serves a shared School over HTTP with JSON bodies, so several
+administrators can work at the same time instead of taking turns at the
+console. The service runs on asyncio with no external dependencies.
+
+Every request must carry HTTP Basic credentials, checked with the same rules
+as the console login. Every access to the school, read or change, is
+serialised by one lock, and changes are recorded in the subject journals.
+The journals are compacted into the subject files when the service shuts
+down.
+
+Endpoints:
+    GET    /students                  List students (?offset=&limit=)
+    POST   /students                  Enroll a student {"subject", "name", "student_id"}
+    GET    /students/<id>             Show a student and their final grade
+    PATCH  /students/<id>             Update scores, e.g. {"test1_score": 75}
+    DELETE /students/<id>             Remove a student
+    GET    /reports                   Student reports (?format=json|csv|text&offset=&limit=)
+    GET    /statistics                Grade statistics per subject
+    GET    /metrics                   Operation timings in Prometheus text (with --metrics)
+
+Usage:
+    python school_service.py [--host 127.0.0.1] [--port 8080] [--data-dir DIR] [--metrics]
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+from school_management_system import MathStudent, School, check_credentials
+
+
+# Reason phrases for the status codes used by the service
+STATUS_REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+# Largest request body accepted, in bytes
+MAX_BODY_SIZE = 1024 * 1024
+
+
+# Error raised by a handler to answer with an HTTP error status
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# Function to describe a student as a JSON-friendly dictionary
+def student_to_dict(student):
+    """
+    Describes a student, their scores and their final grade.
+
+    Parameters:
+        student (Student): The student to describe.
+
+    Returns:
+        dict: The student's details.
+    """
+    details = {
+        "subject": student.subject,
+        "name": student.name,
+        "student_id": student.student_id,
+        "final_grade": student.compute_final_grade(),
+    }
+    for field in School.IMPORT_SCORE_FIELDS[student.subject]:
+        if hasattr(student, field):
+            details[field] = getattr(student, field)
+    if isinstance(student, MathStudent):
+        details["quizzes"] = student.quizzes
+        details["quiz_average"] = student.compute_quiz_average()
+    return details
+
+
+class SchoolService:
+    def __init__(self, school):
+        # The shared school and the lock serialising every access to it
+        self.school = school
+        self._lock = asyncio.Lock()
+
+    # Method to handle one client connection, serving requests until it closes
+    async def handle_connection(self, reader, writer):
+        """
+        Serves HTTP/1.1 requests on one connection, keeping it alive between requests.
+
+        Parameters:
+            reader (asyncio.StreamReader): The connection's reader.
+            writer (asyncio.StreamWriter): The connection's writer.
+
+        Returns:
+            None
+        """
+        try:
+            while True:
+                # readline() raises ValueError for a line longer than the reader's limit
+                try:
+                    request_line = await reader.readline()
+                except ValueError:
+                    await self._send(writer, 400, {"error": "Request line too long."}, keep_alive=False)
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._send(writer, 400, {"error": "Malformed request line."}, keep_alive=False)
+                    break
+
+                headers = {}
+                try:
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    await self._send(writer, 431, {"error": "Request header line too long."}, keep_alive=False)
+                    break
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._send(writer, 400, {"error": "Invalid Content-Length header."}, keep_alive=False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._send(writer, 413, {"error": "Request body too large."}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload, content_type = await self.dispatch(method, target, headers, body)
+                await self._send(writer, status, payload, keep_alive, content_type)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    # Method to route a request to its handler
+    async def dispatch(self, method, target, headers, body):
+        """
+        Authenticates a request and routes it to its handler.
+
+        Parameters:
+            method (str): The HTTP method.
+            target (str): The request target, including any query string.
+            headers (dict): The request headers with lower-case names.
+            body (bytes): The request body.
+
+        Returns:
+            tuple: The status code, the payload and its content type.
+        """
+        if not self._authenticated(headers.get("authorization", "")):
+            return 401, {"error": "Invalid login credentials."}, "application/json"
+
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise HTTPError(400, "The request body must be a JSON object.")
+
+            if parts == ["students"]:
+                if method == "GET":
+                    return 200, await self.list_students(query), "application/json"
+                if method == "POST":
+                    return 201, await self.add_student(data), "application/json"
+            elif len(parts) == 2 and parts[0] == "students":
+                student_id = self._parse_int(parts[1], "student ID")
+                if method == "GET":
+                    return 200, await self._run_locked(self._describe, student_id), "application/json"
+                if method == "PATCH":
+                    return 200, await self.update_student(student_id, data), "application/json"
+                if method == "DELETE":
+                    return 200, await self.remove_student(student_id), "application/json"
+            elif parts == ["reports"] and method == "GET":
+                return await self.report(query)
+            elif parts == ["statistics"] and method == "GET":
+                return 200, await self._run_locked(self.school.subject_statistics), "application/json"
+            elif parts == ["metrics"] and method == "GET":
+                if not self.school.instrumented:
+                    raise HTTPError(404, "Metrics are disabled; start the service with --metrics.")
+                return 200, self.school.format_prometheus_metrics(), "text/plain"
+            else:
+                raise HTTPError(404, "Not found.")
+            raise HTTPError(405, f"Method {method} not allowed.")
+        except HTTPError as error:
+            return error.status, {"error": error.message}, "application/json"
+        except json.JSONDecodeError:
+            return 400, {"error": "The request body is not valid JSON."}, "application/json"
+        except Exception as error:
+            # Answer instead of dropping the connection, and keep serving other requests
+            print(f"Error: {method} {url.path} failed: {error!r}", file=sys.stderr)
+            return 500, {"error": "Internal server error."}, "application/json"
+
+    # Method to list students a page at a time
+    async def list_students(self, query):
+        offset = self._parse_int(query.get("offset", "0"), "offset")
+        limit = self._parse_int(query.get("limit", "100"), "limit")
+        return await self._run_locked(self._list_page, offset, limit)
+
+    # Helper method to describe one page of students, run under the lock
+    def _list_page(self, offset, limit):
+        students = self.school.students[offset:offset + limit]
+        return {
+            "count": self.school.count_students(),
+            "students": [{"subject": student.subject, "name": student.name, "student_id": student.student_id} for student in students],
+        }
+
+    # Method to enroll a new student
+    async def add_student(self, data):
+        subject = data.get("subject")
+        name, errors = self.school.validate_name(data.get("name"))
+        student_id = self._parse_int(data.get("student_id"), "student ID")
+        if subject not in School.STUDENT_CLASSES:
+            raise HTTPError(400, f"Invalid subject '{subject}'.")
+        if errors:
+            raise HTTPError(400, " ".join(errors))
+
+        async with self._lock:
+            if self.school.find_student_by_id(student_id) is not None:
+                raise HTTPError(409, f"Student with ID {student_id} already exists.")
+            student = School.STUDENT_CLASSES[subject](name, student_id)
+            self.school.add_student(student)
+            await self._persist(self.school.save_student, student)
+        return student_to_dict(student)
+
+    # Method to update a student's scores
+    async def update_student(self, student_id, data):
+        async with self._lock:
+            student = self._find(student_id)
+            scores, errors = self.school.validate_scores(student.subject, data)
+            if errors:
+                raise HTTPError(400, " ".join(errors))
+            if not scores:
+                raise HTTPError(400, f"No score fields given; expected any of {', '.join(School.IMPORT_SCORE_FIELDS[student.subject])}.")
+            self.school.apply_scores(student, scores)
+            await self._persist(self.school.save_student, student)
+        return student_to_dict(student)
+
+    # Method to remove a student
+    async def remove_student(self, student_id):
+        async with self._lock:
+            self._find(student_id)
+            student = self.school.remove_student(student_id)
+            await self._persist(self.school.save_removal, student)
+        return {"removed": student_id}
+
+    # Method to render student reports
+    async def report(self, query):
+        report_format = query.get("format", "json")
+        if report_format not in ("text", "csv", "json"):
+            raise HTTPError(400, f"Unknown report format '{report_format}'.")
+        offset = self._parse_int(query.get("offset", "0"), "offset")
+        limit = self._parse_int(query["limit"], "limit") if "limit" in query else None
+
+        buffer = io.StringIO()
+        await self._run_locked(self.school.write_student_reports, buffer, report_format, limit, offset)
+        content_types = {"text": "text/plain", "csv": "text/csv", "json": "application/json"}
+        return 200, buffer.getvalue(), content_types[report_format]
+
+    # Helper method to write a change to disk without blocking the event loop
+    async def _persist(self, save, student):
+        await asyncio.get_running_loop().run_in_executor(None, save, student)
+
+    # Helper method to run a slow read in a worker thread without blocking the event loop
+    async def _run_locked(self, function, *args):
+        # The lock keeps changes from modifying the school while the worker reads it
+        async with self._lock:
+            return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    # Helper method to describe a student or answer 404, run under the lock
+    def _describe(self, student_id):
+        return student_to_dict(self._find(student_id))
+
+    # Helper method to find a student or answer 404
+    def _find(self, student_id):
+        student = self.school.find_student_by_id(student_id)
+        if student is None:
+            raise HTTPError(404, f"Student with ID {student_id} not found.")
+        return student
+
+    # Helper method to parse an integer parameter or answer 400
+    @staticmethod
+    def _parse_int(value, description):
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise HTTPError(400, f"Invalid {description}.")
+        if number < 0:
+            raise HTTPError(400, f"Invalid {description}.")
+        return number
+
+    # Helper method to check HTTP Basic credentials
+    @staticmethod
+    def _authenticated(authorization):
+        scheme, _, encoded = authorization.partition(" ")
+        if scheme.lower() != "basic":
+            return False
+        try:
+            username, _, password = base64.b64decode(encoded).decode("utf-8").partition(":")
+        except (ValueError, UnicodeDecodeError):
+            return False
+        return check_credentials(username, password)
+
+    # Helper method to write a response
+    @staticmethod
+    async def _send(writer, status, payload, keep_alive=True, content_type="application/json"):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+        else:
+            body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {STATUS_REASONS.get(status, 'Error')}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+# Function to load the school and serve it until interrupted
+async def serve(host, port, data_dir=None, metrics=False):
+    """
+    Loads the school and serves it over HTTP until the task is cancelled.
+
+    Parameters:
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        data_dir (str): Optional directory holding the subject files.
+        metrics (bool): Time the School operations and serve them at /metrics.
+
+    Returns:
+        None
+    """
+    school = School(journaling=True, data_dir=data_dir)
+    if metrics:
+        school.enable_instrumentation()
+    school.add_students(school.read_all_student_data())
+    service = SchoolService(school)
+
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving {school.count_students()} students on http://{host}:{port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        # Compact the journals back into the subject files on shutdown
+        school.compact_all_student_data()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the School Management System over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on (default: 8080)")
+    parser.add_argument("--data-dir", help="directory holding the subject files (default: working directory)")
+    parser.add_argument("--metrics", action="store_true", help="time School operations and serve them at /metrics")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_dir, args.metrics))
+    except KeyboardInterrupt:
+        print("Service stopped.")
+
+
+# Driver Code
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,603 @@
+"""
+Sharded mode of the School Management System for very large districts.
+
+A ShardedSchool partitions students across several worker processes, each
+owning an ordinary School with its own subject files in a shard directory,
+so loading, grading and reporting use one core and one heap per shard.
+Students are placed by student ID (student_id modulo the number of shards)
+or by subject. The layout is recorded in data_dir/shards.json on first
+start, and a ShardedSchool opened with a different one is refused, since
+students would be looked up in the wrong shards.
+
+The coordinator routes single-student operations (add_student,
+find_student_by_id, remove_student, update_scores and saves) to the shard
+owning the student. Queries over the whole district (counts, final grades,
+statistics, top students and reports) are sent to every shard at once and
+their answers merged. Students returned by the coordinator are copies:
+change them through update_scores, or save them back with save_student.
+If a shard process dies, the ShardedSchool refuses further requests and
+has to be closed and opened again.
+
+Usage:
+    with ShardedSchool(shard_count=4, data_dir="shards") as school:
+        school.add_students(students, save=True)
+        grades = school.compute_final_grades()
+"""
+
+import heapq
+import json
+import multiprocessing
+import os
+import threading
+
+from school_management_system import School, SubjectStatistics
+
+
+# Name of the file in data_dir recording how students are placed in the shards
+SHARD_METADATA_FILE = "shards.json"
+
+# School methods a shard runs as they are
+SHARD_METHODS = {
+    "add_student",
+    "add_students",
+    "find_student_by_id",
+    "remove_student",
+    "save_removal",
+    "count_students",
+    "subject_statistics",
+    "top_students",
+    "compact_all_student_data",
+}
+
+
+# Function run by a shard to store copies of students in place of the ones it holds
+def _save_shard_students(school, students):
+    for student in students:
+        existing = school.find_student_by_id(student.student_id)
+        if existing is not student:
+            if existing is not None:
+                school.remove_student(student.student_id)
+            school.add_student(student)
+    school.save_students(students)
+
+
+# Function run by a shard to add students, persisting the ones added if asked
+def _add_shard_students(school, students, save):
+    added = [student for student in students if school.add_student(student)]
+    if save:
+        school.save_students(added)
+    return len(added)
+
+
+# Function run by a shard to find which of some student IDs it holds
+def _find_shard_ids(school, student_ids):
+    return [student_id for student_id in student_ids if school.find_student_by_id(student_id) is not None]
+
+
+# Function run by a shard to validate, apply and save score changes
+def _update_shard_scores(school, student_id, values):
+    student = school.find_student_by_id(student_id)
+    if student is None:
+        return None
+    scores, errors = school.validate_scores(student.subject, values)
+    if errors:
+        raise ValueError(" ".join(errors))
+    school.apply_scores(student, scores)
+    school.save_student(student)
+    return student
+
+
+# Function run by a shard to compute the final grade of each of its students
+def _compute_shard_grades(school, recompute):
+    if not recompute:
+        return school.compute_final_grades()
+    final_grades = {}
+    for student in school.students:
+        student._invalidate_grade_cache()
+        final_grades[student.student_id] = student.compute_final_grade()
+    return final_grades
+
+
+# Function run by a shard to render the entries of a report on its students
+def _render_shard_reports(school, report_format):
+    return "".join(text for text, _ in school.render_student_reports(school.students, report_format))
+
+
+# Functions a shard runs on its school, by operation name
+SHARD_FUNCTIONS = {
+    "save_students": _save_shard_students,
+    "add_students_saved": _add_shard_students,
+    "update_scores": _update_shard_scores,
+    "find_ids": _find_shard_ids,
+    "compute_final_grades": _compute_shard_grades,
+    "render_reports": _render_shard_reports,
+}
+
+
+# Function run by each shard process
+def _run_shard(connection, data_dir, options):
+    """
+    Opens the shard's school and answers the coordinator's requests until told to close.
+
+    Parameters:
+        connection (multiprocessing.connection.Connection): The shard's end of the pipe.
+        data_dir (str): The directory holding the shard's subject files.
+        options (dict): Keyword arguments for School.
+
+    Returns:
+        None
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    school = School(data_dir=data_dir, lazy=True, **options)
+    for path in school.FILE_PATHS.values():
+        if not os.path.exists(path):
+            open(path, "w").close()
+    # Load the whole shard up front; every shard does so at the same time
+    school.ensure_loaded()
+
+    while True:
+        operation, args = connection.recv()
+        if operation == "close":
+            school.compact_all_student_data()
+            school.close()
+            connection.send(("ok", None))
+            break
+        try:
+            if operation in SHARD_METHODS:
+                result = getattr(school, operation)(*args)
+            else:
+                result = SHARD_FUNCTIONS[operation](school, *args)
+        except Exception as error:
+            connection.send(("error", error))
+        else:
+            connection.send(("ok", result))
+    connection.close()
+
+
+class ShardedSchool:
+    def __init__(self, shard_count=None, data_dir="shards", partition="id", **options):
+        """
+        Starts one worker process per shard. Each loads the subject files in
+        its own directory, data_dir/shard<N>, creating empty ones if needed.
+
+        Parameters:
+            shard_count (int): The number of shards; defaults to the number
+                recorded in data_dir, or to the number of CPUs on first start.
+            data_dir (str): The directory holding the shard directories.
+            partition (str): "id" to place students by student ID, or "subject".
+            **options: Keyword arguments for each shard's School, e.g. journaling=True.
+
+        Raises:
+            ValueError: If data_dir was created with another shard count or partition.
+        """
+        if partition not in ("id", "subject"):
+            raise ValueError(f"Unknown partition: {partition}")
+        self.data_dir = data_dir
+        self.partition = partition
+        self.shard_count, self._subject_shards = self._open_layout(shard_count, partition)
+
+        # One pipe per shard, used by one request at a time
+        self._connections = []
+        self._locks = []
+        self._processes = []
+        for number in range(self.shard_count):
+            connection, shard_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_run_shard,
+                args=(shard_connection, os.path.join(data_dir, f"shard{number}"), options),
+                daemon=True,
+            )
+            process.start()
+            shard_connection.close()
+            self._connections.append(connection)
+            self._locks.append(threading.Lock())
+            self._processes.append(process)
+        # Why the pool stopped taking requests, once a shard's pipe can no
+        # longer be trusted to hold only the answer to the next request
+        self._broken = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Method to find the shard that owns a student
+    def shard_of(self, student_id=None, subject=None):
+        """
+        Finds the shard owning a student.
+
+        Parameters:
+            student_id (int): The student's ID, used when partitioning by ID.
+            subject (str): The student's subject, used when partitioning by subject.
+
+        Returns:
+            int or None: The shard number, or None if it depends on an unknown subject.
+        """
+        if self.partition == "id":
+            return student_id % self.shard_count
+        return self._subject_shards.get(subject)
+
+    # Method to add a student to its shard
+    def add_student(self, student):
+        """
+        Adds a student to the shard that owns it.
+
+        Parameters:
+            student (Student): The student object to be added.
+
+        Returns:
+            bool: True if the student was added, False if it already exists.
+        """
+        if self.partition == "subject" and self.find_student_by_id(student.student_id) is not None:
+            print(f"Error: Student with ID {student.student_id} already exists.")
+            return False
+        return self._call(self._shard_of_student(student), "add_student", student)
+
+    # Method to add many students, each to its shard
+    def add_students(self, students, save=False):
+        """
+        Adds many students, sending each shard its students in one request
+        and letting the shards work in parallel.
+
+        Parameters:
+            students (iterable): The student objects to be added.
+            save (bool): Also persist the added students in the shards' files.
+
+        Returns:
+            int: The number of students that were added.
+        """
+        students = list(students)
+        if self.partition == "subject":
+            # An ID may already be held by the shard of another subject
+            students = self._without_known_ids(students)
+        return sum(self._fan_out("add_students_saved", self._group(students), save).values())
+
+    # Method to find a student by ID
+    def find_student_by_id(self, student_id):
+        """
+        Finds a student by ID in the shard that owns it, or in every shard
+        when students are partitioned by subject.
+
+        Parameters:
+            student_id (int): The ID of the student.
+
+        Returns:
+            Student or None: A copy of the student, or None if not found.
+        """
+        if self.partition == "id":
+            return self._call(self.shard_of(student_id), "find_student_by_id", student_id)
+        return next((student for student in self._fan_out("find_student_by_id", None, student_id).values() if student is not None), None)
+
+    # Method to remove a student by ID
+    def remove_student(self, student_id):
+        """
+        Removes a student from the shard that owns it.
+
+        Parameters:
+            student_id (int): The ID of the student.
+
+        Returns:
+            Student or None: The removed student, or None if not found.
+        """
+        if self.partition == "id":
+            return self._call(self.shard_of(student_id), "remove_student", student_id)
+        student = self.find_student_by_id(student_id)
+        if student is None:
+            print(f"Error: Student with ID {student_id} not found.")
+            return None
+        return self._call(self._shard_of_student(student), "remove_student", student_id)
+
+    # Method to validate, apply and save score changes to a student
+    def update_scores(self, student_id, values):
+        """
+        Updates a student's scores in the shard that owns it, with the same
+        0-100 validation as the console, and saves the student there.
+
+        Parameters:
+            student_id (int): The ID of the student.
+            values (dict): Score field names mapped to the new scores.
+
+        Returns:
+            Student or None: A copy of the updated student, or None if not found.
+        """
+        if self.partition == "subject":
+            student = self.find_student_by_id(student_id)
+            if student is None:
+                return None
+            return self._call(self._shard_of_student(student), "update_scores", student_id, values)
+        return self._call(self.shard_of(student_id), "update_scores", student_id, values)
+
+    # Method to persist a new or updated student
+    def save_student(self, student):
+        """
+        Persists a student in the shard that owns it, replacing the shard's copy.
+
+        Parameters:
+            student (Student): The student object to be saved.
+
+        Returns:
+            None
+        """
+        self.save_students([student])
+
+    # Method to persist several new or updated students
+    def save_students(self, students):
+        """
+        Persists several students, each in the shard that owns it.
+
+        Parameters:
+            students (iterable): The student objects to be saved.
+
+        Returns:
+            None
+        """
+        self._fan_out("save_students", self._group(students))
+
+    # Method to persist the removal of a student
+    def save_removal(self, student):
+        """
+        Persists the removal of a student in the shard that owned it.
+
+        Parameters:
+            student (Student): The student object that was removed.
+
+        Returns:
+            None
+        """
+        self._call(self._shard_of_student(student), "save_removal", student)
+
+    # Method to count the students in every shard
+    def count_students(self):
+        """
+        Counts the students in every shard.
+
+        Returns:
+            int: The total number of students.
+        """
+        return sum(self._fan_out("count_students").values())
+
+    # Method to compute the final grade of every student
+    def compute_final_grades(self, recompute=False):
+        """
+        Computes the final grade of every student, each shard grading its own
+        students in parallel.
+
+        Parameters:
+            recompute (bool): Discard the cached grades and compute every grade again.
+
+        Returns:
+            dict: A mapping of student ID to final grade, shard by shard.
+        """
+        final_grades = {}
+        for shard_grades in self._fan_out("compute_final_grades", None, recompute).values():
+            final_grades.update(shard_grades)
+        return final_grades
+
+    # Method to return the grade statistics of the whole district
+    def subject_statistics(self, subject=None):
+        """
+        Returns the grade statistics of one or every subject, merged from every shard.
+
+        Parameters:
+            subject (str): Optional subject; defaults to every subject.
+
+        Returns:
+            dict: The statistics of the subject, or a mapping of subject to statistics.
+        """
+        results = list(self._fan_out("subject_statistics", None, subject).values())
+        if subject is not None:
+            return SubjectStatistics.merge_summaries(results)
+        return {name: SubjectStatistics.merge_summaries(result[name] for result in results) for name in School.STUDENT_CLASSES}
+
+    # Method to find the students with the highest final grades in a subject
+    def top_students(self, subject, count=10):
+        """
+        Finds the best students of a subject from the best of each shard.
+
+        Parameters:
+            subject (str): The subject to rank.
+            count (int): The number of students to return.
+
+        Returns:
+            list: (student, final grade) pairs, best first.
+        """
+        candidates = [pair for result in self._fan_out("top_students", None, subject, count).values() for pair in result]
+        return heapq.nlargest(count, candidates, key=lambda pair: pair[1])
+
+    # Method to write the reports of every student
+    def write_student_reports(self, output, report_format="text"):
+        """
+        Renders the reports of every student, each shard rendering its own
+        students in parallel. Students are listed shard by shard.
+
+        Parameters:
+            output (file or str): The writer, or the path of a file to create.
+            report_format (str): "text", "csv" or "json".
+
+        Returns:
+            None
+        """
+        if report_format not in School.REPORT_HEADERS:
+            raise ValueError(f"Unknown report format: {report_format}")
+        if isinstance(output, str):
+            with open(output, "w", newline="", buffering=1024 * 1024) as file:
+                return self.write_student_reports(file, report_format)
+
+        bodies = [body for body in self._fan_out("render_reports", None, report_format).values() if body]
+        output.write(School.REPORT_HEADERS[report_format])
+        # The shards' JSON entries are separated like the entries within a shard
+        output.write(("," if report_format == "json" else "").join(bodies))
+        output.write(School.REPORT_FOOTERS[report_format])
+
+    # Method to fold every shard's journals into its subject files
+    def compact_all_student_data(self):
+        """
+        Compacts the journals of every shard into its subject files.
+
+        Returns:
+            None
+        """
+        self._fan_out("compact_all_student_data")
+
+    # Method to stop every shard
+    def close(self):
+        """
+        Compacts each shard's files and stops the shard processes.
+
+        Returns:
+            None
+        """
+        if not self._processes:
+            return
+        try:
+            if self._broken is None:
+                self._fan_out("close")
+        finally:
+            # Shards of a broken pool may never answer, so they are stopped instead
+            for process in self._processes:
+                if self._broken is not None:
+                    process.terminate()
+                process.join()
+            for connection in self._connections:
+                connection.close()
+            self._processes = []
+
+    # Helper method to read the layout recorded in data_dir, recording it on first start
+    def _open_layout(self, shard_count, partition):
+        path = os.path.join(self.data_dir, SHARD_METADATA_FILE)
+        try:
+            with open(path) as file:
+                layout = json.load(file)
+        except FileNotFoundError:
+            layout = None
+        except ValueError:
+            raise ValueError(f"Corrupt shard metadata in {path}.")
+
+        if layout is None:
+            # Directories sharded before the layout was recorded keep their shard count
+            existing = len([name for name in os.listdir(self.data_dir) if name.startswith("shard") and name[5:].isdigit()]) if os.path.isdir(self.data_dir) else 0
+            layout = {"shard_count": existing or shard_count or os.cpu_count() or 1, "partition": partition, "subject_shards": {}}
+        if layout["partition"] != partition or (shard_count and shard_count != layout["shard_count"]):
+            raise ValueError(
+                f"{self.data_dir} holds {layout['shard_count']} shards partitioned by {layout['partition']}; "
+                f"open it with the same shard_count and partition, or add its students to a ShardedSchool in a new directory."
+            )
+
+        # Subjects added to subjects.json since the last start get a shard too
+        count = layout["shard_count"]
+        subject_shards = dict(layout["subject_shards"])
+        for number, subject in enumerate(School.STUDENT_CLASSES):
+            subject_shards.setdefault(subject, number % count)
+        if subject_shards != layout["subject_shards"]:
+            os.makedirs(self.data_dir, exist_ok=True)
+            layout = {"shard_count": count, "partition": partition, "subject_shards": subject_shards}
+            with open(path + ".tmp", "w") as file:
+                json.dump(layout, file, indent=2)
+            os.replace(path + ".tmp", path)
+        return count, subject_shards
+
+    # Helper method dropping students whose ID is already taken, with an error for each
+    def _without_known_ids(self, students):
+        known = set()
+        for shard_ids in self._fan_out("find_ids", None, [student.student_id for student in students]).values():
+            known.update(shard_ids)
+        kept = []
+        for student in students:
+            if student.student_id in known:
+                print(f"Error: Student with ID {student.student_id} already exists.")
+                continue
+            known.add(student.student_id)
+            kept.append(student)
+        return kept
+
+    # Helper method to find the shard owning a student object
+    def _shard_of_student(self, student):
+        shard = self.shard_of(student.student_id, student.subject)
+        if shard is None:
+            raise ValueError(f"Invalid subject '{student.subject}'.")
+        return shard
+
+    # Helper method refusing requests once the pool is broken
+    def _check_usable(self):
+        if self._broken is not None:
+            raise ValueError(f"The shards can no longer be used ({self._broken}); close this ShardedSchool and open it again.")
+
+    # Helper method sending a request to a shard; a request that cannot be pickled is not sent at all
+    def _send(self, shard, request):
+        try:
+            self._connections[shard].send(request)
+        except OSError as error:
+            self._mark_broken(shard, error)
+            raise
+
+    # Helper method reading a shard's answer
+    def _receive(self, shard):
+        try:
+            return self._connections[shard].recv()
+        except (EOFError, OSError) as error:
+            self._mark_broken(shard, error)
+            raise
+        except Exception:
+            # An answer that cannot be unpickled was still read in full
+            raise
+        except BaseException as error:
+            # Interrupted part way through an answer
+            self._mark_broken(shard, error)
+            raise
+
+    # Helper method recording the first failure that broke the pool
+    def _mark_broken(self, shard, error):
+        if self._broken is None:
+            self._broken = f"shard {shard} failed: {error!r}"
+
+    # Helper method grouping students by the shard that owns them
+    def _group(self, students):
+        groups = {}
+        for student in students:
+            groups.setdefault(self._shard_of_student(student), []).append(student)
+        return groups
+
+    # Helper method sending one request to one shard and waiting for its answer
+    def _call(self, shard, operation, *args):
+        with self._locks[shard]:
+            self._check_usable()
+            self._send(shard, (operation, args))
+            status, result = self._receive(shard)
+        if status == "error":
+            raise result
+        return result
+
+    # Helper method sending a request to several shards at once and collecting their answers.
+    # With groups, each shard in it gets its own group as the first argument.
+    def _fan_out(self, operation, groups=None, *args):
+        shards = range(self.shard_count) if groups is None else sorted(groups)
+        for shard in shards:
+            self._locks[shard].acquire()
+        # Shards sent the request whose answer has not been read yet
+        unanswered = []
+        try:
+            self._check_usable()
+            for shard in shards:
+                request = args if groups is None else (groups[shard],) + args
+                self._send(shard, (operation, request))
+                unanswered.append(shard)
+            results = {}
+            for shard in shards:
+                unanswered.remove(shard)
+                results[shard] = self._receive(shard)
+        except BaseException:
+            # Read the answers still on their way, so they are not taken for the answers to the next request
+            for shard in unanswered:
+                try:
+                    self._receive(shard)
+                except Exception:
+                    pass
+            raise
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+        for status, result in results.values():
+            if status == "error":
+                raise result
+        return {shard: result for shard, (status, result) in results.items()}
@@ -0,0 +1,64 @@
+"""
+Shared fixtures for the tests: a scratch directory holding a small roster
+in the format of mathstudent.txt, historystudent.txt and englishstudent.txt.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from school_management_system import School
+
+
+# First student ID of each subject, following the 1001/2001/3001 pattern of the sample files
+FIRST_IDS = {"Math": 1001, "History": 2001, "English": 3001}
+
+# Number of scores in a full record of each subject
+SCORE_COUNTS = {"Math": 8, "History": 4, "English": 4}
+
+
+# Function to write a small random roster to a directory
+def write_roster(directory, students_per_subject=20, seed=0):
+    """
+    Writes students_per_subject random students per subject to the subject files of a directory.
+
+    Parameters:
+        directory (str): The directory to write the subject files to.
+        students_per_subject (int): The number of students per subject.
+        seed (int): The seed for the random scores.
+
+    Returns:
+        None
+    """
+    rng = random.Random(seed)
+    for subject, file_name in School.FILE_PATHS.items():
+        with open(os.path.join(directory, file_name), "w") as file:
+            for position in range(students_per_subject):
+                scores = ",".join(str(round(rng.uniform(0, 100), 1)) for _ in range(SCORE_COUNTS[subject]))
+                file.write(f"{subject},Student {subject} {position},{FIRST_IDS[subject] + position},{scores}\n")
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A directory holding a roster of 20 students per subject, made the working directory."""
+    write_roster(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path)
+
+
+# Function to load every subject of the roster in the working directory
+def load_school():
+    """
+    Creates a school holding every student of the subject files in the working directory.
+
+    Returns:
+        School: The loaded school.
+    """
+    school = School()
+    for subject in School.FILE_PATHS:
+        school.add_students(school.read_student_data(subject))
+    return school
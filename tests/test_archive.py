@@ -0,0 +1,72 @@
+"""
+Tests of exporting students into a compressed archive and restoring all or
+part of it.
+"""
+
+import pytest
+
+from school_management_system import HistoryStudent, School, zstandard
+
+
+# Function to describe a school's stored students by their records
+def stored_records(data_dir):
+    school = School(data_dir=data_dir, lazy=True)
+    school.ensure_loaded()
+    return sorted(school.format_student_record(student) for student in school.students)
+
+
+# Function to change, remove and add students after an export
+def change_roster(school):
+    school.apply_scores(school.find_student_by_id(1001), {"test1_score": 1.0})
+    school.save_student(school.find_student_by_id(1001))
+    school.save_removal(school.remove_student(2005))
+    added = HistoryStudent("Added Student", 2999)
+    school.add_student(added)
+    school.save_student(added)
+
+
+@pytest.mark.parametrize("codec", ["zlib", pytest.param("zstd", marks=pytest.mark.skipif(zstandard is None, reason="needs zstandard"))])
+def test_round_trip(data_dir, tmp_path, codec):
+    archive = str(tmp_path / "roster.archive")
+    original = stored_records(data_dir)
+    school = School(data_dir=data_dir, journaling=True, lazy=True)
+    assert school.export_archive(archive, codec=codec, chunk_size=7) == {"Math": 20, "History": 20, "English": 20}
+
+    change_roster(school)
+    assert stored_records(data_dir) != original
+    assert school.restore_archive(archive) == 60
+    assert stored_records(data_dir) == original
+    assert sorted(school.format_student_record(student) for student in school.students) == original
+
+
+def test_partial_restore(data_dir, tmp_path):
+    archive = str(tmp_path / "roster.archive")
+    school = School(data_dir=data_dir, journaling=True, lazy=True)
+    school.export_archive(archive, chunk_size=7)
+    change_roster(school)
+    changed = stored_records(data_dir)
+
+    # Restoring Math leaves the History changes in place
+    assert school.restore_archive(archive, subjects=["Math"]) == 20
+    restored = stored_records(data_dir)
+    assert School(data_dir=data_dir, lazy=True).find_student_by_id(1001).test1_score != 1.0
+    assert [record for record in restored if record.startswith("History")] == [record for record in changed if record.startswith("History")]
+
+    # Restoring an ID range removes the students added to it since the export
+    assert school.restore_archive(archive, subjects=["History"], min_id=2005, max_id=2999) == 16
+    reloaded = School(data_dir=data_dir, lazy=True)
+    assert reloaded.find_student_by_id(2005) is not None
+    assert reloaded.find_student_by_id(2999) is None
+
+
+def test_reads_one_subject(data_dir, tmp_path):
+    archive = str(tmp_path / "roster.archive")
+    school = School(data_dir=data_dir, lazy=True)
+    school.export_archive(archive, chunk_size=7)
+
+    students = list(school.iter_archive_students(archive, subjects=["English"], min_id=3010, max_id=3014))
+    assert [student.student_id for student in students] == list(range(3010, 3015))
+    codec, chunks = school.read_archive_table(archive)
+    assert codec == "zlib"
+    assert {chunk["subject"] for chunk in chunks} == set(School.FILE_PATHS)
+    assert len(chunks) == 9
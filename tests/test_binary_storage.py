@@ -0,0 +1,70 @@
+"""
+Tests of the binary columnar storage format: converting to and from the
+text files, reading and writing through a binary school, and the scores
+coming back as floats.
+"""
+
+import os
+
+from conftest import load_school
+
+from school_management_system import HistoryStudent, MathStudent, School
+
+
+# Function to read every student of a school's files as records
+def records(school):
+    students = [student for subject in School.FILE_PATHS for student in school.read_student_data(subject)]
+    return [school.format_student_record(student) for student in students]
+
+
+def test_conversion_round_trip(data_dir):
+    text_school = School()
+    original = records(text_school)
+    for subject in School.FILE_PATHS:
+        text_school.convert_text_to_binary(subject)
+        assert os.path.exists(School.BINARY_FILE_PATHS[subject])
+
+    assert records(School(storage_format="binary")) == original
+    for subject in School.FILE_PATHS:
+        os.remove(School.FILE_PATHS[subject])
+        School(storage_format="binary").convert_binary_to_text(subject)
+    assert records(School()) == original
+
+
+def test_binary_school_saves_changes(data_dir):
+    for subject in School.FILE_PATHS:
+        School().convert_text_to_binary(subject)
+    school = School(storage_format="binary", journaling=True)
+    for subject in School.FILE_PATHS:
+        school.add_students(school.read_student_data(subject))
+
+    # A Math student with a missing quiz and fewer than five quizzes
+    student = MathStudent("Few Quizzes", 1999)
+    student.add_quiz_score(50.5)
+    student.add_quiz_score(None)
+    school.add_student(student)
+    school.save_student(student)
+    school.save_removal(school.remove_student(1001))
+    school.write_student_data("Math")
+    assert not os.path.exists(School.JOURNAL_PATHS["Math"])
+
+    reloaded = School(storage_format="binary")
+    math_students = {student.student_id: student for student in reloaded.read_student_data("Math")}
+    assert 1001 not in math_students
+    assert reloaded.format_student_record(math_students[1999]) == "Math,Few Quizzes,1999,50.5,,0.0,0.0,0.0"
+    assert math_students[1999].compute_final_grade() == student.compute_final_grade()
+    assert len(math_students) == 20
+
+
+def test_scores_come_back_as_floats(data_dir):
+    school = load_school()
+    student = HistoryStudent("Whole Scores", 2999)
+    student._attendance_score = 7
+    school.add_student(student)
+    school.write_binary_student_data("History", school.find_students_by_subject("History"))
+
+    stored = {student.student_id: student for student in School(storage_format="binary").read_student_data("History")}[2999]
+    assert stored._attendance_score == 7.0
+    assert isinstance(stored._attendance_score, float)
+    assert isinstance(stored._project_score, float)
+    assert school.format_student_record(stored) == "History,Whole Scores,2999,7.0,0.0,0.0,0.0"
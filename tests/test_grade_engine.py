@@ -0,0 +1,38 @@
+"""
+Tests that the vectorized grade engine gives exactly the grades of the
+scalar compute_final_grade and compute_quiz_average methods.
+"""
+
+import random
+
+import pytest
+
+import school_management_system
+from conftest import load_school
+from school_management_system import GradeEngine, MathStudent
+
+
+# Function to enroll Math students with missing and partly missing quizzes
+def add_uneven_quizzes(school):
+    rng = random.Random(1)
+    for position in range(50):
+        student = MathStudent(f"Uneven {position}", 1500 + position)
+        for _ in range(rng.randint(0, 5)):
+            student.add_quiz_score(None if rng.random() < 0.3 else rng.uniform(0, 100))
+        school.add_student(student)
+
+
+@pytest.mark.parametrize("vectorized", [pytest.param(True, marks=pytest.mark.skipif(school_management_system.np is None, reason="needs NumPy")), False])
+def test_matches_scalar_methods_exactly(data_dir, monkeypatch, vectorized):
+    if not vectorized:
+        monkeypatch.setattr(school_management_system, "np", None)
+    school = load_school()
+    add_uneven_quizzes(school)
+
+    # Compared with ==, not approx: the engine promises the same floats
+    grades = school.compute_final_grades()
+    assert list(grades) == [student.student_id for student in school.students]
+    assert grades == {student.student_id: student.compute_final_grade() for student in school.students}
+
+    averages = GradeEngine(school.students).compute_quiz_averages()
+    assert averages == {student.student_id: student.compute_quiz_average() for student in school.find_students_by_subject("Math")}
@@ -0,0 +1,70 @@
+"""
+Tests of the ordered grade index behind the top-N, grade range and rank
+queries, after bulk loads, additions, removals and score updates.
+"""
+
+import math
+
+import pytest
+
+from conftest import load_school
+
+from school_management_system import MathStudent, School
+
+
+# Function to check the index of every subject against the students
+def assert_index_matches(school):
+    for subject in School.FILE_PATHS:
+        students = school.find_students_by_subject(subject)
+        ranked = sorted(((student.compute_final_grade(), student.student_id) for student in students), reverse=True)
+        top = school.top_students(subject, count=len(students))
+        assert [(grade, student.student_id) for student, grade in top] == ranked
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_bulk_load(data_dir, lazy):
+    if lazy:
+        school = School(lazy=True)
+        school.ensure_loaded()
+    else:
+        school = load_school()
+    assert school.count_students() == 60
+    assert_index_matches(school)
+    assert len(school.top_students("Math", count=5)) == 5
+
+
+def test_add_remove_and_update(data_dir):
+    school = load_school()
+    school.top_students("Math")
+
+    best = MathStudent("Best Student", 1999)
+    best.set_quiz_scores([100.0])
+    best.test1_score = best.test2_score = best.final_exam_score = 100.0
+    school.add_student(best)
+    assert school.top_students("Math", count=1)[0][0] is best
+    assert school.student_rank(1999)["rank"] == 1
+
+    school.remove_student(1999)
+    school.remove_student(2001)
+    assert school.student_rank(1999) is None
+    assert len(school.students_in_grade_range("History")) == 19
+
+    # A score update moves the student within the index
+    student = school.find_student_by_id(3001)
+    for field in ("attendance_score", "final_exam_score", "quiz1_score", "quiz2_score"):
+        setattr(student, field, 0.0)
+    assert school.students_in_grade_range("English", high=0.0) == [(student, 0.0)]
+    assert school.student_rank(3001)["rank"] == 20
+    assert school.student_rank(3001)["percentile"] == 0.0
+    assert_index_matches(school)
+
+
+def test_grade_range_bounds(data_dir):
+    school = load_school()
+    grades = [grade for _, grade in school.students_in_grade_range("History")]
+    assert grades == sorted(grades)
+
+    low, high = grades[5], grades[10]
+    in_range = school.students_in_grade_range("History", low, high)
+    assert [grade for _, grade in in_range] == [grade for grade in grades if low <= grade <= high]
+    assert all(not math.isnan(grade) for grade in grades)
@@ -0,0 +1,134 @@
+"""
+Tests of the grade history: rebuilding rosters and students at a point in
+time from checkpoints and deltas, terms, and several writers sharing one
+database.
+"""
+
+import pytest
+
+from school_management_system import GradeHistory, School
+
+
+@pytest.fixture
+def school(data_dir):
+    school = School(data_dir=data_dir)
+    school.add_students(school.read_all_student_data())
+    return school
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = GradeHistory(str(tmp_path / "history.db"), checkpoint_interval=7)
+    yield history
+    history.close()
+
+
+# Function to describe a roster by its records, for comparing students by value
+def records(school, students):
+    return sorted(school.format_student_record(student) for student in students)
+
+
+@pytest.mark.parametrize("checkpoint_interval", [7, 10000])
+def test_roster_replay(school, tmp_path, checkpoint_interval):
+    history = GradeHistory(str(tmp_path / "history.db"), checkpoint_interval=checkpoint_interval)
+    roster = school.find_students_by_subject("History")
+    history.record_students(roster, timestamp=100)
+    first = records(school, roster)
+
+    # Changes recorded one at a time cross several checkpoints
+    for position, student in enumerate(roster[:10]):
+        school.apply_scores(student, {"exam1_score": float(position)})
+        history.record_students([student], timestamp=200 + position)
+    second = records(school, roster)
+    removed = roster[-1]
+    history.record_removals([removed], timestamp=300)
+
+    assert records(school, history.roster_as_of("History", 50)) == []
+    assert records(school, history.roster_as_of("History", 150)) == first
+    assert records(school, history.roster_as_of("History", 250)) == second
+    assert records(school, history.roster_as_of("History", 350)) == [record for record in second if f",{removed.student_id}," not in record]
+    history.close()
+
+
+def test_student_versions_and_grades(school, history):
+    student = school.find_student_by_id(3001)
+    original_grade = student.compute_final_grade()
+    history.record_students([student], timestamp=100)
+    # Unchanged students add nothing
+    assert history.record_students([student], timestamp=150) == 0
+
+    school.apply_scores(student, {"final_exam_score": 100.0})
+    history.record_students([student], timestamp=200)
+    history.record_removals([student], timestamp=300)
+
+    assert [timestamp for timestamp, _ in history.student_versions(3001)] == [100, 200, 300]
+    assert history.grade_as_of(3001, 50) is None
+    assert history.grade_as_of(3001, 100) == pytest.approx(original_grade)
+    assert history.grade_as_of(3001, 250) == pytest.approx(student.compute_final_grade())
+    assert history.student_as_of(3001, 300) is None
+    assert [grade is None for _, grade in history.grade_trend(3001)] == [False, False, True]
+
+
+def test_terms(school, history):
+    history.end_term("Autumn", school.students, timestamp=100)
+    removed = school.remove_student(1001)
+    history.end_term("Spring", school.students, timestamp=200)
+
+    assert history.terms() == [("Autumn", 100), ("Spring", 200)]
+    assert history.term_timestamp("Winter") is None
+    autumn = history.roster_as_of("Math", history.term_timestamp("Autumn"))
+    spring = history.roster_as_of("Math", history.term_timestamp("Spring"))
+    assert removed.student_id in {student.student_id for student in autumn}
+    assert len(spring) == len(autumn) - 1
+
+
+def test_school_records_saved_changes(data_dir, tmp_path):
+    school = School(data_dir=data_dir, journaling=True, lazy=True, history=GradeHistory(str(tmp_path / "history.db")))
+    student = school.find_student_by_id(2001)
+    school.apply_scores(student, {"project_score": 12.0})
+    school.save_student(student)
+    school.save_student(school.find_student_by_id(2002))
+    school.save_removal(school.remove_student(2002))
+    school.close()
+
+    history = GradeHistory(str(tmp_path / "history.db"))
+    assert history.student_as_of(2001, float("inf")).project_score == 12.0
+    assert [student is None for _, student in history.student_versions(2002)] == [False, True]
+    history.close()
+
+
+
+def test_failed_save_is_not_recorded(data_dir, tmp_path, monkeypatch):
+    history = GradeHistory(str(tmp_path / "history.db"))
+    school = School(data_dir=data_dir, journaling=True, lazy=True, history=history)
+    student = school.find_student_by_id(2001)
+
+    def fail(subject, record):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(school, "append_journal_record", fail)
+    with pytest.raises(OSError):
+        school.save_student(student)
+    with pytest.raises(OSError):
+        school.save_removal(student)
+    assert history.student_versions(2001) == []
+    school.close()
+
+
+def test_writers_sharing_a_database(school, tmp_path):
+    path = str(tmp_path / "history.db")
+    first, second = GradeHistory(path), GradeHistory(path)
+    student = school.find_student_by_id(2001)
+    first.record_students([student], timestamp=100)
+
+    # The second writer computes its delta against the first writer's version
+    school.apply_scores(student, {"exam2_score": 1.0})
+    second.record_students([student], timestamp=200)
+    # A version the first writer has not seen is not recorded twice
+    assert first.record_students([student], timestamp=300) == 0
+
+    third = GradeHistory(path)
+    assert [timestamp for timestamp, _ in third.student_versions(2001)] == [100, 200]
+    assert third.student_as_of(2001, 250).exam2_score == 1.0
+    for history in (first, second, third):
+        history.close()
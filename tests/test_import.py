@@ -0,0 +1,100 @@
+"""
+Tests of bulk imports from CSV and JSONL files: error reporting, and
+applying a valid file in full or an invalid one not at all.
+"""
+
+import json
+
+import pytest
+
+from conftest import load_school
+
+
+# Function to write the lines of an import file
+def write_import(tmp_path, file_name, lines):
+    path = tmp_path / file_name
+    path.write_text("".join(line + "\n" for line in lines))
+    return str(path)
+
+
+def test_csv_errors_are_reported_and_nothing_is_applied(data_dir, tmp_path):
+    school = load_school()
+    before = school.find_student_by_id(2001).attendance_score
+    path = write_import(tmp_path, "import.csv", [
+        "student_id,subject,name,attendance_score,project_score",
+        "2001,,,90,",
+        "abc,History,Someone,,",
+        "2998,Art,Someone,,",
+        "1001,History,,,",
+        "2999,History,,,",
+        "2997,History,\"Smith, Jo\",,",
+        "2002,,,101,x",
+    ])
+    result = school.import_student_data(path)
+    assert result["errors"] == [
+        "Line 3: Invalid student ID.",
+        "Line 4: Invalid subject 'Art'.",
+        "Line 5: Student with ID 1001 is not a History student.",
+        "Line 6: A name is required. (student 2999)",
+        "Line 7: Names cannot contain commas or line breaks. (student 2997)",
+        "Line 8: attendance_score should be between 0 and 100.",
+        "Line 8: Invalid project_score 'x'.",
+    ]
+    assert result["enrolled"] == result["updated"] == 0
+    assert school.find_student_by_id(2001).attendance_score == before
+    assert not any(school.find_student_by_id(student_id) for student_id in (2997, 2998, 2999))
+
+
+def test_jsonl_errors_are_reported(data_dir, tmp_path):
+    school = load_school()
+    path = write_import(tmp_path, "import.jsonl", [
+        json.dumps({"student_id": 2001, "attendance_score": 90}),
+        "{not json",
+        "[2001]",
+        "",
+        json.dumps({"student_id": 2999, "subject": 7, "name": "Someone"}),
+    ])
+    result = school.import_student_data(path)
+    assert [error.split(" (")[0] for error in result["errors"]] == [
+        "Line 2: Invalid JSON",
+        "Line 3: Expected a JSON object, found list.",
+        "Line 5: Invalid subject '7'.",
+    ]
+    assert result["rows"] == 2
+
+
+def test_valid_import_is_applied_and_saved(data_dir, tmp_path):
+    school = load_school()
+    path = write_import(tmp_path, "import.jsonl", [
+        json.dumps({"student_id": 2001, "attendance_score": 90}),
+        json.dumps({"student_id": 1999, "subject": "Math", "name": "New Student", "quiz2": 75, "final_exam_score": 80}),
+    ])
+    result = school.import_student_data(path)
+    assert result["errors"] == []
+    assert (result["rows"], result["enrolled"], result["updated"]) == (2, 1, 1)
+
+    reloaded = load_school()
+    assert reloaded.find_student_by_id(2001).attendance_score == 90.0
+    new_student = reloaded.find_student_by_id(1999)
+    assert new_student.name == "New Student"
+    assert new_student.quizzes == [None, 75.0, None, None, None]
+    assert new_student.final_exam_score == 80.0
+
+
+def test_failed_save_is_undone_in_memory(data_dir, tmp_path, monkeypatch):
+    school = load_school()
+    path = write_import(tmp_path, "import.csv", [
+        "student_id,subject,name,attendance_score",
+        "2001,,,90",
+        "2999,History,New Student,50",
+    ])
+    before = school.find_student_by_id(2001).attendance_score
+
+    def fail(students):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(school, "save_students", fail)
+    with pytest.raises(OSError):
+        school.import_student_data(path)
+    assert school.find_student_by_id(2001).attendance_score == before
+    assert school.find_student_by_id(2999) is None
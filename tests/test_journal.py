@@ -0,0 +1,152 @@
+"""
+Tests of journal persistence: replaying change records on top of the
+snapshot files, torn final and malformed records, indexed lookups, and
+compacting them back into the snapshots.
+"""
+
+import builtins
+import os
+
+import school_management_system
+from conftest import load_school
+
+from school_management_system import HistoryStudent, School
+
+
+# Function to append raw text to a subject's journal
+def append_journal(school, subject, text):
+    with open(school.JOURNAL_PATHS[subject], "a") as journal:
+        journal.write(text)
+
+
+def test_replay_applies_updates_and_removals(data_dir):
+    school = load_school()
+    school.journaling = True
+    student = school.find_student_by_id(2001)
+    student._attendance_score = 11.0
+    school.save_student(student)
+    school.save_removal(school.remove_student(2002))
+    added = HistoryStudent("Added Student", 2999)
+    school.add_student(added)
+    school.save_student(added)
+
+    # The snapshot is left alone and the changes go to the journal
+    with open(School.FILE_PATHS["History"]) as file:
+        assert len(file.readlines()) == 20
+    with open(School.JOURNAL_PATHS["History"]) as journal:
+        assert [line.split(",")[0] for line in journal] == ["U", "D", "U"]
+
+    reloaded = load_school()
+    assert reloaded.find_student_by_id(2001)._attendance_score == 11.0
+    assert reloaded.find_student_by_id(2002) is None
+    assert reloaded.find_student_by_id(2999).name == "Added Student"
+    assert len(reloaded.students) == 60
+
+
+def test_torn_final_record_is_ignored_and_truncated(data_dir):
+    school = School(journaling=True, lazy=True)
+    student = school.find_student_by_id(2001)
+    school.apply_scores(student, {"attendance_score": 11.0})
+    school.save_student(student)
+    # A crash cut the second record short before its newline
+    append_journal(school, "History", "U,History,Torn Update,2001,50")
+
+    reloaded = School(journaling=True, lazy=True)
+    assert reloaded.find_student_by_id(2001).attendance_score == 11.0
+    reloaded.ensure_loaded(["History"])
+    assert reloaded.journal_errors["History"] == []
+
+    # The next append removes the torn record instead of joining onto it
+    student = reloaded.find_student_by_id(2003)
+    reloaded.apply_scores(student, {"attendance_score": 33.0})
+    reloaded.save_student(student)
+    with open(reloaded.JOURNAL_PATHS["History"]) as journal:
+        lines = journal.read().splitlines()
+    assert len(lines) == 2
+    assert all(line.startswith("U,History,") and "Torn" not in line for line in lines)
+    assert School(lazy=True).find_student_by_id(2003).attendance_score == 33.0
+
+
+def test_malformed_records_are_reported(data_dir):
+    school = School(journaling=True, lazy=True)
+    append_journal(school, "Math", "U,Math,Bad Score,1001,1,2,3,4,500,1,2,3\nD,abc\nX,1\nD,1002\n")
+
+    school.ensure_loaded()
+    assert school.journal_errors["Math"] == [
+        "Line 1: Quiz 5 score '500' in field 8 should be between 0 and 100.",
+        "Line 2: Invalid student ID 'abc'.",
+        "Line 3: Unknown journal record 'X'.",
+    ]
+    assert school.find_student_by_id(1002) is None
+    assert school.find_student_by_id(1001).name == "Student Math 0"
+
+
+def test_compaction(data_dir):
+    school = School(journaling=True, compaction_threshold=3)
+    for subject in School.FILE_PATHS:
+        school.add_students(school.read_student_data(subject))
+    for student_id in (2001, 2002):
+        school.save_removal(school.remove_student(student_id))
+    assert os.path.exists(School.JOURNAL_PATHS["History"])
+
+    # The third record reaches the threshold and folds the journal into the snapshot
+    school.save_removal(school.remove_student(2003))
+    assert not os.path.exists(School.JOURNAL_PATHS["History"])
+    with open(School.FILE_PATHS["History"]) as file:
+        assert [line.split(",")[2] for line in file][:2] == ["2004", "2005"]
+    assert len(load_school().find_students_by_subject("History")) == 17
+
+
+def test_indexed_lookups_and_compaction(data_dir):
+    school = School(journaling=True, lazy=True)
+    school.compact_all_student_data()
+    assert all(os.path.exists(path) for path in school.INDEX_PATHS.values())
+    append_journal(school, "English", "U,English,Indexed Update,3005,1,2,3,4\nD,3006\n")
+
+    # Lookups read single records and apply the pending journal changes
+    lookups = School(journaling=True, lazy=True)
+    assert lookups.find_student_by_id(3005).name == "Indexed Update"
+    assert lookups.find_student_by_id(3006) is None
+    assert lookups.find_student_by_id(3007).name == "Student English 6"
+    assert lookups._loaded_subjects == set()
+    lookups.ensure_loaded()
+    assert lookups.count_students() == 59
+
+    lookups.compact_all_student_data()
+    assert not os.path.exists(lookups.JOURNAL_PATHS["English"])
+    compacted = School(lazy=True)
+    assert compacted.find_student_by_id(3005).name == "Indexed Update"
+    assert compacted.count_students() == 59
+
+
+def test_lookups_and_load_read_the_journal_once(data_dir, monkeypatch):
+    School(journaling=True, lazy=True).compact_all_student_data()
+    school = School(journaling=True, lazy=True)
+    append_journal(school, "English", "U,English,Indexed Update,3005,1,2,3,4\n")
+    opened = []
+
+    def counting_open(file, *args, **kwargs):
+        opened.append(file)
+        return builtins.open(file, *args, **kwargs)
+
+    monkeypatch.setattr(school_management_system, "open", counting_open, raising=False)
+    assert school.find_student_by_id(3005).name == "Indexed Update"
+    assert school.find_student_by_id(3006).name == "Student English 5"
+    school.ensure_loaded(["English"])
+    assert opened.count(school.JOURNAL_PATHS["English"]) == 1
+
+    # A changed journal is read again
+    append_journal(school, "English", "D,3007\n")
+    assert School(journaling=True, lazy=True).find_student_by_id(3007) is None
+
+
+def test_stale_index_falls_back_to_loading(data_dir):
+    school = School(lazy=True)
+    school.compact_all_student_data()
+    # A snapshot rewritten by hand no longer matches its index
+    with open(School.FILE_PATHS["History"], "a") as file:
+        file.write("History,Appended Student,2999,1,2,3,4\n")
+
+    reloaded = School(lazy=True)
+    assert reloaded.find_student_by_id(2999).name == "Appended Student"
+    assert reloaded.find_student_by_id(2001).name == "Student History 0"
@@ -0,0 +1,85 @@
+"""
+Tests of subject locks and atomic file replacement: failed writes, writers
+in several threads, and compaction keeping other writers' changes.
+"""
+
+import os
+import threading
+
+import pytest
+
+from school_management_system import HistoryStudent, School
+
+
+def test_failed_write_keeps_the_old_file(data_dir):
+    school = School()
+    path = school.FILE_PATHS["History"]
+    with open(path) as file:
+        before = file.read()
+
+    def write(file):
+        file.write("partial\n")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        school.write_file_atomically(path, write)
+    with open(path) as file:
+        assert file.read() == before
+    assert not [name for name in os.listdir(data_dir) if name.endswith(".tmp")]
+
+
+def test_exclusive_lock_waits_for_the_holder(data_dir):
+    school = School()
+    events = []
+
+    def take_lock():
+        with School().subject_lock("Math"):
+            events.append("second")
+
+    with school.subject_lock("Math"):
+        thread = threading.Thread(target=take_lock)
+        thread.start()
+        # The second thread is still waiting while the lock is held
+        thread.join(0.2)
+        assert events == []
+        events.append("first")
+    thread.join()
+    assert events == ["first", "second"]
+
+
+def test_writers_in_several_threads_lose_nothing(data_dir):
+    def write(writer_number):
+        school = School(journaling=True, compaction_threshold=5)
+        for position in range(30):
+            student = HistoryStudent(f"Writer {writer_number}", 10000 + writer_number * 100 + position)
+            school.apply_scores(student, {"attendance_score": float(position)})
+            school.save_student(student)
+
+    threads = [threading.Thread(target=write, args=(writer_number,)) for writer_number in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    school = School()
+    students = school.read_student_data("History")
+    assert len(students) == 20 + 4 * 30
+    assert len({student.student_id for student in students}) == len(students)
+
+
+def test_compaction_keeps_other_writers_changes(data_dir):
+    writer = School(journaling=True)
+    writer.add_students(writer.read_all_student_data())
+    student = writer.find_student_by_id(2001)
+    writer.apply_scores(student, {"project_score": 12.0})
+    writer.save_student(student)
+
+    # A second school that never saw the change compacts the journal
+    other = School(journaling=True)
+    other.add_students(other.read_all_student_data())
+    other.find_student_by_id(2001).project_score = 99.0
+    other.compact_all_student_data()
+
+    assert not os.path.exists(other.JOURNAL_PATHS["History"])
+    reloaded = {student.student_id: student for student in School().read_student_data("History")}
+    assert reloaded[2001].project_score == 12.0
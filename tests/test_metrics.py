@@ -0,0 +1,83 @@
+"""
+Tests of the opt-in timing metrics: what is recorded, and exporting it as
+JSON or Prometheus text.
+"""
+
+import json
+
+import pytest
+
+from school_management_system import HistoryStudent, MathStudent, School
+
+
+@pytest.fixture
+def school(data_dir):
+    school = School()
+    school.add_students(school.read_all_student_data())
+    school.enable_instrumentation()
+    return school
+
+
+def test_operations_are_counted(school):
+    school.find_student_by_id(2001)
+    school.find_student_by_id(9999)
+    metrics = school.metrics()["find_student_by_id"]
+    assert metrics["count"] == metrics["buckets"]["+Inf"] == 2
+    assert metrics["total_seconds"] >= metrics["max_seconds"] > 0
+
+    school.add_student(HistoryStudent("Added Student", 2999))
+    school.remove_student(2999)
+    metrics = school.metrics()
+    assert metrics["add_student"]["count"] == metrics["remove_student"]["count"] == 1
+
+    school.reset_metrics()
+    assert school.metrics()["find_student_by_id"]["count"] == 0
+
+
+def test_disabled_schools_record_nothing(school):
+    school.find_student_by_id(2001)
+    school.disable_instrumentation()
+    school.find_student_by_id(2002)
+    assert school.metrics()["find_student_by_id"]["count"] == 1
+    assert "find_student_by_id" not in vars(school)
+
+    plain = School()
+    plain.find_student_by_id(2001)
+    assert plain.metrics() == {}
+
+
+def test_grading_is_timed_per_school(school, tmp_path):
+    other = School()
+    other.add_students(other.read_all_student_data())
+    other.enable_instrumentation()
+    other.disable_instrumentation()
+
+    school.compute_final_grades()
+    school.write_student_reports(str(tmp_path / "report.csv"), "csv")
+    other.compute_final_grades()
+    metrics = school.metrics()
+    assert metrics["compute_final_grades"]["count"] == metrics["write_student_reports"]["count"] == 1
+    assert other.metrics()["compute_final_grades"]["count"] == 0
+    # The student classes keep their plain grade method
+    assert not hasattr(MathStudent.compute_final_grade, "__wrapped__")
+    assert "compute_final_grade" not in metrics
+
+
+def test_export(school, tmp_path):
+    school.find_student_by_id(2001)
+
+    json_path = str(tmp_path / "metrics.json")
+    school.export_metrics(json_path)
+    with open(json_path) as file:
+        assert json.load(file)["find_student_by_id"]["count"] == 1
+
+    prometheus_path = str(tmp_path / "metrics.prom")
+    school.export_metrics(prometheus_path)
+    with open(prometheus_path) as file:
+        lines = file.read().splitlines()
+    assert "# TYPE school_operation_seconds histogram" in lines
+    assert 'school_operation_seconds_count{operation="find_student_by_id"} 1' in lines
+    assert 'school_operation_seconds_bucket{operation="find_student_by_id",le="+Inf"} 1' in lines
+
+    with pytest.raises(ValueError):
+        school.export_metrics(json_path, "xml")
@@ -0,0 +1,60 @@
+"""
+Tests of searching students by name: prefixes of any word, typos, removed
+students and result limits.
+"""
+
+import pytest
+
+from school_management_system import EnglishStudent, HistoryStudent, MathStudent, NameIndex, School
+
+
+@pytest.fixture
+def school():
+    school = School()
+    school.add_students([
+        MathStudent("Alice Winchester", 1001),
+        HistoryStudent("Alicia Keys", 2001),
+        EnglishStudent("Bob Alison", 3001),
+        MathStudent("Charlotte Brown", 1002),
+        HistoryStudent("Charles Browning", 2002),
+    ])
+    return school
+
+
+# Function to list the IDs of the students found by a search
+def found(school, query, limit=10):
+    return [student.student_id for student in school.search_students_by_name(query, limit)]
+
+
+def test_prefix_matches(school):
+    assert found(school, "ali") == [1001, 2001, 3001]
+    assert found(school, "  ALICE   wi ") == [1001]
+    assert found(school, "brown") == [1002, 2002]
+    assert found(school, "ali", limit=2) == [1001, 2001]
+    assert found(school, "") == []
+    assert found(school, "zzz") == []
+
+
+def test_typos_are_tolerated(school):
+    # A substitution, and a swap of neighbouring letters
+    assert found(school, "charlitte") == [1002]
+    assert found(school, "alcie winchester") == [1001]
+    # Exact matches come before the typo-tolerant ones
+    assert found(school, "charles")[0] == 2002
+
+
+def test_removed_and_added_students(school):
+    school.remove_student(2001)
+    assert found(school, "keys") == []
+    # A name that comes back is found again without reindexing
+    school.add_student(EnglishStudent("Alicia Keys", 3002))
+    school.add_student(EnglishStudent("Dana Keys", 3003))
+    assert found(school, "alicia keys") == [3002]
+    assert found(school, "keys") == [3002, 3003]
+
+
+def test_edit_distance():
+    assert NameIndex._edit_distance("alice", "alcie", 2) == 1
+    assert NameIndex._edit_distance("kitten", "sitting", 5) == 3
+    assert NameIndex._edit_distance("kitten", "sitting", 1) > 1
+    assert NameIndex.normalize("  Mary-Jane   SMITH ") == NameIndex.normalize("mary-jane smith")
@@ -0,0 +1,71 @@
+"""
+Tests of the validating subject file parser: malformed rows are reported
+with their line numbers and skipped, and the valid rows still load.
+Scores must be finite and between 0 and 100.
+"""
+
+from school_management_system import School, SubjectStatistics
+
+
+# Function to append raw lines to a subject file
+def append_lines(subject, lines):
+    with open(School.FILE_PATHS[subject], "a") as file:
+        file.write("".join(line + "\n" for line in lines))
+
+
+def test_malformed_rows_are_reported(data_dir):
+    append_lines("History", [
+        "History,Bad ID,abc,1,2,3,4",
+        "Math,Wrong Subject,2998,1,2,3,4",
+        "",
+        "History,Too Many,2997,1,2,3,4,5",
+        "History,Good Row,2996,1,2,3,4",
+    ])
+    school = School()
+    students = school.read_student_data("History")
+    assert school.record_errors["History"] == [
+        "Line 21: Invalid student ID 'abc'.",
+        "Line 22: Expected a History record, found 'Math'.",
+        "Line 24: Expected at most 7 fields, found 8.",
+    ]
+    assert len(students) == 21
+    assert students[-1].name == "Good Row"
+
+    # A clean read replaces the report
+    school.read_student_data("Math")
+    assert school.record_errors["Math"] == []
+
+
+def test_out_of_range_and_non_finite_scores_are_rejected(data_dir):
+    append_lines("History", [
+        "History,Too High,2999,1,2,3,101",
+        "History,Negative,2998,-1,2,3,4",
+        "History,Not A Number,2997,nan,2,3,4",
+        "History,Infinite,2996,1,inf,3,4",
+        "History,Bounds,2995,0,100,0.0,100.0",
+    ])
+    append_lines("Math", [
+        "Math,Quiz Too High,1999,1,2,3,4,500,1,2,3",
+        "Math,Missing Quiz,1998,1,,3,4,-5,1,2,3",
+        "Math,Quiz Not A Number,1997,1,2,nan,4,5,1,2,3",
+    ])
+    school = School()
+    students = school.read_student_data("History")
+    assert school.record_errors["History"] == [
+        "Line 21: Exam 2 score '101' in field 7 should be between 0 and 100.",
+        "Line 22: Attendance score '-1' in field 4 should be between 0 and 100.",
+        "Line 23: Attendance score 'nan' in field 4 should be between 0 and 100.",
+        "Line 24: Project score 'inf' in field 5 should be between 0 and 100.",
+    ]
+    assert [student.student_id for student in students[20:]] == [2995]
+
+    assert len(school.read_student_data("Math")) == 20
+    assert [error.split(":")[0] for error in school.record_errors["Math"]] == ["Line 21", "Line 22", "Line 23"]
+
+
+def test_statistics_leave_out_non_finite_grades():
+    statistics = SubjectStatistics()
+    for grade in (50.0, float("nan"), float("inf"), 70.0):
+        statistics.add(grade)
+    assert statistics.count == 2
+    assert statistics.summary()["mean"] == 60.0
@@ -0,0 +1,68 @@
+"""
+Tests of the School registry: adding, finding and removing students through
+the ID, subject and name indexes, and writing them back to the subject files.
+"""
+
+import pytest
+
+from conftest import load_school
+
+from school_management_system import HistoryStudent, School
+
+
+def test_load_and_find(data_dir):
+    school = load_school()
+    assert len(school.students) == 60
+    assert [student.student_id for student in school.students[:3]] == [1001, 1002, 1003]
+    assert school.find_student_by_id(2005).name == "Student History 4"
+    assert school.find_student_by_id(9999) is None
+    assert [student.student_id for student in school.find_students_by_subject("English")] == list(range(3001, 3021))
+    assert [student.student_id for student in school.find_students_by_name("Student Math 3")] == [1004]
+
+
+def test_add_and_remove_keep_indexes_in_sync(data_dir, capsys):
+    school = load_school()
+    assert school.add_student(HistoryStudent("Student Math 3", 2999))
+    assert not school.add_student(HistoryStudent("Duplicate", 2999))
+    assert "Student with ID 2999 already exists." in capsys.readouterr().out
+    assert {student.student_id for student in school.find_students_by_name("Student Math 3")} == {1004, 2999}
+
+    assert school.remove_student(1004).student_id == 1004
+    assert school.remove_student(1004) is None
+    assert [student.student_id for student in school.find_students_by_name("Student Math 3")] == [2999]
+    assert 1004 not in {student.student_id for student in school.find_students_by_subject("Math")}
+    # Students keep the order they were added in
+    assert school.students[-1].student_id == 2999
+
+
+def test_students_cannot_be_changed_in_place(data_dir):
+    school = load_school()
+    with pytest.raises(AttributeError):
+        school.students.append(HistoryStudent("Appended Student", 2999))
+    with pytest.raises(AttributeError):
+        school.students.extend([HistoryStudent("Appended Student", 2999)])
+    with pytest.raises(TypeError):
+        school.students[0] = HistoryStudent("Replaced Student", 2999)
+    assert school.count_students() == 60
+    assert school.find_student_by_id(2999) is None
+
+
+def test_write_round_trip(data_dir):
+    school = load_school()
+    school.remove_student(2001)
+    school.write_student_data("History")
+
+    reloaded = School()
+    reloaded.add_students(reloaded.read_student_data("History"))
+    assert [student.student_id for student in reloaded.students] == list(range(2002, 2021))
+    assert [student.compute_final_grade() for student in reloaded.students] == \
+        [student.compute_final_grade() for student in school.find_students_by_subject("History")]
+
+
+def test_grade_cache_hits_are_counted_per_school(data_dir):
+    school, other = load_school(), load_school()
+    student = school.find_student_by_id(2001)
+    student.compute_final_grade()
+    student.compute_final_grade()
+    assert (school.grade_cache_misses, school.grade_cache_hits) == (1, 1)
+    assert (other.grade_cache_misses, other.grade_cache_hits) == (0, 0)
@@ -0,0 +1,174 @@
+"""
+Tests of the HTTP service: authentication, the student endpoints, reports,
+statistics and malformed requests, against a service on a free local port.
+"""
+
+import asyncio
+import base64
+import json
+
+from conftest import load_school
+
+from school_service import SchoolService
+
+
+# HTTP Basic credentials accepted by the console login
+AUTH = base64.b64encode(b"admin:password").decode("ascii")
+
+
+# Function to send raw bytes to the service and read the whole response
+async def send_raw(port, data):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), body.decode("utf-8")
+
+
+# Function to send one request and return the status and the body
+async def request(port, method, path, body=None, auth=AUTH):
+    data = b"" if body is None else json.dumps(body).encode("utf-8")
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\nContent-Length: {len(data)}\r\n"
+    if auth:
+        head += f"Authorization: Basic {auth}\r\n"
+    return await send_raw(port, head.encode("latin-1") + b"\r\n" + data)
+
+
+# Function to serve a school while a client coroutine runs against it
+def run_with_service(school, client):
+    async def main():
+        service = SchoolService(school)
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        async with server:
+            return await client(server.sockets[0].getsockname()[1])
+
+    return asyncio.run(main())
+
+
+def test_student_endpoints(data_dir):
+    school = load_school()
+    school.journaling = True
+
+    async def client(port):
+        assert (await request(port, "GET", "/students", auth=None))[0] == 401
+
+        status, body = await request(port, "GET", "/students?offset=58&limit=5")
+        assert status == 200
+        assert json.loads(body)["count"] == 60
+        assert [student["student_id"] for student in json.loads(body)["students"]] == [3019, 3020]
+
+        new_student = {"subject": "History", "name": "New Student", "student_id": 2999}
+        assert (await request(port, "POST", "/students", new_student))[0] == 201
+        assert (await request(port, "POST", "/students", new_student))[0] == 409
+        assert (await request(port, "POST", "/students", dict(new_student, subject="Art", student_id=2998)))[0] == 400
+        assert (await request(port, "POST", "/students", dict(new_student, name="Smith, Jo", student_id=2998)))[0] == 400
+
+        status, body = await request(port, "PATCH", "/students/2999", {"attendance_score": 80, "project_score": 70})
+        assert status == 200
+        assert json.loads(body)["final_grade"] == 80 * 0.1 + 70 * 0.3
+        assert (await request(port, "PATCH", "/students/2999", {"attendance_score": 101}))[0] == 400
+        assert json.loads((await request(port, "GET", "/students/2999"))[1])["attendance_score"] == 80.0
+
+        assert (await request(port, "DELETE", "/students/2001"))[0] == 200
+        assert (await request(port, "GET", "/students/2001"))[0] == 404
+        assert (await request(port, "GET", "/students/abc"))[0] == 400
+        assert (await request(port, "GET", "/nowhere"))[0] == 404
+
+    run_with_service(school, client)
+
+    # Every change went to the journals
+    reloaded = load_school()
+    assert reloaded.find_student_by_id(2999).attendance_score == 80.0
+    assert reloaded.find_student_by_id(2001) is None
+
+
+def test_reads_wait_for_changes(data_dir):
+    school = load_school()
+
+    async def main():
+        service = SchoolService(school)
+        headers = {"authorization": f"Basic {AUTH}"}
+        # Reads started while a change holds the lock only run once it is released
+        async with service._lock:
+            reads = [asyncio.ensure_future(service.dispatch("GET", path, headers, b"")) for path in ("/students", "/students/2001")]
+            await asyncio.sleep(0.1)
+            assert not any(read.done() for read in reads)
+        assert [(await read)[0] for read in reads] == [200, 200]
+
+    asyncio.run(main())
+
+
+def test_reports_and_statistics(data_dir):
+    school = load_school()
+
+    async def client(port):
+        status, body = await request(port, "GET", "/reports?format=csv&limit=2")
+        assert status == 200
+        assert body.splitlines()[0] == "subject,name,student_id,quiz_average,final_grade"
+        assert len(body.splitlines()) == 3
+        assert len(json.loads((await request(port, "GET", "/reports?offset=50"))[1])) == 10
+        assert (await request(port, "GET", "/reports?format=xml"))[0] == 400
+
+        status, body = await request(port, "GET", "/statistics")
+        assert status == 200
+        assert json.loads(body)["History"]["count"] == 20
+
+    run_with_service(school, client)
+
+
+def test_malformed_requests(data_dir):
+    school = load_school()
+
+    async def client(port):
+        assert (await send_raw(port, b"NONSENSE\r\n\r\n"))[0] == 400
+        data = b"[1, 2]"
+        head = f"POST /students HTTP/1.1\r\nConnection: close\r\nAuthorization: Basic {AUTH}\r\nContent-Length: {len(data)}\r\n\r\n"
+        assert (await send_raw(port, head.encode("latin-1") + data))[0] == 400
+        head = f"POST /students HTTP/1.1\r\nConnection: close\r\nAuthorization: Basic {AUTH}\r\nContent-Length: 3\r\n\r\n"
+        assert (await send_raw(port, head.encode("latin-1") + b"{x}"))[0] == 400
+        for length in ("abc", "-1"):
+            head = f"GET /students HTTP/1.1\r\nAuthorization: Basic {AUTH}\r\nContent-Length: {length}\r\n\r\n"
+            assert (await send_raw(port, head.encode("latin-1")))[0] == 400
+
+        # Lines longer than the stream reader's 64 KiB limit are refused, not dropped
+        long_path = "/students?" + "x" * 70000
+        assert (await send_raw(port, f"GET {long_path} HTTP/1.1\r\n\r\n".encode("latin-1")))[0] == 400
+        head = f"GET /students HTTP/1.1\r\nAuthorization: Basic {AUTH}\r\nX-Padding: {'x' * 70000}\r\n\r\n"
+        assert (await send_raw(port, head.encode("latin-1")))[0] == 431
+        # The service keeps serving
+        assert (await request(port, "GET", "/students/2001"))[0] == 200
+
+    run_with_service(school, client)
+
+
+def test_handler_errors_answer_500(data_dir, monkeypatch, capsys):
+    school = load_school()
+
+    def fail(subject=None):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(school, "subject_statistics", fail)
+
+    async def client(port):
+        assert (await request(port, "GET", "/statistics"))[0] == 500
+        # The service keeps answering other requests
+        assert (await request(port, "GET", "/students/2001"))[0] == 200
+
+    run_with_service(school, client)
+    assert "RuntimeError('broken')" in capsys.readouterr().err
+
+
+def test_metrics_endpoint(data_dir):
+    school = load_school()
+
+    async def client(port):
+        assert (await request(port, "GET", "/metrics"))[0] == 404
+        school.enable_instrumentation()
+        await request(port, "GET", "/students/2001")
+        status, body = await request(port, "GET", "/metrics")
+        assert status == 200
+        assert 'school_operation_seconds_count{operation="find_student_by_id"} 1' in body.splitlines()
+
+    run_with_service(school, client)
@@ -0,0 +1,114 @@
+"""
+Tests of routing students to shards by ID or by subject, merging results
+from every shard, and the shard layout recorded in the data directory.
+"""
+
+import io
+import os
+
+import pytest
+
+from school_management_system import EnglishStudent, HistoryStudent, MathStudent, School
+from school_shards import ShardedSchool
+
+
+# Function to read the IDs stored in each subject file of a shard directory
+def stored_ids(shard_dir):
+    school = School(data_dir=shard_dir, lazy=True)
+    school.ensure_loaded()
+    return {subject: {student.student_id for student in school.find_students_by_subject(subject)} for subject in School.FILE_PATHS}
+
+
+def make_students():
+    return [cls(f"Student {student_id}", student_id) for cls, first in ((MathStudent, 1001), (HistoryStudent, 2001), (EnglishStudent, 3001))
+            for student_id in range(first, first + 5)]
+
+
+def test_partition_by_id(tmp_path):
+    data_dir = str(tmp_path / "shards")
+    with ShardedSchool(2, data_dir, journaling=True) as school:
+        assert school.add_students(make_students(), save=True) == 15
+        assert school.find_student_by_id(2003).name == "Student 2003"
+        assert school.shard_of(2003) == 1
+        school.save_removal(school.remove_student(2004))
+        assert school.count_students() == 14
+
+    for shard in range(2):
+        for ids in stored_ids(os.path.join(data_dir, f"shard{shard}")).values():
+            assert all(student_id % 2 == shard for student_id in ids)
+    assert sum(len(ids) for shard in range(2) for ids in stored_ids(os.path.join(data_dir, f"shard{shard}")).values()) == 14
+
+
+def test_partition_by_subject(tmp_path, capsys):
+    data_dir = str(tmp_path / "shards")
+    with ShardedSchool(2, data_dir, partition="subject", journaling=True) as school:
+        shards = {subject: school.shard_of(subject=subject) for subject in School.STUDENT_CLASSES}
+        assert school.add_students(make_students(), save=True) == 15
+        # An ID is unique across the shards of every subject
+        assert school.add_students([EnglishStudent("Duplicate", 1001)], save=True) == 0
+        assert not school.add_student(HistoryStudent("Duplicate", 3001))
+        assert "Student with ID 1001 already exists." in capsys.readouterr().out
+        assert school.find_student_by_id(3002).subject == "English"
+
+    for shard in range(2):
+        ids = stored_ids(os.path.join(data_dir, f"shard{shard}"))
+        for subject, subject_ids in ids.items():
+            assert len(subject_ids) == (5 if shards[subject] == shard else 0)
+
+
+
+def test_merged_results_match_one_school(tmp_path):
+    single = School(data_dir=str(tmp_path))
+    single.add_students(make_students())
+    with ShardedSchool(3, str(tmp_path / "shards")) as school:
+        school.add_students(make_students())
+        assert school.update_scores(2003, {"project_score": 100.0}) is not None
+        single.apply_scores(single.find_student_by_id(2003), {"project_score": 100.0})
+
+        assert school.count_students() == 15
+        assert school.compute_final_grades() == pytest.approx(single.compute_final_grades())
+        statistics = school.subject_statistics("History")
+        assert statistics["count"] == 5
+        assert statistics["mean"] == pytest.approx(single.subject_statistics("History")["mean"])
+        top = school.top_students("History", count=2)
+        assert top[0][0].student_id == 2003
+        assert [grade for _, grade in top] == [grade for _, grade in single.top_students("History", count=2)]
+        output = io.StringIO()
+        school.write_student_reports(output, "csv")
+        assert len(output.getvalue().splitlines()) == 16
+
+
+def test_layout_is_recorded(tmp_path):
+    data_dir = str(tmp_path / "shards")
+    with ShardedSchool(3, data_dir) as school:
+        school.add_students(make_students(), save=True)
+
+    with ShardedSchool(data_dir=data_dir) as school:
+        assert school.shard_count == 3
+        assert school.count_students() == 15
+    with pytest.raises(ValueError):
+        ShardedSchool(2, data_dir)
+    with pytest.raises(ValueError):
+        ShardedSchool(3, data_dir, partition="subject")
+
+
+def test_failed_request_leaves_no_stale_answers(tmp_path):
+    with ShardedSchool(2, str(tmp_path / "shards")) as school:
+        school.add_students(make_students())
+        # Shard 0 is sent its group before the group of shard 1 fails to pickle
+        with pytest.raises(Exception):
+            school._fan_out("count_students", {0: (), 1: lambda: None})
+        assert school.count_students() == 15
+        assert school.find_student_by_id(2003).name == "Student 2003"
+
+
+def test_dead_shard_breaks_the_pool(tmp_path):
+    school = ShardedSchool(2, str(tmp_path / "shards"))
+    school.add_students(make_students())
+    school._processes[1].terminate()
+    school._processes[1].join()
+    with pytest.raises((EOFError, OSError)):
+        school.count_students()
+    with pytest.raises(ValueError, match="close this ShardedSchool"):
+        school.find_student_by_id(2002)
+    school.close()
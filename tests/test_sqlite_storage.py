@@ -0,0 +1,63 @@
+"""
+Tests of the SQLite storage backend: migrating the subject files, loading
+students on demand, and saving changes.
+"""
+
+import pytest
+
+from conftest import load_school
+
+from school_management_system import HistoryStudent, MathStudent, School, SQLiteStorageBackend
+
+
+@pytest.fixture
+def database(data_dir, tmp_path):
+    path = str(tmp_path / "school.db")
+    storage = SQLiteStorageBackend(path)
+    School().migrate_to_storage(storage)
+    storage.close()
+    return path
+
+
+# Function to describe a school's students by their records
+def records(school):
+    return sorted(school.format_student_record(student) for student in school.students)
+
+
+def test_migration_keeps_every_student(database):
+    school = School(storage=SQLiteStorageBackend(database))
+    school.ensure_loaded()
+    assert records(school) == records(load_school())
+    school.close()
+
+
+def test_lookups_load_one_student(database):
+    school = School(storage=SQLiteStorageBackend(database))
+    assert school.find_student_by_id(2005).name == "Student History 4"
+    assert school.find_student_by_id(9999) is None
+    assert list(school._students_by_id) == [2005]
+
+    # Whole subjects load around the students already looked up
+    school.ensure_loaded(["History"])
+    assert len(school._students_by_id) == 20
+    school.close()
+
+
+def test_changes_are_saved(database):
+    school = School(storage=SQLiteStorageBackend(database))
+    student = school.find_student_by_id(2001)
+    school.apply_scores(student, {"attendance_score": 11.0})
+    school.save_student(student)
+    school.save_removal(school.remove_student(2002))
+    few_quizzes = MathStudent("Few Quizzes", 1999)
+    few_quizzes.add_quiz_score(50.5)
+    school.save_students([few_quizzes, HistoryStudent("Added Student", 2999)])
+    school.close()
+
+    reloaded = School(storage=SQLiteStorageBackend(database))
+    assert reloaded.find_student_by_id(2001).attendance_score == 11.0
+    assert reloaded.find_student_by_id(2002) is None
+    assert reloaded.find_student_by_id(1999).quizzes == [50.5]
+    reloaded.ensure_loaded()
+    assert reloaded.count_students() == 61
+    reloaded.close()
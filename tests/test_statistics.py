@@ -0,0 +1,42 @@
+"""
+Tests of the running grade statistics kept per subject as students are
+loaded, added, removed and regraded.
+"""
+
+import pytest
+
+from conftest import load_school
+
+from school_management_system import EnglishStudent, School
+
+
+# Function to check the statistics of every subject against its students
+def assert_statistics_match(school):
+    for subject in School.FILE_PATHS:
+        grades = [student.compute_final_grade() for student in school.find_students_by_subject(subject)]
+        summary = school.subject_statistics(subject)
+        assert summary["count"] == len(grades)
+        assert summary["mean"] == pytest.approx(sum(grades) / len(grades))
+        assert summary["minimum"] == min(grades)
+        assert summary["maximum"] == max(grades)
+        assert sum(summary["histogram"]) == len(grades)
+
+
+def test_statistics_follow_the_roster(data_dir):
+    school = load_school()
+    assert_statistics_match(school)
+
+    # Removing the best student makes the maximum fall back to the next best
+    best = max(school.find_students_by_subject("History"), key=lambda student: student.compute_final_grade())
+    school.remove_student(best.student_id)
+    added = EnglishStudent("Perfect Student", 3999)
+    for field in ("attendance_score", "final_exam_score", "quiz1_score", "quiz2_score"):
+        setattr(added, field, 100.0)
+    school.add_student(added)
+    assert school.subject_statistics("English")["maximum"] == 100.0
+    assert_statistics_match(school)
+
+    # A score change reaches the statistics through the student's school
+    added.final_exam_score = 0.0
+    assert school.subject_statistics("English")["maximum"] < 100.0
+    assert_statistics_match(school)
@@ -0,0 +1,120 @@
+"""
+Tests of the subjects: the built-in ones work without any configuration, a
+configuration adds or replaces subjects, entries are checked before any code
+is generated from them, and a broken configuration stops School from starting.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from school_management_system import EnglishStudent, HistoryStudent, MathStudent, SubjectDefinition
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Function to build a valid subject entry with some values replaced
+def entry(**changes):
+    config = {
+        "file": "art.txt",
+        "scores": [{"name": "project_score"}, {"name": "portfolio_score"}],
+        "weights": {"project_score": 0.5, "portfolio_score": 0.5},
+    }
+    config.update(changes)
+    return config
+
+
+# Function to run a script importing the module with the given environment, returning its output
+def run_script(script, cwd=PACKAGE_DIR, **environment):
+    result = subprocess.run([sys.executable, "-c", script], cwd=cwd, env=dict(os.environ, **environment),
+                            capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def test_builtin_grades():
+    math_student = MathStudent("Someone", 1999)
+    math_student.set_quiz_scores([80.0, 90.0])
+    math_student.test1_score, math_student.test2_score, math_student.final_exam_score = 70.0, 60.0, 50.0
+    assert math_student.compute_final_grade() == 85.0 * 0.15 + 70.0 * 0.15 + 60.0 * 0.15 + 50.0 * 0.55
+
+    history_student = HistoryStudent("Someone", 2999)
+    history_student.attendance_score, history_student.project_score = 90.0, 80.0
+    history_student.exam1_score, history_student.exam2_score = 70.0, 60.0
+    assert history_student.compute_final_grade() == 90.0 * 0.1 + 80.0 * 0.3 + 70.0 * 0.3 + 60.0 * 0.3
+
+    english_student = EnglishStudent("Someone", 3999)
+    english_student.attendance_score, english_student.final_exam_score = 90.0, 80.0
+    english_student.quiz1_score, english_student.quiz2_score = 70.0, 60.0
+    assert english_student.compute_final_grade() == 90.0 * 0.1 + 80.0 * 0.6 + 70.0 * 0.15 + 60.0 * 0.15
+
+
+def test_module_works_without_configuration(tmp_path):
+    shutil.copy(os.path.join(PACKAGE_DIR, "school_management_system.py"), tmp_path)
+    script = ("from school_management_system import School, HistoryStudent\n"
+              "school = School()\n"
+              "student = HistoryStudent('Someone', 2001)\n"
+              "student.project_score = 100.0\n"
+              "print(list(school.STUDENT_CLASSES), student.compute_final_grade())\n")
+    assert run_script(script, cwd=str(tmp_path)).split() == ["['Math',", "'History',", "'English']", "30.0"]
+
+
+def test_configuration_adds_and_replaces_subjects(tmp_path):
+    history = {
+        "class": "HistoryStudent",
+        "file": "historystudent.txt",
+        "scores": [{"name": "attendance_score"}, {"name": "project_score"}, {"name": "exam1_score"}, {"name": "exam2_score"}],
+        "weights": {"project_score": 0.5, "exam1_score": 0.25, "exam2_score": 0.25},
+    }
+    path = tmp_path / "subjects.json"
+    path.write_text(json.dumps({"History": history, "Art History": entry()}))
+    script = ("from school_management_system import School, HistoryStudent\n"
+              "School()\n"
+              "student = HistoryStudent('Someone', 2001)\n"
+              "student.attendance_score, student.project_score = 100.0, 80.0\n"
+              "art = School.STUDENT_CLASSES['Art History']('Someone', 4001)\n"
+              "art.portfolio_score = 60.0\n"
+              "print(list(School.STUDENT_CLASSES), student.compute_final_grade(), art.compute_final_grade())\n")
+    output = run_script(script, SCHOOL_SUBJECTS=str(path))
+    assert output.split() == ["['Math',", "'History',", "'English',", "'Art", "History']", "40.0", "30.0"]
+
+
+def test_valid_entry_is_compiled():
+    definition = SubjectDefinition("Art History", entry())
+    student = definition.student_class("Someone", 4001)
+    student._project_score = 80.0
+    assert student.compute_final_grade() == 40.0
+
+
+@pytest.mark.parametrize("subject, config, message", [
+    ("Art;import os", entry(), "Invalid subject name"),
+    ("Art", entry(file=""), "needs a file name"),
+    ("Art", entry(**{"class": "Art Student"}), "Invalid class name"),
+    ("Art", entry(scores=[{"name": "project_score"}, {"name": "class"}]), "Invalid score name"),
+    ("Art", entry(scores=[{"name": "project_score"}, {"name": "os.system('x')"}]), "Invalid score name"),
+    ("Art", entry(scores=[{"name": "project_score"}, {"name": "project_score"}]), "Duplicate score"),
+    ("Art", entry(scores=[{"name": "sketches", "repeat": 0, "item": "sketch"}], weights={}), "positive integer"),
+    ("Art", entry(scores=[{"name": "sketches", "repeat": "3", "item": "sketch"}], weights={}), "positive integer"),
+    ("Art", entry(scores=[{"name": "sketches", "repeat": 3, "item": "a-b"}], weights={}), "Invalid item name"),
+    ("Art", entry(weights={"project_score": "0.5"}), "must be a number"),
+    ("Art", entry(weights={"project_score": float("nan")}), "must be a number"),
+    ("Art", entry(weights={"unknown_score": 0.5}), "unknown score"),
+])
+def test_invalid_entries_are_refused(subject, config, message):
+    with pytest.raises(ValueError, match=message):
+        SubjectDefinition(subject, config)
+
+
+def test_hand_written_class_needs_weights():
+    config = entry(scores=[{"name": "project_score"}, {"name": "portfolio_score"}], **{"class": "HistoryStudent"})
+    with pytest.raises(ValueError, match="no attribute for score 'portfolio_score'"):
+        SubjectDefinition("History", config)
+
+
+def test_missing_configuration_stops_school(tmp_path):
+    script = "from school_management_system import School\ntry:\n    School()\nexcept ValueError as error:\n    print(error)\n"
+    output = run_script(script, SCHOOL_SUBJECTS=str(tmp_path / "missing.json"))
+    assert output.startswith("Cannot load the subject configuration")
@@ -0,0 +1,154 @@
+"""
+Tests of write-behind saving: coalescing saved changes, and flushing them
+on a timer, at a threshold, on request, on close and at exit.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from school_management_system import GradeHistory, HistoryStudent, School
+
+
+# Function to read the History records stored on disk, by student ID
+def stored(data_dir):
+    school = School(data_dir=data_dir, lazy=True)
+    school.ensure_loaded(["History"])
+    return {student.student_id: student for student in school.find_students_by_subject("History")}
+
+
+@pytest.fixture
+def school(data_dir):
+    school = School(data_dir=data_dir, journaling=True, lazy=True, write_behind=True, flush_interval=None)
+    yield school
+    school.close()
+
+
+def test_saves_are_coalesced_until_flushed(school, data_dir):
+    student = school.find_student_by_id(2001)
+    for score in (10.0, 20.0, 30.0):
+        school.apply_scores(student, {"attendance_score": score})
+        school.save_student(student)
+    school.save_removal(school.remove_student(2002))
+    assert school.count_dirty() == 2
+    assert stored(data_dir)[2001].attendance_score != 30.0
+
+    assert school.flush() == 2
+    assert school.count_dirty() == 0
+    with open(school.JOURNAL_PATHS["History"]) as journal:
+        assert [line.split(",")[0] for line in journal] == ["U", "D"]
+    students = stored(data_dir)
+    assert students[2001].attendance_score == 30.0
+    assert 2002 not in students
+
+
+def test_threshold_and_close_flush(data_dir):
+    school = School(data_dir=data_dir, journaling=True, write_behind=True, flush_interval=None, flush_threshold=3)
+    school.save_students([HistoryStudent(f"Added {student_id}", student_id) for student_id in (2997, 2998)])
+    assert school.count_dirty() == 2
+    school.save_student(HistoryStudent("Added 2999", 2999))
+    assert school.count_dirty() == 0
+    assert {2997, 2998, 2999} <= set(stored(data_dir))
+
+    school.save_student(HistoryStudent("Added 2996", 2996))
+    school.close()
+    assert 2996 in stored(data_dir)
+
+
+def test_timer_flushes_after_the_interval(data_dir):
+    school = School(data_dir=data_dir, journaling=True, write_behind=True, flush_interval=0.05)
+    school.save_student(HistoryStudent("Added Student", 2999))
+    assert school.count_dirty() == 1
+    # The dirty count drops as the flush starts, so wait for the write itself
+    deadline = time.monotonic() + 5
+    while 2999 not in stored(data_dir) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert 2999 in stored(data_dir)
+    assert school.count_dirty() == 0
+
+
+def test_failed_flush_keeps_the_changes(school, data_dir, monkeypatch):
+    school.save_student(HistoryStudent("Added Student", 2999))
+
+    def fail(subject, records):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(school, "append_journal_records", fail)
+    with pytest.raises(OSError):
+        school.flush()
+    assert school.count_dirty() == 1
+    monkeypatch.undo()
+    assert school.flush() == 1
+    assert 2999 in stored(data_dir)
+
+
+def test_history_records_flushed_changes_only(data_dir, tmp_path, monkeypatch):
+    history = GradeHistory(str(tmp_path / "history.db"))
+    school = School(data_dir=data_dir, journaling=True, lazy=True, write_behind=True, flush_interval=None, history=history)
+    history.record_students([school.find_student_by_id(2001)], timestamp=100)
+    school.save_removal(school.remove_student(2001))
+    school.save_student(HistoryStudent("Added Student", 2999))
+    assert school.count_dirty() == 2
+    assert history.student_versions(2999) == []
+    assert [timestamp for timestamp, _ in history.student_versions(2001)] == [100]
+
+    def fail(subject, records):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(school, "append_journal_records", fail)
+    with pytest.raises(OSError):
+        school.flush()
+    assert history.student_versions(2999) == []
+    assert [timestamp for timestamp, _ in history.student_versions(2001)] == [100]
+    monkeypatch.undo()
+    school.flush()
+    assert history.student_as_of(2999, float("inf")).name == "Added Student"
+    assert [student is None for _, student in history.student_versions(2001)] == [False, True]
+    school.close()
+
+
+def test_lazy_loads_see_unflushed_removals(school):
+    school.save_removal(school.remove_student(2001))
+    # Loading the subject writes the removal first instead of reading the student back
+    school.ensure_loaded(["History"])
+    assert school.find_student_by_id(2001) is None
+    assert school.count_dirty() == 0
+
+
+def test_failed_timer_flush_is_retried(data_dir, monkeypatch, capsys):
+    school = School(data_dir=data_dir, journaling=True, write_behind=True, flush_interval=0.05)
+    append_journal_records = school.append_journal_records
+    failures = []
+
+    def fail_once(subject, records):
+        if not failures:
+            failures.append(subject)
+            raise OSError("disk full")
+        append_journal_records(subject, records)
+
+    monkeypatch.setattr(school, "append_journal_records", fail_once)
+    school.save_student(HistoryStudent("Added Student", 2999))
+    deadline = time.monotonic() + 5
+    while 2999 not in stored(data_dir) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert failures == ["History"]
+    assert 2999 in stored(data_dir)
+    assert "Error: Could not write the saved changes: disk full" in capsys.readouterr().out
+    school.close()
+
+
+def test_changes_are_flushed_at_exit(data_dir):
+    # The school is never closed; the interpreter's exit writes its changes
+    script = (
+        "import sys\n"
+        "sys.path.insert(0, sys.argv[1])\n"
+        "from school_management_system import HistoryStudent, School\n"
+        "school = School(data_dir=sys.argv[2], journaling=True, write_behind=True, flush_interval=None)\n"
+        "school.save_student(HistoryStudent('Added Student', 2999))\n"
+    )
+    repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", script, repository, data_dir], check=True)
+    assert stored(data_dir)[2999].name == "Added Student"